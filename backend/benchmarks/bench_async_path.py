@@ -0,0 +1,217 @@
+"""
+Compara el path async (rutas `async def` + pool async de oracledb) contra el
+path previo basado en threadpool (rutas `def` + `connect()` sincrónico).
+
+Sin parámetros de conexión simula Oracle con latencia fija por statement, lo
+que aísla el costo de concurrencia de la API. Con --host/--user/... mide contra
+una base real (la password se lee de ORACLE_PASSWORD).
+
+    python benchmarks/bench_async_path.py --requests 2000 --concurrency 400
+    ORACLE_PASSWORD=... python benchmarks/bench_async_path.py --host db --port 1521 \\
+        --service ORCL --user app --ne DTH --start "2025-01-01 00:00:00" --end "2025-01-02 00:00:00"
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import httpx  # noqa: E402
+from fastapi import FastAPI  # noqa: E402
+
+from provisioning_api.db import oracle  # noqa: E402
+from provisioning_api.db.sql.queries import build_sql  # noqa: E402
+from provisioning_api.schemas.record import Record, RecordsRequest, RecordsResponse  # noqa: E402
+
+
+# ----------------- Oracle simulado -----------------
+
+_DESCRIPTION = [(name, None) for name in Record.model_fields]
+_ROW = tuple(1 if name == "pri_id" else "x" for name in Record.model_fields)
+
+
+class _FakeCursor:
+    def __init__(self, latency: float, rows: int, is_async: bool):
+        self._latency, self._rows, self._async = latency, rows, is_async
+        self._count = False
+        self.description = _DESCRIPTION
+
+    def _prepare(self, sql):
+        self._count = "COUNT(" in sql
+        if self._count:
+            self.description = [("TOTAL", None)]
+
+    def execute(self, sql, binds=None):
+        self._prepare(sql)
+        if self._async:
+            return asyncio.sleep(self._latency)
+        time.sleep(self._latency)
+
+    def _all(self):
+        return [(1234,)] if self._count else [_ROW] * self._rows
+
+    def fetchall(self):
+        return self._wrap(self._all())
+
+    def fetchone(self):
+        return self._wrap(self._all()[0])
+
+    def _wrap(self, value):
+        if not self._async:
+            return value
+
+        async def _done():
+            return value
+        return _done()
+
+
+class _FakeConnection:
+    version = "19.0.0.0"
+
+    def __init__(self, latency, rows, is_async):
+        self._args = (latency, rows, is_async)
+
+    def cursor(self):
+        return _FakeCursor(*self._args)
+
+
+class _FakePool:
+    busy = 0
+    opened = 0
+
+    def __init__(self, latency, rows, is_async):
+        self._args = (latency, rows, is_async)
+        self._async = is_async
+
+    def acquire(self):
+        con = _FakeConnection(*self._args)
+        if not self._async:
+            return con
+
+        async def _acq():
+            return con
+        return _acq()
+
+    def release(self, con):
+        if self._async:
+            return asyncio.sleep(0)
+
+    def close(self, force=False):
+        pass
+
+
+def _install_fakes(latency: float, rows: int) -> None:
+    oracle._POOLS = oracle.PoolRegistry(lambda db: _FakePool(latency, rows, False))
+    oracle._ASYNC_POOLS = oracle.PoolRegistry(lambda db: _FakePool(latency, rows, True))
+
+
+# ----------------- apps a comparar -----------------
+
+def _threadpool_app() -> FastAPI:
+    """Réplica del path anterior: ruta sync, corre en el threadpool de Starlette."""
+    app = FastAPI()
+
+    @app.post("/api/records", response_model=RecordsResponse)
+    def post_records(body: RecordsRequest):
+        f = body.filters.model_dump()
+        with oracle.connect(body.db.model_dump()) as con:
+            select_sql, count_sql, binds = build_sql(f, include_pagination=True)
+            items = oracle.fetch_all(con, select_sql, binds)
+            binds_count = {k: v for k, v in binds.items() if k not in ("offset", "limit")}
+            total = oracle.fetch_count(con, count_sql, binds_count)
+        return {"items": [Record(**r) for r in items], "total": total}
+
+    return app
+
+
+def _async_app() -> FastAPI:
+    from provisioning_api.main import app
+    return app
+
+
+# ----------------- carga -----------------
+
+async def _run(app: FastAPI, payload: dict, requests: int, concurrency: int) -> dict:
+    transport = httpx.ASGITransport(app=app)
+    latencies: list[float] = []
+    errors = 0
+    sem = asyncio.Semaphore(concurrency)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        async def one():
+            nonlocal errors
+            async with sem:
+                t0 = time.perf_counter()
+                r = await client.post("/api/records", json=payload)
+                latencies.append(time.perf_counter() - t0)
+                if r.status_code != 200:
+                    errors += 1
+
+        t0 = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(requests)))
+        wall = time.perf_counter() - t0
+
+    latencies.sort()
+
+    def pct(p: float) -> float:
+        return latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1000
+
+    return {
+        "req/s": requests / wall,
+        "p50_ms": pct(0.50),
+        "p95_ms": pct(0.95),
+        "p99_ms": pct(0.99),
+        "max_ms": latencies[-1] * 1000,
+        "mean_ms": statistics.fmean(latencies) * 1000,
+        "errors": errors,
+    }
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--requests", type=int, default=1000)
+    ap.add_argument("--concurrency", type=int, default=200)
+    ap.add_argument("--latency-ms", type=float, default=50.0, help="latencia simulada por statement")
+    ap.add_argument("--rows", type=int, default=200, help="filas simuladas por página")
+    ap.add_argument("--host")
+    ap.add_argument("--port", type=int, default=1521)
+    ap.add_argument("--service", default="")
+    ap.add_argument("--user")
+    ap.add_argument("--ne", default="DTH")
+    ap.add_argument("--start", default="2025-01-01 00:00:00")
+    ap.add_argument("--end", default="2025-01-01 23:59:59")
+    args = ap.parse_args()
+
+    if args.host:
+        settings = oracle.get_settings()
+        settings.oracle_pool_max = max(settings.oracle_pool_max, args.concurrency)
+        db = {"host": args.host, "port": args.port, "service": args.service,
+              "user": args.user, "password": os.environ.get("ORACLE_PASSWORD", "")}
+        mode = "oracle real"
+    else:
+        _install_fakes(args.latency_ms / 1000, args.rows)
+        db = {"host": "bench", "port": 1521, "service": "BENCH", "user": "bench", "password": "bench"}
+        mode = f"simulado ({args.latency_ms:.0f} ms/statement, {args.rows} filas)"
+
+    payload = {"db": db, "filters": {"start_date": args.start, "end_date": args.end,
+                                      "pri_ne_id": args.ne, "limit": args.rows, "offset": 0}}
+
+    apps = (("threadpool (def)", _threadpool_app()), ("async (async def)", _async_app()))
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    print(f"modo: {mode}; {args.requests} requests, concurrencia {args.concurrency}")
+    for name, app in apps:
+        res = asyncio.run(_run(app, payload, args.requests, args.concurrency))
+        print(f"{name:<18} " + "  ".join(f"{k}={v:,.1f}" if isinstance(v, float) else f"{k}={v}"
+                                         for k, v in res.items()))
+
+
+if __name__ == "__main__":
+    main()
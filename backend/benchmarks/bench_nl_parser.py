@@ -0,0 +1,281 @@
+"""
+Parser de fechas/filtros en lenguaje natural (ai/graph.py): copia congelada
+del parser anterior (regex sin compilar + dateparser en cada llamada) contra
+el actual (patrones compilados, fast path sin dateparser y memo por minuto).
+
+Para cada frase del corpus y varios "ahora" fijos verifica que ambos
+devuelvan exactamente lo mismo; después mide frases/s de cada path.
+
+    python benchmarks/bench_nl_parser.py
+    python benchmarks/bench_nl_parser.py --repeat 20
+"""
+from __future__ import annotations
+
+import argparse
+import re
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from provisioning_api.ai.graph import (  # noqa: E402
+    SPAN, _day_bounds, _month_bounds, _parse_range_free, _quarter_bounds, _week_bounds, _year_bounds,
+    parse_filters,
+)
+
+CORPUS = [
+    "ayer", "hoy", "anteayer", "ay er en DTH", "registros de hoy para el DTH",
+    "últimos 7 días", "ultimos 7 dias", "últimas 3 semanas en HLR", "últimos 2 meses", "últimos 1 año",
+    "últimos 2 anos", "últimas 12 horas para el DTH", "ultimas 5 horas",
+    "hace 1 mes", "hace 3 días", "hace 2 semanas pri_ne_id=DTH", "hace 6 meses", "hace 1 año", "hace 4 horas",
+    "esta semana", "este mes", "este trimestre", "este año", "esta semana hasta hoy en DTH",
+    "semana pasada", "mes pasado", "trimestre pasado", "año pasado", "ano pasado",
+    "fin de semana pasado", "este fin de semana",
+    "principio de marzo", "inicio de enero de 2024", "comienzo de sept", "principio de setiembre de 2023",
+    "desde principio de mayo hasta hoy", "inicio de semana",
+    "del 1 de marzo al 5 de marzo", "desde 2024-01-01 hasta 2024-01-31", "entre lunes y viernes",
+    "del 10/02/2025 al 20/02/2025 pri_ne_id DTH", "desde ayer hasta hoy",
+    "pri_ne_id=DTH pri_id=12345 acciones ALTA ayer", "pri_action: BAJA en el HLR últimos 3 días",
+    "ne id MSC01 este mes", "action modify para el DTH semana pasada", "errores del DTH",
+    "activaciones de   ayer   en DTH", "consultas sin fecha", "",
+]
+
+NOWS = [
+    datetime(2025, 1, 1, 0, 0, 5), datetime(2025, 3, 31, 23, 59, 59), datetime(2024, 2, 29, 12, 30, 0),
+    datetime(2025, 10, 18, 9, 15, 42), datetime(2025, 12, 28, 18, 0, 0),
+]
+
+
+# ----------------- parser anterior (congelado) -----------------
+
+def legacy_parse_range_free(text: str, now: Optional[datetime] = None) -> SPAN:
+    """
+    Soporta en español (sin LLM):
+    - “del X al Y”, “desde X hasta Y”, “entre X y Y”
+    - “hoy”, “ayer”, “anteayer”
+    - “últimos/ultimas N (días|semanas|meses|años|horas)”
+    - “hace N (días|semanas|meses|años|horas)”  -> [now-N, now]
+    - “esta semana/mes/trimestre/año”
+    - “semana/mes/trimestre/año pasado(a)”
+    - “este fin de semana”, “fin de semana pasado”
+    - “principio/inicio/comienzo de <mes> [de <año>] ... (hasta hoy)”
+    - “este mes hasta hoy”, “esta semana hasta hoy” (fin = hoy)
+    """
+    now = now or datetime.now()
+
+    # import perezoso para no romper el arranque si falla dateparser
+    try:
+        import dateparser  # type: ignore
+        base_parse = lambda s: dateparser.parse(s, languages=["es"], settings={"PREFER_DATES_FROM": "past"})
+    except Exception:
+        # sin dateparser: volvemos a hoy-hoy para no tirar abajo la API
+        return _day_bounds(now)
+
+    t = re.sub(r"\s+", " ", text.strip().lower())
+
+    # Rango explícito
+    m = re.search(r"\b(?:del|desde)\s+(.+?)\s+(?:al|hasta)\s+(.+?)\b", t)
+    if not m:
+        m = re.search(r"\bentre\s+(.+?)\s+y\s+(.+?)\b", t)
+    if m:
+        s = base_parse(m.group(1))
+        e = base_parse(m.group(2))
+        if s and e:
+            s0, e0 = _day_bounds(s) if s.time() == datetime.min.time() else (s, s)
+            e0 = e.replace(microsecond=0)
+            if e.time() == datetime.min.time():
+                _, e0 = _day_bounds(e)
+            return s0, e0
+
+    # Hoy / Ayer / Anteayer
+    if re.search(r"\bhoy\b", t):
+        return _day_bounds(now)
+    if re.search(r"\banteayer\b", t):
+        return _day_bounds(now - timedelta(days=2))
+    if re.search(r"\bayer\b", t) or re.search(r"\bay er\b", t):  # por si meten espacios raros
+        return _day_bounds(now - timedelta(days=1))
+
+    # Últimos N unidades
+    m = re.search(r"\búltim[oa]s?\s+(\d+)\s+(d[ií]as?|semanas?|meses?|a[nñ]os?|horas?)\b", t)
+    if m:
+        n = int(m.group(1)); unit = m.group(2)
+        delta = {"día": "days", "dias": "days", "días": "days", "semana": "weeks", "semanas": "weeks",
+                 "mes": "months", "meses": "months", "año": "years", "años": "years", "hora": "hours", "horas": "hours"}
+        u = "days"
+        if "seman" in unit: u = "weeks"
+        elif "mes" in unit: u = "months"
+        elif "a" in unit and "ño" in unit: u = "years"
+        elif "hora" in unit: u = "hours"
+        end = now
+        if u == "weeks": start = now - timedelta(weeks=n)
+        elif u == "months":
+            # retroceso mes a mes
+            y, mth = now.year, now.month
+            for _ in range(n):
+                if mth == 1: y, mth = y - 1, 12
+                else: mth -= 1
+            start = now.replace(year=y, month=mth)
+        elif u == "years": start = now.replace(year=now.year - n)
+        elif u == "hours":
+            start = now - timedelta(hours=n)
+        else:
+            start = now - timedelta(days=n)
+        s0 = start.replace(minute=0, second=0, microsecond=0) if u == "hours" else _day_bounds(start)[0]
+        e0 = end.replace(microsecond=0)
+        return s0, e0
+
+    # Hace N unidades (desde hace N hasta ahora)
+    m = re.search(r"\bhace\s+(\d+)\s+(d[ií]as?|semanas?|meses?|a[nñ]os?|horas?)\b", t)
+    if m:
+        n = int(m.group(1)); unit = m.group(2)
+        if "seman" in unit: start = now - timedelta(weeks=n)
+        elif "mes" in unit:
+            y, mth = now.year, now.month
+            for _ in range(n):
+                if mth == 1: y, mth = y - 1, 12
+                else: mth -= 1
+            start = now.replace(year=y, month=mth)
+        elif "a" in unit and "ño" in unit: start = now.replace(year=now.year - n)
+        elif "hora" in unit: start = now - timedelta(hours=n)
+        else: start = now - timedelta(days=n)
+        s0 = start.replace(minute=0, second=0, microsecond=0) if "hora" in unit else _day_bounds(start)[0]
+        return s0, now.replace(microsecond=0)
+
+    # Esta/este … / pasada(o)
+    if re.search(r"\best[ae]\s+semana\b", t):
+        s, e = _week_bounds(now)
+        e = min(e, now.replace(hour=23, minute=59, second=59, microsecond=0))
+        return s, e
+    if re.search(r"\bsemana\s+pasad[ao]\b", t):
+        s, _ = _week_bounds(now - timedelta(days=7))
+        return s, (s + timedelta(days=6)).replace(hour=23, minute=59, second=59, microsecond=0)
+
+    if re.search(r"\best[ea]\s+mes\b", t):
+        s, e = _month_bounds(now)
+        e = min(e, now.replace(hour=23, minute=59, second=59, microsecond=0))
+        return s, e
+    if re.search(r"\bmes\s+pasad[oa]\b", t):
+        prev = now.replace(day=1) - timedelta(days=1)
+        s, e = _month_bounds(prev)
+        return s, e
+
+    if re.search(r"\best[ea]\s+trimestre\b", t):
+        s, e = _quarter_bounds(now); e = min(e, now.replace(hour=23, minute=59, second=59, microsecond=0)); return s, e
+    if re.search(r"\btrimestre\s+pasad[oa]\b", t):
+        s, _ = _quarter_bounds(now.replace(month=((now.month - 4) % 12) + 1))
+        e = _quarter_bounds(s)[1]; return s, e
+
+    if re.search(r"\best[ea]\s+a[nñ]o\b", t):
+        s, e = _year_bounds(now); e = min(e, now.replace(hour=23, minute=59, second=59, microsecond=0)); return s, e
+    if re.search(r"\ba[nñ]o\s+pasad[oa]\b", t):
+        s, e = _year_bounds(now.replace(year=now.year - 1)); return s, e
+
+    # Fin de semana
+    if re.search(r"\bfin\s+de\s+semana\s+pasad[oa]?\b", t):
+        # sábado y domingo pasados
+        last_sun = now - timedelta(days=(now.weekday() + 1))
+        sat = last_sun - timedelta(days=1)
+        return _day_bounds(sat)[0], _day_bounds(last_sun)[1]
+    if re.search(r"\beste\s+fin\s+de\s+semana\b", t):
+        # siguiente fin de semana del período actual
+        wstart, _ = _week_bounds(now)
+        sat = wstart + timedelta(days=5)
+        sun = sat + timedelta(days=1)
+        return _day_bounds(sat)[0], _day_bounds(sun)[1]
+
+    # Principio/inicio/comienzo de <mes> [de <año>] (hasta hoy si no hay fin)
+    m = re.search(r"(?:principio|inicio|comienzo)\s+de\s+([a-záéíóú]+)(?:\s+de\s+(\d{4}))?", t)
+    if m:
+        month = m.group(1); year = int(m.group(2)) if m.group(2) else now.year
+        s = dateparser.parse(f"1 {month} {year}", languages=["es"])
+        if s:
+            _, e = _day_bounds(now)
+            return _day_bounds(s)[0], e
+
+    # Fallback: hoy
+    return _day_bounds(now)
+
+
+def legacy_parse_filters(txt: str, now: Optional[datetime] = None) -> Dict[str, Any]:
+    filters: Dict[str, Any] = {}
+
+    # pri_ne_id: acepta “pri_ne_id DTH”, “pri_ne_id=DTH”, “para/en/sobre el DTH”, “ne id DTH”
+    m = re.search(r"\bpri[_\s-]?ne[_\s-]?id\b(?:\s*(?:=|:)\s*|\s+(?:es|de)?\s*)?([a-z0-9_-]{2,})\b", txt, flags=re.I)
+    if not m:
+        m = re.search(r"\b(?:en|para|sobre)\s+(?:el|la|los|las)?\s*([a-z0-9_-]{2,})\b", txt, flags=re.I)
+    if not m:
+        m = re.search(r"\bne\s*id\b\s*[:=]?\s*([a-z0-9_-]{2,})\b", txt, flags=re.I)
+    if m:
+        filters["pri_ne_id"] = m.group(1).upper()
+
+    m = re.search(r"\bpri_id\s*[:=]\s*(\d+)\b", txt, flags=re.I)
+    if m: filters["pri_id"] = int(m.group(1))
+
+    m = re.search(r"\bpri_action\s*[:=]\s*([a-z0-9_-]+)\b", txt, flags=re.I)
+    if not m:
+        m = re.search(r"\b(?:action|acciones?)\s+([a-z0-9_-]+)\b", txt, flags=re.I)
+    if m: filters["pri_action"] = m.group(1).upper()
+
+    start, end = legacy_parse_range_free(txt, now)
+    filters["start_date"] = start.strftime("%Y-%m-%d %H:%M:%S")
+    filters["end_date"]   = end.strftime("%Y-%m-%d %H:%M:%S")
+    filters.setdefault("limit", 200)
+    filters.setdefault("offset", 0)
+    return filters
+
+
+# ----------------- comparación y medición -----------------
+
+def _outcome(fn, text: str, now: datetime):
+    # los errores también cuentan: p.ej. "hace 1 mes" un 31 de marzo falla en ambos
+    try:
+        return fn(text, now)
+    except Exception as e:
+        return type(e).__name__, str(e)
+
+
+def check_identical() -> int:
+    checked = 0
+    for now in NOWS:
+        for text in CORPUS:
+            old, new = _outcome(legacy_parse_filters, text, now), _outcome(parse_filters, text, now)
+            assert old == new, f"{text!r} @ {now}: {old} != {new}"
+            checked += 1
+    return checked
+
+
+def _rate(fn, repeat: int) -> float:
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        for text in CORPUS:
+            fn(text)
+    return repeat * len(CORPUS) / (time.perf_counter() - t0)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--repeat", type=int, default=10)
+    args = ap.parse_args()
+
+    t0 = time.perf_counter()
+    import dateparser  # noqa: F401  (el parser anterior lo importaba al cargar el módulo)
+    import_ms = (time.perf_counter() - t0) * 1000
+
+    checked = check_identical()
+    print(f"{checked} casos idénticos ({len(CORPUS)} frases x {len(NOWS)} fechas); import dateparser: {import_ms:.0f} ms")
+
+    now = NOWS[-1]
+    legacy = _rate(lambda t: legacy_parse_filters(t, now), args.repeat)
+    fast = _rate(lambda t: parse_filters(t, now), args.repeat)
+    memo = _rate(lambda t: _parse_range_free(t), args.repeat)
+    print(f"{'path':<22}{'frases/s':>12}")
+    print(f"{'anterior':<22}{legacy:>12,.0f}")
+    print(f"{'compilado + fast path':<22}{fast:>12,.0f}  x{fast / legacy:.1f}")
+    print(f"{'memo por minuto':<22}{memo:>12,.0f}  x{memo / legacy:.1f}")
+
+
+if __name__ == "__main__":
+    main()
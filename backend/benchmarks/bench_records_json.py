@@ -0,0 +1,105 @@
+"""
+Serialización de /records: path anterior (Record(**r) + response_model, que
+valida y serializa dos veces) contra el path directo de `render_records_json`.
+
+Ambas variantes se montan como rutas FastAPI sin base de datos y se comparan
+los bytes de respuesta, que deben ser idénticos.
+
+    python benchmarks/bench_records_json.py
+    python benchmarks/bench_records_json.py --sizes 200 2000 20000 --repeat 5
+"""
+from __future__ import annotations
+
+import argparse
+import logging
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from fastapi import FastAPI, Response  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+from provisioning_api.db.sql.queries import build_sql  # noqa: E402
+from provisioning_api.schemas.record import Num, Record, RecordsResponse  # noqa: E402
+from provisioning_api.utils.records_json import render_records_json  # noqa: E402
+
+_NUM_FIELDS = {n for n, f in Record.model_fields.items() if f.annotation in (int, Num, Num | None)}
+
+
+def _columns() -> list[str]:
+    """Nombres de columna en el orden de la proyección de build_sql."""
+    sql, _, _ = build_sql({"start_date": "", "end_date": "", "pri_ne_id": ""}, include_pagination=False)
+    select = sql.split("SELECT", 1)[1].split("FROM", 1)[0]
+    return [part.strip().split()[-1].split(".")[-1] for part in select.split(",\n")]
+
+
+def _rows(cols: list[str], n: int) -> list[tuple]:
+    rnd = random.Random(7)
+    rows = []
+    for i in range(n):
+        row = []
+        for c in cols:
+            if c == "pri_id":
+                row.append(i + 1)
+            elif c in _NUM_FIELDS:
+                row.append(rnd.choice([None, rnd.randint(0, 10**9), rnd.random() * 1000]))
+            elif c.endswith("_date") or c in ("pri_in_queue", "pri_delivered_safir", "pri_received_safir"):
+                row.append(f"2025-01-{rnd.randint(1, 28):02d} 12:{rnd.randint(0, 59):02d}:00")
+            elif c in ("pri_request", "pri_response"):
+                row.append("<xml>" + "ñ" * rnd.randint(50, 400) + "</xml>")
+            else:
+                row.append(rnd.choice([None, f"v{rnd.randint(0, 99999)}", "acción"]))
+        rows.append(tuple(row))
+    return rows
+
+
+def _apps(page: dict) -> tuple[FastAPI, FastAPI]:
+    old, new = FastAPI(), FastAPI()
+    items = [dict(zip(page["columns"], r)) for r in page["items"]]
+
+    @old.get("/records", response_model=RecordsResponse)
+    async def old_records():
+        return {**{k: v for k, v in page.items() if k not in ("items", "columns")},
+                "items": [Record(**r) for r in items]}
+
+    @new.get("/records", response_model=RecordsResponse)
+    async def new_records():
+        return Response(content=render_records_json(page), media_type="application/json")
+
+    return old, new
+
+
+def _time(client: TestClient, repeat: int) -> tuple[float, bytes]:
+    samples, body = [], b""
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        body = client.get("/records").content
+        samples.append(time.perf_counter() - t0)
+    return statistics.median(samples), body
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--sizes", type=int, nargs="+", default=[200, 2000, 20000])
+    ap.add_argument("--repeat", type=int, default=5)
+    args = ap.parse_args()
+    logging.disable(logging.INFO)
+
+    cols = _columns()
+    print(f"{'filas':>7}  {'anterior ms':>12}  {'directo ms':>11}  {'speedup':>8}  {'MB':>6}")
+    for n in args.sizes:
+        page = {"columns": cols, "items": _rows(cols, n), "total": n * 3, "count_strategy": "exact"}
+        old, new = _apps(page)
+        with TestClient(old) as c_old, TestClient(new) as c_new:
+            t_old, b_old = _time(c_old, args.repeat)
+            t_new, b_new = _time(c_new, args.repeat)
+        assert b_old == b_new, f"el wire format difiere para {n} filas"
+        print(f"{n:>7}  {t_old * 1000:>12.1f}  {t_new * 1000:>11.1f}  {t_old / t_new:>7.1f}x  {len(b_new) / 1e6:>6.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Generación de INSERTs: `_format_row` (el formato anterior, que adivina el tipo
+de cada valor con DATE_RE/NUM_RE; queda sólo acá como referencia) contra la
+tabla de formateadores por columna que arma `build_formatters` una vez por export.
+
+Las filas sintéticas imitan lo que entrega el driver: fechas como texto
+(TO_CHAR), NUMBER como int y VARCHAR como str, con MSISDN/IMSI numéricos.
+Además de rows/s informa cuántas filas cambian de salida entre ambos paths
+(los VARCHAR numéricos, que antes salían sin comillas).
+
+    python benchmarks/bench_sql_export.py
+    python benchmarks/bench_sql_export.py --rows 1000000 --repeat 3
+"""
+from __future__ import annotations
+
+import argparse
+import datetime as dt
+import random
+import re
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from provisioning_api.db.sql.queries import DATE_COLUMNS, NUMBER_COLUMNS  # noqa: E402
+from provisioning_api.utils.sql_export import (  # noqa: E402
+    COLUMNS, RAW_OVERRIDES, build_formatters, format_row,
+)
+
+DATE_RE = re.compile(r"^\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}$")
+NUM_RE  = re.compile(r"^-?\d+(?:\.\d+)?$")
+
+
+def esc(v):
+    if v is None: return "NULL"
+    if isinstance(v, (int, float)): return str(v)
+    if isinstance(v, dt.datetime):
+        s = v.strftime("%Y-%m-%d %H:%M:%S"); return f"TO_DATE('{s}','YYYY-MM-DD HH24:MI:SS')"
+    if isinstance(v, dt.date):
+        s = v.strftime("%Y-%m-%d 00:00:00"); return f"TO_DATE('{s}','YYYY-MM-DD HH24:MI:SS')"
+    s = str(v).strip()
+    if DATE_RE.match(s): return f"TO_DATE('{s}','YYYY-MM-DD HH24:MI:SS')"
+    if NUM_RE.match(s):  return s
+    s_esc = s.replace("'", "''")
+    return f"'{s_esc}'"
+
+
+def _format_row(row: dict) -> list[str]:
+    out = []
+    for col in COLUMNS:
+        if col in RAW_OVERRIDES:
+            out.append(RAW_OVERRIDES[col])
+        else:
+            out.append(esc(row.get(col)))
+    return out
+
+_TEMPLATES = 1000  # filas distintas; el resto se repite para no medir random
+
+
+def _row(rnd: random.Random, i: int) -> dict:
+    row = {}
+    for col in COLUMNS:
+        if col in DATE_COLUMNS:
+            row[col] = None if rnd.random() < 0.3 else f"2025-04-{rnd.randint(1, 30):02d} {rnd.randint(0, 23):02d}:15:00"
+        elif col in NUMBER_COLUMNS:
+            row[col] = None if rnd.random() < 0.2 else rnd.randint(1, 10**9)
+        elif col in ("pri_cellular_number", "pri_sim_msisdn", "pri_sim_imsi", "pri_imei", "pri_card_number"):
+            row[col] = str(rnd.randint(10**9, 10**15))
+        elif col in ("pri_request", "pri_response"):
+            row[col] = "<req id='%d'>%s</req>" % (i, "x" * rnd.randint(50, 400))
+        else:
+            row[col] = None if rnd.random() < 0.3 else f"VAL_{col[4:]}_{rnd.randint(0, 50)}"
+    return row
+
+
+def _bench(fn, rows: list[dict], repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for r in rows:
+            ", ".join(fn(r))
+        times.append(time.perf_counter() - t0)
+    return statistics.median(times)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, default=1_000_000)
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    rnd = random.Random(7)
+    templates = [_row(rnd, i) for i in range(_TEMPLATES)]
+    rows = [templates[i % _TEMPLATES] for i in range(args.rows)]
+    table = build_formatters()
+
+    legacy = _bench(_format_row, rows, args.repeat)
+    typed = _bench(lambda r: format_row(r, table), rows, args.repeat)
+    changed = sum(_format_row(r) != format_row(r, table) for r in templates)
+
+    print(f"{'path':<12}{'seg':>10}{'rows/s':>14}")
+    print(f"{'_format_row':<12}{legacy:>10.2f}{args.rows / legacy:>14,.0f}")
+    print(f"{'formatters':<12}{typed:>10.2f}{args.rows / typed:>14,.0f}")
+    print(f"speedup x{legacy / typed:.2f}; filas con salida distinta: {changed}/{_TEMPLATES} (VARCHAR numéricos ahora entre comillas)")
+
+
+if __name__ == "__main__":
+    main()
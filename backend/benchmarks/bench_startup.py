@@ -0,0 +1,119 @@
+"""
+Arranque en frío: tiempo de `import provisioning_api.main` y tiempo hasta la
+primera respuesta de uvicorn, cada uno en un proceso nuevo.
+
+- import: mediana de `--repeat` imports en subprocesos (sin caches de módulos).
+- first /health: desde que se lanza uvicorn hasta el primer 200 de /health.
+- first /ai/ask: la primera pregunta en lenguaje natural después de /health,
+  que con carga perezosa es la que paga el import de langgraph.
+
+Con `--warmup` se lanza uvicorn con STARTUP_WARMUP=1: /health tarda lo que
+tarde el warm-up y /ai/ask ya no paga nada. Sale con código 1 si el import o
+el primer /health superan el presupuesto, para usarlo como control de
+regresión en CI.
+
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --warmup --health-budget 4
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import httpx
+
+BACKEND = Path(__file__).resolve().parents[1]
+
+_IMPORT_SNIPPET = (
+    "import time; t0 = time.perf_counter(); import provisioning_api.main; "
+    "print(time.perf_counter() - t0)"
+)
+
+
+def _env(warmup: bool) -> dict:
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(BACKEND), env.get("PYTHONPATH")]))
+    env["STARTUP_WARMUP"] = "1" if warmup else "0"
+    return env
+
+
+def _import_seconds(repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, "-c", _IMPORT_SNIPPET], env=_env(False),
+                             capture_output=True, text=True, check=True)
+        times.append(float(out.stdout.strip().splitlines()[-1]))
+    return statistics.median(times)
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _first_responses(warmup: bool, timeout: float) -> tuple[float, float]:
+    port = _free_port()
+    base = f"http://127.0.0.1:{port}"
+    t0 = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "provisioning_api.main:app", "--port", str(port), "--log-level", "warning"],
+        env=_env(warmup), stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+    )
+    try:
+        with httpx.Client(timeout=timeout) as client:
+            while True:
+                if proc.poll() is not None:
+                    raise SystemExit(f"uvicorn terminó antes de responder:\n{proc.stderr.read().decode()}")
+                if time.perf_counter() - t0 > timeout:
+                    raise SystemExit(f"sin respuesta de /health en {timeout:.0f}s")
+                try:
+                    if client.get(f"{base}/health").status_code == 200:
+                        break
+                except httpx.TransportError:
+                    time.sleep(0.01)
+            health = time.perf_counter() - t0
+            t1 = time.perf_counter()
+            client.post(f"{base}/api/ai/ask", json={"text": "errores de NE123 en los últimos 7 días"}).raise_for_status()
+            ask = time.perf_counter() - t1
+    finally:
+        proc.terminate()
+        proc.wait()
+    return health, ask
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--warmup", action="store_true", help="arrancar con STARTUP_WARMUP=1")
+    ap.add_argument("--import-budget", type=float, default=1.2, help="segundos (mediana)")
+    ap.add_argument("--health-budget", type=float, default=2.5, help="segundos hasta el primer /health")
+    ap.add_argument("--timeout", type=float, default=60)
+    args = ap.parse_args()
+
+    imp = _import_seconds(args.repeat)
+    runs = [_first_responses(args.warmup, args.timeout) for _ in range(args.repeat)]
+    health = statistics.median(r[0] for r in runs)
+    ask = statistics.median(r[1] for r in runs)
+
+    print(f"{'medida':<18}{'seg':>8}{'presupuesto':>14}")
+    print(f"{'import main':<18}{imp:>8.3f}{args.import_budget:>14.2f}")
+    print(f"{'primer /health':<18}{health:>8.3f}{args.health_budget:>14.2f}")
+    print(f"{'primer /ai/ask':<18}{ask:>8.3f}{'-':>14}")
+    print(f"warm-up: {'sí' if args.warmup else 'no'}")
+
+    over = [name for name, value, budget in (("import", imp, args.import_budget),
+                                             ("/health", health, args.health_budget)) if value > budget]
+    if over:
+        print(f"REGRESIÓN: fuera de presupuesto ({', '.join(over)})")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,10 +2,11 @@
 from __future__ import annotations
 from typing import TypedDict, Dict, Any, Optional, Tuple
 from datetime import datetime, timedelta
+from functools import lru_cache
 import re
-import dateparser
 
-from langgraph.graph import StateGraph, END
+from provisioning_api.core.cache import TTLCache
+from provisioning_api.core.metrics import stage
 from provisioning_api.db.sql.queries import build_sql
 
 class State(TypedDict, total=False):
@@ -53,6 +54,71 @@ def _year_bounds(d: datetime) -> SPAN:
     end = d.replace(month=12, day=31, hour=23, minute=59, second=59, microsecond=0)
     return start, end
 
+# ----------------- parser de rangos -----------------
+# Patrones compilados una vez. dateparser (lento de importar y de usar) sólo
+# se carga para rangos explícitos ("del X al Y") o meses fuera de la tabla.
+
+_WS_RE = re.compile(r"\s+")
+_RANGE_RE = re.compile(r"\b(?:del|desde)\s+(.+?)\s+(?:al|hasta)\s+(.+?)\b")
+_BETWEEN_RE = re.compile(r"\bentre\s+(.+?)\s+y\s+(.+?)\b")
+_TODAY_RE = re.compile(r"\bhoy\b")
+_DAY_BEFORE_YESTERDAY_RE = re.compile(r"\banteayer\b")
+_YESTERDAY_RE = re.compile(r"\bayer\b|\bay er\b")  # por si meten espacios raros
+_LAST_N_RE = re.compile(r"\búltim[oa]s?\s+(\d+)\s+(d[ií]as?|semanas?|meses?|a[nñ]os?|horas?)\b")
+_AGO_N_RE = re.compile(r"\bhace\s+(\d+)\s+(d[ií]as?|semanas?|meses?|a[nñ]os?|horas?)\b")
+_THIS_WEEK_RE = re.compile(r"\best[ae]\s+semana\b")
+_LAST_WEEK_RE = re.compile(r"\bsemana\s+pasad[ao]\b")
+_THIS_MONTH_RE = re.compile(r"\best[ea]\s+mes\b")
+_LAST_MONTH_RE = re.compile(r"\bmes\s+pasad[oa]\b")
+_THIS_QUARTER_RE = re.compile(r"\best[ea]\s+trimestre\b")
+_LAST_QUARTER_RE = re.compile(r"\btrimestre\s+pasad[oa]\b")
+_THIS_YEAR_RE = re.compile(r"\best[ea]\s+a[nñ]o\b")
+_LAST_YEAR_RE = re.compile(r"\ba[nñ]o\s+pasad[oa]\b")
+_LAST_WEEKEND_RE = re.compile(r"\bfin\s+de\s+semana\s+pasad[oa]?\b")
+_THIS_WEEKEND_RE = re.compile(r"\beste\s+fin\s+de\s+semana\b")
+_MONTH_START_RE = re.compile(r"(?:principio|inicio|comienzo)\s+de\s+([a-záéíóú]+)(?:\s+de\s+(\d{4}))?")
+
+# meses (y abreviaturas) que dateparser reconoce en "1 <mes> <año>"
+_MONTHS = {
+    "enero": 1, "ene": 1, "febrero": 2, "feb": 2, "marzo": 3, "mar": 3, "abril": 4, "abr": 4,
+    "mayo": 5, "junio": 6, "jun": 6, "julio": 7, "jul": 7, "agosto": 8, "ago": 8,
+    "septiembre": 9, "setiembre": 9, "sep": 9, "sept": 9, "set": 9, "octubre": 10, "oct": 10,
+    "noviembre": 11, "nov": 11, "diciembre": 12, "dic": 12,
+}
+
+_RANGE_CACHE = TTLCache(maxsize=2048, ttl=60)
+
+@lru_cache(maxsize=1)
+def _dateparser():
+    # import perezoso para no romper el arranque si falla dateparser
+    try:
+        import dateparser  # type: ignore
+    except Exception:
+        return None
+    return dateparser
+
+def _months_back(now: datetime, n: int) -> datetime:
+    # retroceso mes a mes
+    y, mth = now.year, now.month
+    for _ in range(n):
+        if mth == 1: y, mth = y - 1, 12
+        else: mth -= 1
+    return now.replace(year=y, month=mth)
+
+def _unit_start(now: datetime, n: int, unit: str) -> datetime:
+    if "seman" in unit: return now - timedelta(weeks=n)
+    if "mes" in unit: return _months_back(now, n)
+    if "a" in unit and "ño" in unit: return now.replace(year=now.year - n)
+    if "hora" in unit: return now - timedelta(hours=n)
+    return now - timedelta(days=n)
+
+def _month_start(month: str, year: int) -> Optional[datetime]:
+    num = _MONTHS.get(month)
+    if num is not None and year >= 1:
+        return datetime(year, num, 1)
+    dp = _dateparser()
+    return dp.parse(f"1 {month} {year}", languages=["es"]) if dp else None
+
 def _parse_range_free(text: str, now: Optional[datetime] = None) -> SPAN:
     """
     Soporta en español (sin LLM):
@@ -65,24 +131,29 @@ def _parse_range_free(text: str, now: Optional[datetime] = None) -> SPAN:
     - “este fin de semana”, “fin de semana pasado”
     - “principio/inicio/comienzo de <mes> [de <año>] ... (hasta hoy)”
     - “este mes hasta hoy”, “esta semana hasta hoy” (fin = hoy)
-    """
-    now = now or datetime.now()
-
-    # import perezoso para no romper el arranque si falla dateparser
-    try:
-        import dateparser  # type: ignore
-        base_parse = lambda s: dateparser.parse(s, languages=["es"], settings={"PREFER_DATES_FROM": "past"})
-    except Exception:
-        # sin dateparser: volvemos a hoy-hoy para no tirar abajo la API
-        return _day_bounds(now)
-
-    t = re.sub(r"\s+", " ", text.strip().lower())
 
+    Sin `now` explícito el resultado se memoiza por (texto normalizado, minuto).
+    """
+    t = _WS_RE.sub(" ", text.strip().lower())
+    if now is not None:
+        return _parse_range(t, now)
+    now = datetime.now()
+    key = (t, now.replace(second=0, microsecond=0))
+    span = _RANGE_CACHE.get(key)
+    if span is None:
+        span = _parse_range(t, now)
+        _RANGE_CACHE.set(key, span)
+    return span
+
+def _parse_range(t: str, now: datetime) -> SPAN:
     # Rango explícito
-    m = re.search(r"\b(?:del|desde)\s+(.+?)\s+(?:al|hasta)\s+(.+?)\b", t)
-    if not m:
-        m = re.search(r"\bentre\s+(.+?)\s+y\s+(.+?)\b", t)
+    m = _RANGE_RE.search(t) or _BETWEEN_RE.search(t)
     if m:
+        dp = _dateparser()
+        if dp is None:
+            # sin dateparser: volvemos a hoy-hoy para no tirar abajo la API
+            return _day_bounds(now)
+        base_parse = lambda s: dp.parse(s, languages=["es"], settings={"PREFER_DATES_FROM": "past"})
         s = base_parse(m.group(1))
         e = base_parse(m.group(2))
         if s and e:
@@ -93,95 +164,66 @@ def _parse_range_free(text: str, now: Optional[datetime] = None) -> SPAN:
             return s0, e0
 
     # Hoy / Ayer / Anteayer
-    if re.search(r"\bhoy\b", t):
+    if _TODAY_RE.search(t):
         return _day_bounds(now)
-    if re.search(r"\banteayer\b", t):
+    if _DAY_BEFORE_YESTERDAY_RE.search(t):
         return _day_bounds(now - timedelta(days=2))
-    if re.search(r"\bayer\b", t) or re.search(r"\bay er\b", t):  # por si meten espacios raros
+    if _YESTERDAY_RE.search(t):
         return _day_bounds(now - timedelta(days=1))
 
     # Últimos N unidades
-    m = re.search(r"\búltim[oa]s?\s+(\d+)\s+(d[ií]as?|semanas?|meses?|a[nñ]os?|horas?)\b", t)
+    m = _LAST_N_RE.search(t)
     if m:
         n = int(m.group(1)); unit = m.group(2)
-        delta = {"día": "days", "dias": "days", "días": "days", "semana": "weeks", "semanas": "weeks",
-                 "mes": "months", "meses": "months", "año": "years", "años": "years", "hora": "hours", "horas": "hours"}
-        u = "days"
-        if "seman" in unit: u = "weeks"
-        elif "mes" in unit: u = "months"
-        elif "a" in unit and "ño" in unit: u = "years"
-        elif "hora" in unit: u = "hours"
-        end = now
-        if u == "weeks": start = now - timedelta(weeks=n)
-        elif u == "months":
-            # retroceso mes a mes
-            y, mth = now.year, now.month
-            for _ in range(n):
-                if mth == 1: y, mth = y - 1, 12
-                else: mth -= 1
-            start = now.replace(year=y, month=mth)
-        elif u == "years": start = now.replace(year=now.year - n)
-        elif u == "hours":
-            start = now - timedelta(hours=n)
-        else:
-            start = now - timedelta(days=n)
-        s0 = start.replace(minute=0, second=0, microsecond=0) if u == "hours" else _day_bounds(start)[0]
-        e0 = end.replace(microsecond=0)
-        return s0, e0
+        start = _unit_start(now, n, unit)
+        s0 = start.replace(minute=0, second=0, microsecond=0) if "hora" in unit else _day_bounds(start)[0]
+        return s0, now.replace(microsecond=0)
 
     # Hace N unidades (desde hace N hasta ahora)
-    m = re.search(r"\bhace\s+(\d+)\s+(d[ií]as?|semanas?|meses?|a[nñ]os?|horas?)\b", t)
+    m = _AGO_N_RE.search(t)
     if m:
         n = int(m.group(1)); unit = m.group(2)
-        if "seman" in unit: start = now - timedelta(weeks=n)
-        elif "mes" in unit:
-            y, mth = now.year, now.month
-            for _ in range(n):
-                if mth == 1: y, mth = y - 1, 12
-                else: mth -= 1
-            start = now.replace(year=y, month=mth)
-        elif "a" in unit and "ño" in unit: start = now.replace(year=now.year - n)
-        elif "hora" in unit: start = now - timedelta(hours=n)
-        else: start = now - timedelta(days=n)
+        start = _unit_start(now, n, unit)
         s0 = start.replace(minute=0, second=0, microsecond=0) if "hora" in unit else _day_bounds(start)[0]
         return s0, now.replace(microsecond=0)
 
+    end_of_today = now.replace(hour=23, minute=59, second=59, microsecond=0)
+
     # Esta/este … / pasada(o)
-    if re.search(r"\best[ae]\s+semana\b", t):
+    if _THIS_WEEK_RE.search(t):
         s, e = _week_bounds(now)
-        e = min(e, now.replace(hour=23, minute=59, second=59, microsecond=0))
-        return s, e
-    if re.search(r"\bsemana\s+pasad[ao]\b", t):
+        return s, min(e, end_of_today)
+    if _LAST_WEEK_RE.search(t):
         s, _ = _week_bounds(now - timedelta(days=7))
         return s, (s + timedelta(days=6)).replace(hour=23, minute=59, second=59, microsecond=0)
 
-    if re.search(r"\best[ea]\s+mes\b", t):
+    if _THIS_MONTH_RE.search(t):
         s, e = _month_bounds(now)
-        e = min(e, now.replace(hour=23, minute=59, second=59, microsecond=0))
-        return s, e
-    if re.search(r"\bmes\s+pasad[oa]\b", t):
+        return s, min(e, end_of_today)
+    if _LAST_MONTH_RE.search(t):
         prev = now.replace(day=1) - timedelta(days=1)
-        s, e = _month_bounds(prev)
-        return s, e
+        return _month_bounds(prev)
 
-    if re.search(r"\best[ea]\s+trimestre\b", t):
-        s, e = _quarter_bounds(now); e = min(e, now.replace(hour=23, minute=59, second=59, microsecond=0)); return s, e
-    if re.search(r"\btrimestre\s+pasad[oa]\b", t):
+    if _THIS_QUARTER_RE.search(t):
+        s, e = _quarter_bounds(now)
+        return s, min(e, end_of_today)
+    if _LAST_QUARTER_RE.search(t):
         s, _ = _quarter_bounds(now.replace(month=((now.month - 4) % 12) + 1))
-        e = _quarter_bounds(s)[1]; return s, e
+        return s, _quarter_bounds(s)[1]
 
-    if re.search(r"\best[ea]\s+a[nñ]o\b", t):
-        s, e = _year_bounds(now); e = min(e, now.replace(hour=23, minute=59, second=59, microsecond=0)); return s, e
-    if re.search(r"\ba[nñ]o\s+pasad[oa]\b", t):
-        s, e = _year_bounds(now.replace(year=now.year - 1)); return s, e
+    if _THIS_YEAR_RE.search(t):
+        s, e = _year_bounds(now)
+        return s, min(e, end_of_today)
+    if _LAST_YEAR_RE.search(t):
+        return _year_bounds(now.replace(year=now.year - 1))
 
     # Fin de semana
-    if re.search(r"\bfin\s+de\s+semana\s+pasad[oa]?\b", t):
+    if _LAST_WEEKEND_RE.search(t):
         # sábado y domingo pasados
         last_sun = now - timedelta(days=(now.weekday() + 1))
         sat = last_sun - timedelta(days=1)
         return _day_bounds(sat)[0], _day_bounds(last_sun)[1]
-    if re.search(r"\beste\s+fin\s+de\s+semana\b", t):
+    if _THIS_WEEKEND_RE.search(t):
         # siguiente fin de semana del período actual
         wstart, _ = _week_bounds(now)
         sat = wstart + timedelta(days=5)
@@ -189,10 +231,10 @@ def _parse_range_free(text: str, now: Optional[datetime] = None) -> SPAN:
         return _day_bounds(sat)[0], _day_bounds(sun)[1]
 
     # Principio/inicio/comienzo de <mes> [de <año>] (hasta hoy si no hay fin)
-    m = re.search(r"(?:principio|inicio|comienzo)\s+de\s+([a-záéíóú]+)(?:\s+de\s+(\d{4}))?", t)
+    m = _MONTH_START_RE.search(t)
     if m:
-        month = m.group(1); year = int(m.group(2)) if m.group(2) else now.year
-        s = dateparser.parse(f"1 {month} {year}", languages=["es"])
+        year = int(m.group(2)) if m.group(2) else now.year
+        s = _month_start(m.group(1), year)
         if s:
             _, e = _day_bounds(now)
             return _day_bounds(s)[0], e
@@ -202,33 +244,47 @@ def _parse_range_free(text: str, now: Optional[datetime] = None) -> SPAN:
 
 # ----------------- NODOS -----------------
 
-def parse_text(state: State) -> State:
-    txt = str(state.get("text",""))
+# pri_ne_id: acepta “pri_ne_id DTH”, “pri_ne_id=DTH”, “para/en/sobre el DTH”, “ne id DTH”
+_NE_ID_RES = (
+    re.compile(r"\bpri[_\s-]?ne[_\s-]?id\b(?:\s*(?:=|:)\s*|\s+(?:es|de)?\s*)?([a-z0-9_-]{2,})\b", re.I),
+    re.compile(r"\b(?:en|para|sobre)\s+(?:el|la|los|las)?\s*([a-z0-9_-]{2,})\b", re.I),
+    re.compile(r"\bne\s*id\b\s*[:=]?\s*([a-z0-9_-]{2,})\b", re.I),
+)
+_PRI_ID_RE = re.compile(r"\bpri_id\s*[:=]\s*(\d+)\b", re.I)
+_ACTION_RES = (
+    re.compile(r"\bpri_action\s*[:=]\s*([a-z0-9_-]+)\b", re.I),
+    re.compile(r"\b(?:action|acciones?)\s+([a-z0-9_-]+)\b", re.I),
+)
+
+def _first_match(patterns, txt: str):
+    for pattern in patterns:
+        m = pattern.search(txt)
+        if m:
+            return m
+    return None
+
+def parse_filters(txt: str, now: Optional[datetime] = None) -> Dict[str, Any]:
     filters: Dict[str, Any] = {}
 
-    # pri_ne_id: acepta “pri_ne_id DTH”, “pri_ne_id=DTH”, “para/en/sobre el DTH”, “ne id DTH”
-    m = re.search(r"\bpri[_\s-]?ne[_\s-]?id\b(?:\s*(?:=|:)\s*|\s+(?:es|de)?\s*)?([a-z0-9_-]{2,})\b", txt, flags=re.I)
-    if not m:
-        m = re.search(r"\b(?:en|para|sobre)\s+(?:el|la|los|las)?\s*([a-z0-9_-]{2,})\b", txt, flags=re.I)
-    if not m:
-        m = re.search(r"\bne\s*id\b\s*[:=]?\s*([a-z0-9_-]{2,})\b", txt, flags=re.I)
+    m = _first_match(_NE_ID_RES, txt)
     if m:
         filters["pri_ne_id"] = m.group(1).upper()
 
-    m = re.search(r"\bpri_id\s*[:=]\s*(\d+)\b", txt, flags=re.I)
+    m = _PRI_ID_RE.search(txt)
     if m: filters["pri_id"] = int(m.group(1))
 
-    m = re.search(r"\bpri_action\s*[:=]\s*([a-z0-9_-]+)\b", txt, flags=re.I)
-    if not m:
-        m = re.search(r"\b(?:action|acciones?)\s+([a-z0-9_-]+)\b", txt, flags=re.I)
+    m = _first_match(_ACTION_RES, txt)
     if m: filters["pri_action"] = m.group(1).upper()
 
-    start, end = _parse_range_free(txt)
+    start, end = _parse_range_free(txt, now)
     filters["start_date"] = start.strftime("%Y-%m-%d %H:%M:%S")
     filters["end_date"]   = end.strftime("%Y-%m-%d %H:%M:%S")
     filters.setdefault("limit", 200)
     filters.setdefault("offset", 0)
+    return filters
 
+def parse_text(state: State) -> State:
+    filters = parse_filters(str(state.get("text","")))
     state["filters"] = filters
     state["errors"] = [] if filters.get("pri_ne_id") else ["Falta pri_ne_id"]
     return state
@@ -248,17 +304,37 @@ def prepare_sql(state: State) -> State:
     state["sql"] = sql
     return state
 
-graph = StateGraph(State)
-graph.add_node("parse_text", parse_text)
-graph.add_node("validate", validate)
-graph.add_node("prepare_sql", prepare_sql)
-graph.set_entry_point("parse_text")
-graph.add_edge("parse_text", "validate")
-graph.add_edge("validate", "prepare_sql")
-graph.add_edge("prepare_sql", END)
-
-app_graph = graph.compile()
+@lru_cache(maxsize=1)
+def get_app_graph():
+    """Compila el grafo la primera vez que se usa (o en el warm-up del arranque):
+    importar langgraph es la parte más cara de levantar la app."""
+    from langgraph.graph import StateGraph, END
+
+    graph = StateGraph(State)
+    graph.add_node("parse_text", parse_text)
+    graph.add_node("validate", validate)
+    graph.add_node("prepare_sql", prepare_sql)
+    graph.set_entry_point("parse_text")
+    graph.add_edge("parse_text", "validate")
+    graph.add_edge("validate", "prepare_sql")
+    graph.add_edge("prepare_sql", END)
+    return graph.compile()
+
+def warm_up() -> None:
+    """Carga por adelantado lo que el primer /ai/* cargaría bajo demanda."""
+    get_app_graph()
+    _dateparser()
+
+def _result(out: dict) -> dict:
+    return {"filters": out.get("filters", {}), "sql": out.get("sql",""), "errors": out.get("errors", [])}
 
 def run_pipeline(text: str) -> dict:
-    out = app_graph.invoke({"text": text})
-    return {"filters": out.get("filters", {}), "sql": out.get("sql",""), "errors": out.get("errors", [])}
+    with stage("nl_pipeline"):
+        out = get_app_graph().invoke({"text": text})
+    return _result(out)
+
+def run_pipeline_batch(texts: list[str]) -> list[dict]:
+    """Varias preguntas a la vez con `batch` del grafo (corre en paralelo por thread)."""
+    with stage("nl_pipeline"):
+        outs = get_app_graph().batch([{"text": t} for t in texts])
+    return [_result(out) for out in outs]
@@ -1,10 +1,30 @@
 """Shared API dependencies."""
 from __future__ import annotations
 
+from typing import Optional
+
+from fastapi import Header
+
 from provisioning_api.core.config import Settings, get_settings
+from provisioning_api.services.response_cache import BYPASS, REFRESH, USE
 
 
 def get_app_settings() -> Settings:
     """Provide application settings for dependency injection."""
 
     return get_settings()
+
+
+def get_cache_policy(cache_control: Optional[str] = Header(default=None)) -> str:
+    """
+    Map the request's Cache-Control header to a response-cache policy:
+    `no-store` skips the cache entirely, `no-cache` forces a fresh read that
+    replaces the cached entry.
+    """
+
+    directives = {d.strip().lower() for d in (cache_control or "").split(",")}
+    if "no-store" in directives:
+        return BYPASS
+    if "no-cache" in directives:
+        return REFRESH
+    return USE
@@ -1,5 +1,10 @@
-from fastapi import APIRouter, Body
+from fastapi import APIRouter, Body, Depends, HTTPException
 from provisioning_api.ai.graph import run_pipeline
+from provisioning_api.api.deps import get_app_settings, get_cache_policy
+from provisioning_api.db.oracle import ResultTooLarge
+from provisioning_api.services.admission import Overloaded
+from provisioning_api.schemas.record import AiQueryRequest
+from provisioning_api.services.ai_service import query, query_batch
 
 router = APIRouter()
 
@@ -10,3 +15,31 @@ def ask(payload: dict = Body(...)):
     if not text:
         return {"filters": {}, "sql": "", "errors": ["Texto vacío."]}
     return run_pipeline(text)
+
+
+@router.post("/ai/query")
+async def ai_query(body: AiQueryRequest, cache: str = Depends(get_cache_policy), settings=Depends(get_app_settings)):
+    """Pregunta en texto libre -> filtros + página de registros + opciones, en un solo request."""
+    db = body.db.model_dump()
+    try:
+        if body.texts is not None:
+            texts = [t.strip() for t in body.texts]
+            if not texts or not all(texts):
+                raise HTTPException(status_code=422, detail="texts no puede estar vacío ni tener textos vacíos.")
+            if len(texts) > settings.ai_query_batch_max:
+                raise HTTPException(status_code=422, detail=f"Máximo {settings.ai_query_batch_max} preguntas por request.")
+            return {"results": await query_batch(db, texts, cache)}
+        text = (body.text or "").strip()
+        if not text:
+            return {"filters": {}, "sql": "", "errors": ["Texto vacío."], "records": None, "options": None}
+        return await query(db, text, cache)
+    except HTTPException:
+        raise
+    except Overloaded as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+    except ResultTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
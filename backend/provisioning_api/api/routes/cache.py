@@ -0,0 +1,15 @@
+from fastapi import APIRouter
+
+from provisioning_api.services import response_cache
+
+router = APIRouter()
+
+
+@router.get("/cache/stats")
+async def cache_stats():
+    return response_cache.stats()
+
+
+@router.delete("/cache")
+async def cache_purge():
+    return {"purged": response_cache.purge()}
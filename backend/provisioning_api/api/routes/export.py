@@ -1,15 +1,37 @@
-from fastapi import APIRouter, HTTPException, Response
-from provisioning_api.schemas.record import RecordsRequest
-from provisioning_api.services.records_service import generate_inserts
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
+from provisioning_api.schemas.record import ExportRequest
+from provisioning_api.services.admission import Overloaded
+from provisioning_api.services.records_service import stream_export
+from provisioning_api.utils.export_formats import filename_for, media_type_for, resolve
 
 router = APIRouter()
 
 
+async def _prepend(first: bytes, rest):
+    if first:
+        yield first
+    async for chunk in rest:
+        yield chunk
+
+
 @router.post("/generate-inserts")
-def post_export(body: RecordsRequest):
+@router.post("/export")
+async def post_export(body: ExportRequest):
+    if not body.filters.pri_ne_id:
+        raise HTTPException(status_code=422, detail="pri_ne_id es requerido")
+    try:
+        fmt, compression = resolve(body.format, body.compression)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    chunks = stream_export(body.db.model_dump(), body.filters.model_dump(), fmt, compression)
     try:
-        sql = generate_inserts(body.db.model_dump(), body.filters.model_dump())
-        return Response(content=sql, media_type="application/sql",
-                        headers={"Content-Disposition": "attachment; filename=provisioning_inserts.sql"})
+        # el primer chunk abre la conexión y ejecuta la consulta: si falla,
+        # todavía podemos responder con un error HTTP en lugar de un archivo cortado
+        first = await anext(chunks, b"")
+    except Overloaded as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": str(e.retry_after)})
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    return StreamingResponse(_prepend(first, chunks), media_type=media_type_for(fmt, compression),
+                             headers={"Content-Disposition": f"attachment; filename={filename_for(fmt, compression)}"})
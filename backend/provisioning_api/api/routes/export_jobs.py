@@ -0,0 +1,60 @@
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import FileResponse
+
+from provisioning_api.schemas.record import ExportJobResumeRequest, ExportRequest
+from provisioning_api.services import export_jobs
+from provisioning_api.services.export_jobs import JobNotFound, JobStateError
+
+router = APIRouter()
+
+
+@router.post("/export/jobs", status_code=202)
+async def post_export_job(body: ExportRequest):
+    try:
+        return await export_jobs.submit(body.db.model_dump(), body.filters.model_dump(), body.format, body.compression)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+
+@router.get("/export/jobs")
+async def get_export_jobs():
+    return {"jobs": export_jobs.list_jobs()}
+
+
+@router.get("/export/jobs/{job_id}")
+async def get_export_job(job_id: str):
+    try:
+        return export_jobs.status(job_id)
+    except JobNotFound as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+
+@router.post("/export/jobs/{job_id}/resume", status_code=202)
+async def post_export_job_resume(job_id: str, body: ExportJobResumeRequest):
+    try:
+        return await export_jobs.resume(job_id, body.db.model_dump() if body.db else None)
+    except JobNotFound as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except JobStateError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+
+@router.get("/export/jobs/{job_id}/download")
+async def get_export_job_download(job_id: str):
+    """El archivo terminado; FileResponse atiende `Range` para retomar descargas cortadas."""
+    try:
+        path, filename, media_type = export_jobs.download(job_id)
+    except JobNotFound as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except JobStateError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return FileResponse(path, media_type=media_type, filename=filename)
+
+
+@router.delete("/export/jobs/{job_id}", status_code=204)
+async def delete_export_job(job_id: str):
+    """Cancela el job si está corriendo y borra sus archivos."""
+    try:
+        await export_jobs.cancel(job_id)
+    except JobNotFound as e:
+        raise HTTPException(status_code=404, detail=str(e))
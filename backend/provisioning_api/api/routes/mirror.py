@@ -0,0 +1,17 @@
+from fastapi import APIRouter
+
+from provisioning_api.core.config import get_settings
+from provisioning_api.mirror import store
+
+router = APIRouter()
+
+
+@router.get("/mirror/status")
+async def mirror_status():
+    """Watermark, cobertura y filas por NE del espejo local."""
+    s = get_settings()
+    return {
+        "enabled": s.mirror_enabled,
+        "ne_ids": s.mirror_ne_ids,
+        "ne": store.states() if s.mirror_enabled else [],
+    }
@@ -1,19 +1,24 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException
 
+from provisioning_api.api.deps import get_cache_policy
 from provisioning_api.schemas.record import RecordsRequest
-from provisioning_api.db.oracle import connect
-from provisioning_api.repositories.options_repository import get_distinct_options
+from provisioning_api.db.oracle import ResultTooLarge
+from provisioning_api.services.admission import Overloaded
+from provisioning_api.services.options_service import get_distinct_options
 
 router = APIRouter()
 
 
 @router.post("/options")
-def post_options(body: RecordsRequest):
+async def post_options(body: RecordsRequest, cache: str = Depends(get_cache_policy)):
     f = body.filters.model_dump()
     if not f.get("pri_ne_id"):
         raise HTTPException(status_code=422, detail="pri_ne_id es requerido")
     try:
-        with connect(body.db.model_dump()) as con:
-            return get_distinct_options(con, f)
+        return await get_distinct_options(body.db.model_dump(), f, cache)
+    except Overloaded as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+    except ResultTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
     except Exception as e:  # pragma: no cover - unexpected errors
         raise HTTPException(status_code=500, detail=str(e))
@@ -1,14 +1,73 @@
-from fastapi import APIRouter, HTTPException
-from provisioning_api.schemas.record import RecordsRequest, RecordsResponse, Record
-from provisioning_api.services.records_service import get_records
+from fastapi import APIRouter, Depends, HTTPException, Response
+from fastapi.responses import JSONResponse
+from provisioning_api.api.deps import get_cache_policy
+from provisioning_api.core.metrics import stage
+from provisioning_api.db.oracle import ResultTooLarge
+from provisioning_api.services.admission import Overloaded
+from provisioning_api.schemas.record import PayloadBatchRequest, PayloadRequest, RecordsPageRequest, RecordsResponse
+from provisioning_api.services.records_service import get_payloads, get_records
+from provisioning_api.utils.columnar import ARROW_MEDIA_TYPE, arrow_available, to_arrow_ipc
+from provisioning_api.utils.records_json import PAGE_FIELDS, render_records_json
 
 router = APIRouter()
 
 
+def _arrow_response(page: dict) -> Response:
+    meta = {k: page.get(k) for k in PAGE_FIELDS}
+    headers = {f"X-{k.replace('_', '-').title()}": str(v) for k, v in meta.items() if v is not None}
+    with stage("encode"):
+        content = to_arrow_ipc(page["data"], meta)
+    return Response(content=content, media_type=ARROW_MEDIA_TYPE, headers=headers)
+
+
 @router.post("/records", response_model=RecordsResponse)
-def post_records(body: RecordsRequest):
+async def post_records(body: RecordsPageRequest, cache: str = Depends(get_cache_policy)):
+    if body.format == "arrow" and not arrow_available():
+        raise HTTPException(status_code=406, detail="El formato arrow requiere pyarrow instalado en el servidor.")
+    try:
+        shape = "rows" if body.format == "json" else "columnar"
+        page = await get_records(body.db.model_dump(), body.filters.model_dump(), cache, shape=shape)
+        if body.format == "arrow":
+            return _arrow_response(page)
+        if body.format == "columnar":
+            with stage("encode"):
+                return JSONResponse(content=page)
+        # las filas salen de la proyección fija de build_sql: se serializan sin re-validar
+        return Response(content=render_records_json(page), media_type="application/json")
+    except Overloaded as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except ResultTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/records/payload")
+async def post_records_payload(body: PayloadBatchRequest):
+    try:
+        return {"items": await get_payloads(body.db.model_dump(), body.pri_ids)}
+    except Overloaded as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except ResultTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/records/{pri_id}/payload")
+async def post_record_payload(pri_id: int, body: PayloadRequest):
     try:
-        items, total = get_records(body.db.model_dump(), body.filters.model_dump())
-        return {"items": [Record(**r) for r in items], "total": total}
+        items = await get_payloads(body.db.model_dump(), [pri_id])
+    except Overloaded as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+    except ResultTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    if not items:
+        raise HTTPException(status_code=404, detail=f"No existe el registro {pri_id}")
+    return items[0]
@@ -0,0 +1,22 @@
+from fastapi import APIRouter, HTTPException
+
+from provisioning_api.schemas.record import ReplayRequest
+from provisioning_api.services.admission import Overloaded
+from provisioning_api.services.replay_service import replay_records
+
+router = APIRouter()
+
+
+@router.post("/replay")
+async def post_replay(body: ReplayRequest):
+    if not body.filters.pri_ne_id:
+        raise HTTPException(status_code=422, detail="pri_ne_id es requerido")
+    if body.batch_size < 1:
+        raise HTTPException(status_code=422, detail="batch_size debe ser mayor a 0")
+    try:
+        return await replay_records(body.source.model_dump(), body.target.model_dump(),
+                                    body.filters.model_dump(), body.batch_size)
+    except Overloaded as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
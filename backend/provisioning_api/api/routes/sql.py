@@ -0,0 +1,53 @@
+import json
+from datetime import datetime
+
+from fastapi import APIRouter, Response
+
+from provisioning_api.core.config import get_settings
+from provisioning_api.db import flight_recorder
+from provisioning_api.db.sql import variants
+
+router = APIRouter()
+
+
+@router.get("/sql/variants")
+async def sql_variants(all: bool = False):
+    """Estadísticas por variante de SQL (con `all=true` incluye las que no se ejecutaron)."""
+    return {
+        "stmt_cache_size": get_settings().oracle_stmt_cache_size,
+        "variants": variants.stats(executed_only=not all),
+    }
+
+
+@router.delete("/sql/variants")
+async def sql_variants_reset():
+    return {"reset": variants.reset()}
+
+
+@router.get("/sql/slow-queries")
+async def slow_queries(plans: bool = False):
+    """Consultas lentas más recientes primero; con `plans=true` cada una trae su plan."""
+    s = get_settings()
+    return {
+        "threshold_ms": s.slow_query_threshold_ms,
+        "entries": flight_recorder.entries(with_plans=plans),
+    }
+
+
+@router.get("/sql/slow-queries/export")
+async def slow_queries_export():
+    body = {
+        "exported_at": datetime.now().isoformat(timespec="seconds"),
+        "entries": flight_recorder.entries(),
+        "plans": flight_recorder.plans(),
+    }
+    return Response(
+        content=json.dumps(body, ensure_ascii=False, indent=2, default=str),
+        media_type="application/json",
+        headers={"Content-Disposition": 'attachment; filename="slow_queries.json"'},
+    )
+
+
+@router.delete("/sql/slow-queries")
+async def slow_queries_clear():
+    return {"cleared": flight_recorder.clear()}
@@ -0,0 +1,27 @@
+from fastapi import APIRouter, Depends, HTTPException
+
+from provisioning_api.api.deps import get_cache_policy
+from provisioning_api.schemas.record import StatsRequest
+from provisioning_api.db.oracle import ResultTooLarge
+from provisioning_api.services.admission import Overloaded
+from provisioning_api.services.stats_service import get_stats
+
+router = APIRouter()
+
+
+@router.post("/stats")
+async def post_stats(body: StatsRequest, cache: str = Depends(get_cache_policy)):
+    """Conteos por bucket de tiempo (TRUNC) y por pri_status, pri_action o pri_error_code."""
+    f = body.filters.model_dump()
+    if not f.get("pri_ne_id"):
+        raise HTTPException(status_code=422, detail="pri_ne_id es requerido")
+    try:
+        return await get_stats(body.db.model_dump(), f, body.bucket, body.dimension, cache)
+    except Overloaded as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+    except ResultTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except Exception as e:  # pragma: no cover - unexpected errors
+        raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,34 @@
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
+
+from provisioning_api.schemas.record import RecordsRequest
+from provisioning_api.services.tail_service import TooManyPollers, open_tail, pollers
+
+router = APIRouter()
+
+
+@router.post("/records/tail")
+async def post_records_tail(body: RecordsRequest):
+    """
+    Server-Sent Events con las filas nuevas del NE y filtros (start_date,
+    end_date y paginación se ignoran): `ready`, `rows` ({items, cursor}),
+    `reset` si el cliente se atrasó y `error` si falló una lectura.
+    """
+    f = body.filters.model_dump()
+    if not f.get("pri_ne_id"):
+        raise HTTPException(status_code=422, detail="pri_ne_id es requerido")
+    try:
+        events = open_tail(body.db.model_dump(), f)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except TooManyPollers as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    return StreamingResponse(
+        events, media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/records/tail/pollers")
+async def get_tail_pollers():
+    return pollers()
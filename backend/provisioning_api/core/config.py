@@ -1,4 +1,4 @@
-from typing import List
+from typing import List, Optional
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from pydantic import field_validator
 
@@ -9,9 +9,109 @@ class Settings(BaseSettings):
     api_prefix: str = "/api"
     cors_origins: List[str] = ["http://localhost:5173", "http://127.0.0.1:5173"]
 
+    # Pools de sesiones Oracle (uno por host/puerto/servicio/usuario)
+    oracle_pool_min: int = 1
+    oracle_pool_max: int = 8
+    oracle_pool_increment: int = 1
+    oracle_pool_max_pools: int = 16
+    oracle_pool_idle_ttl: int = 600          # segundos sin uso antes de cerrar el pool
+    oracle_pool_ping_interval: int = 60      # segundos; 0 = ping en cada acquire, <0 = nunca
+    oracle_pool_wait_timeout: int = 10000    # milisegundos esperando una sesión libre
+    oracle_drcp_cclass: Optional[str] = None  # connection class DRCP (activa :pooled)
+    oracle_fetch_arraysize: int = 1000       # filas por round-trip al leer en streaming
+    oracle_stmt_cache_size: int = 64         # statement cache por sesión (variantes de queries.sql_variant)
+
+    # Tope para lecturas sin paginar que se materializan en memoria
+    max_unpaginated_rows: int = 100_000
+    max_unpaginated_bytes: int = 256 * 1024 * 1024
+
+    # Totales de /records reutilizables entre páginas del mismo filtro
+    count_cache_ttl: int = 120               # segundos
+    count_cache_size: int = 2048
+
+    # Cache de respuestas de /records y /options
+    response_cache_enabled: bool = True
+    response_cache_max_bytes: int = 128 * 1024 * 1024
+    response_cache_max_entries: int = 4096
+    response_cache_ttl_past: int = 3600      # ventanas con end_date ya asentado (datos inmutables)
+    response_cache_ttl_live: int = 15        # ventanas que incluyen "ahora"
+    response_cache_settle_seconds: int = 300  # margen para filas que llegan con fecha atrasada
+
+    # Admisión por perfil de base: requests en curso contra Oracle y fila de espera (429 al superarla)
+    admission_enabled: bool = True
+    admission_max_concurrent: int = 8
+    admission_max_queue: int = 32
+    admission_queue_timeout: float = 5.0     # segundos esperando cupo antes del 429
+
+    # /records con varios NE (pri_ne_ids o un pri_ne_group sin NE): una consulta por NE en paralelo
+    fanout_max_ne: int = 50
+    fanout_concurrency: int = 4              # sesiones del pool a la vez por request
+    fanout_group_ttl: int = 300              # segundos que se recuerdan los NE de un pri_ne_group
+
+    # Live tail de /records: un poller por (base, NE, filtros) compartido por todos los suscriptores
+    tail_min_interval: float = 1.0           # segundos; se duplica sin filas nuevas
+    tail_max_interval: float = 15.0
+    tail_batch_rows: int = 500
+    tail_queue_size: int = 100               # eventos por suscriptor antes de mandarle un reset
+    tail_heartbeat: float = 15.0
+    tail_max_pollers: int = 50
+
+    # /stats: buckets por request y cache de buckets completos ya asentados
+    stats_max_buckets: int = 5000
+    stats_bucket_cache_size: int = 200_000
+    stats_bucket_cache_ttl: int = 86400
+
+    # /ai/query: preguntas por request y cuántas se ejecutan a la vez contra Oracle
+    ai_query_batch_max: int = 20
+    ai_query_concurrency: int = 4
+
+    # Registro de consultas lentas de /records y /options (ver db/flight_recorder.py)
+    slow_query_enabled: bool = True
+    slow_query_threshold_ms: int = 2000
+    slow_query_buffer_size: int = 200
+    slow_query_explain: bool = True          # EXPLAIN PLAN una vez por forma de SQL y base
+    slow_query_max_plans: int = 500          # planes guardados (LRU)
+
+    # Script de INSERTs por lotes (format=sql_batch) y replay directo
+    export_insert_all_rows: int = 500
+    export_commit_every: int = 5000
+    replay_max_errors: int = 100             # errores de lote detallados en la respuesta
+
+    # Exports en segundo plano (/export/jobs): tramos por ventana, lectura en paralelo y spool a disco
+    export_jobs_dir: str = "export_jobs"
+    export_job_slices: int = 8               # tramos de la ventana (de igual duración)
+    export_job_concurrency: int = 4          # tramos leyéndose a la vez (sesiones del pool por job)
+    export_job_batch_rows: int = 5000        # filas por lectura y por checkpoint
+    export_jobs_max_running: int = 2         # jobs corriendo a la vez; el resto queda "queued"
+    export_job_ttl: int = 86400              # segundos que se conserva un job terminado
+
+    # Opciones de filtros cacheadas por (pri_ne_id, día calendario)
+    options_day_cache_size: int = 20000
+    options_day_cache_ttl: int = 86400
+
+    # Espejo local (SQLite) de los NE más consultados; ver provisioning_api/mirror
+    mirror_enabled: bool = False
+    mirror_sync_in_app: bool = True          # 0 = el sync corre aparte (python -m provisioning_api.mirror.sync)
+    mirror_path: str = "mirror.sqlite3"
+    mirror_db_host: Optional[str] = None
+    mirror_db_port: int = 1521
+    mirror_db_service: Optional[str] = None
+    mirror_db_user: Optional[str] = None
+    mirror_db_password: Optional[str] = None
+    mirror_ne_ids: List[str] = []
+    mirror_history_days: int = 7
+    mirror_sync_interval: int = 30           # segundos entre pasadas
+    mirror_batch_rows: int = 5000
+    mirror_lookback_seconds: int = 300       # re-lectura antes del watermark (filas con fecha atrasada)
+    mirror_max_staleness: int = 120          # atraso tolerado para ventanas que llegan a "ahora"
+
+    # Carga al arrancar lo que de otro modo se carga con el primer request
+    # (modo del driver Oracle, grafo de /ai, dateparser); ver main.lifespan
+    startup_warmup: bool = False
+
     model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8")
 
-    @field_validator("cors_origins", mode="before")
+    @field_validator("cors_origins", "mirror_ne_ids", mode="before")
     @classmethod
     def _csv(cls, v):
         if isinstance(v, str):
@@ -0,0 +1,143 @@
+"""
+Tiempos por etapa de cada request y métricas en formato Prometheus.
+
+`stage("execute")` mide un bloque y lo suma al request en curso (un
+ContextVar que arma el middleware de main.py) y al histograma de etapas. Al
+terminar el request los tiempos salen en el header `Server-Timing` y en los
+histogramas que publica `/metrics`. Fuera de un request (scripts, workers)
+sólo se alimentan los histogramas.
+
+Etapas: connect, execute, fetch, convert, encode, nl_pipeline.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+_LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+_ROWS_BUCKETS = (0, 1, 10, 50, 200, 1000, 5000, 20000, 100000, 1000000)
+_BYTES_BUCKETS = (1024, 10240, 102400, 1048576, 10485760, 104857600, 1073741824)
+
+
+class Histogram:
+    """Histograma acumulativo con labels, sin dependencias (text format 0.0.4)."""
+
+    def __init__(self, name: str, help_text: str, buckets: tuple, labelnames: tuple = ()):
+        self.name, self.help, self.buckets, self.labelnames = name, help_text, buckets, labelnames
+        self._series: dict[tuple, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels: str) -> None:
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                # [conteo por bucket..., +Inf, suma]
+                series = self._series[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += 1
+            series[-1] += value
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted(self._series.items())
+        for labels, series in items:
+            base = ",".join(f'{k}="{v}"' for k, v in zip(self.labelnames, labels))
+            sep = "," if base else ""
+            for bound, count in zip(self.buckets, series):
+                lines.append(f'{self.name}_bucket{{{base}{sep}le="{bound}"}} {count}')
+            lines.append(f'{self.name}_bucket{{{base}{sep}le="+Inf"}} {series[-2]}')
+            suffix = f"{{{base}}}" if base else ""
+            lines.append(f"{self.name}_sum{suffix} {series[-1]:.6f}")
+            lines.append(f"{self.name}_count{suffix} {series[-2]}")
+        return lines
+
+
+REQUEST_SECONDS = Histogram(
+    "provisioning_http_request_duration_seconds", "Duración de los requests HTTP.",
+    _LATENCY_BUCKETS, ("method", "route", "status"),
+)
+STAGE_SECONDS = Histogram(
+    "provisioning_stage_duration_seconds", "Duración de cada etapa (connect, execute, fetch, ...).",
+    _LATENCY_BUCKETS, ("stage",),
+)
+RESPONSE_ROWS = Histogram(
+    "provisioning_http_response_rows", "Filas leídas de Oracle por request.", _ROWS_BUCKETS, ("route",),
+)
+RESPONSE_BYTES = Histogram(
+    "provisioning_http_response_bytes", "Bytes del cuerpo de respuesta por request.", _BYTES_BUCKETS, ("route",),
+)
+HISTOGRAMS = (REQUEST_SECONDS, STAGE_SECONDS, RESPONSE_ROWS, RESPONSE_BYTES)
+
+
+class RequestMetrics:
+    __slots__ = ("started", "stages", "rows", "bytes")
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.stages: dict[str, float] = defaultdict(float)
+        self.rows = 0
+        self.bytes = 0
+
+    def server_timing(self, total: float | None = None) -> str:
+        parts = [f"{name};dur={secs * 1000:.1f}" for name, secs in self.stages.items()]
+        parts.append(f'rows;desc="{self.rows}"')
+        if total is not None:
+            parts.append(f"total;dur={total * 1000:.1f}")
+        return ", ".join(parts)
+
+
+_CURRENT: ContextVar[RequestMetrics | None] = ContextVar("request_metrics", default=None)
+
+
+def begin_request():
+    """Arranca la medición de un request; devuelve (métricas, token para `end_request`)."""
+    m = RequestMetrics()
+    return m, _CURRENT.set(m)
+
+
+def end_request(token) -> None:
+    _CURRENT.reset(token)
+
+
+def current() -> RequestMetrics | None:
+    return _CURRENT.get()
+
+
+@contextmanager
+def stage(name: str):
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - t0
+        STAGE_SECONDS.observe(elapsed, name)
+        m = _CURRENT.get()
+        if m is not None:
+            m.stages[name] += elapsed
+
+
+def add_rows(n: int) -> None:
+    m = _CURRENT.get()
+    if m is not None:
+        m.rows += n
+
+
+def observe_request(m: RequestMetrics, method: str, route: str, status: int) -> float:
+    total = time.perf_counter() - m.started
+    REQUEST_SECONDS.observe(total, method, route, str(status))
+    RESPONSE_ROWS.observe(m.rows, route)
+    RESPONSE_BYTES.observe(m.bytes, route)
+    return total
+
+
+def render_prometheus() -> str:
+    lines: list[str] = []
+    for h in HISTOGRAMS:
+        lines.extend(h.render())
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,129 @@
+"""
+Registro de consultas lentas: cada statement registrado (variantes de
+/records, /options y payloads) que supera `SLOW_QUERY_THRESHOLD_MS` queda en
+un buffer circular con su variante, binds redactados, tiempos por etapa del
+request y filas. La primera vez que aparece una forma de SQL en una base se
+captura su plan (`EXPLAIN PLAN` + `DBMS_XPLAN.DISPLAY`) en segundo plano, en
+otra sesión del pool: el request que ya fue lento no espera el plan. Se
+guardan hasta `SLOW_QUERY_MAX_PLANS` planes (LRU).
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import itertools
+from collections import OrderedDict, deque
+from contextvars import ContextVar
+from datetime import datetime
+
+from provisioning_api.core.config import get_settings
+from provisioning_api.core.logging import logger
+from provisioning_api.core.metrics import current
+from provisioning_api.db.sql import variants
+
+# binds que describen la ventana/forma de la consulta; el resto se redacta
+_VISIBLE_BINDS = frozenset({
+    "start_date", "end_date", "pri_ne_id", "pri_action", "pri_ne_group", "pri_status",
+    "limit", "offset", "k_date",
+})
+
+_settings = get_settings()
+_ENTRIES: deque = deque(maxlen=_settings.slow_query_buffer_size)
+_PLANS: "OrderedDict[str, dict]" = OrderedDict()
+_IDS = itertools.count(1)
+_TASKS: set[asyncio.Task] = set()
+# perfil de la sesión en uso (lo fija db.oracle.connect_async): el plan se pide en otra sesión del mismo
+SESSION_DB: ContextVar[dict | None] = ContextVar("flight_recorder_db", default=None)
+
+
+def redact(binds: dict) -> dict:
+    out = {}
+    for k, v in (binds or {}).items():
+        if k in _VISIBLE_BINDS or v is None:
+            out[k] = v
+        else:
+            out[k] = f"<{type(v).__name__}:{len(str(v))}>"
+    return out
+
+
+def _plan_key(con, sql: str) -> str:
+    """Forma de SQL por base: el plan depende de estadísticas e índices de cada una."""
+    digest = hashlib.sha1(sql.encode("utf-8")).hexdigest()[:16]
+    return f"{getattr(con, 'dsn', None) or ''}#{digest}"
+
+
+async def _explain(con, sql: str, statement_id: str) -> list[str]:
+    cur = con.cursor()
+    await cur.execute(f"EXPLAIN PLAN SET STATEMENT_ID = '{statement_id}' FOR {sql}")
+    await cur.execute(
+        "SELECT plan_table_output FROM TABLE(DBMS_XPLAN.DISPLAY('PLAN_TABLE', :sid, 'TYPICAL'))",
+        {"sid": statement_id},
+    )
+    lines = [r[0] for r in await cur.fetchall()]
+    await cur.execute("DELETE FROM plan_table WHERE statement_id = :sid", {"sid": statement_id})
+    return lines
+
+
+async def observe(con, sql: str, binds: dict, elapsed_ms: float, rows: int) -> None:
+    """Llamado por los helpers de db.oracle después de cada consulta registrada."""
+    if not _settings.slow_query_enabled or elapsed_ms < _settings.slow_query_threshold_ms:
+        return
+    name = variants.name_of(sql)
+    if name is None:
+        return
+    key = _plan_key(con, sql)
+    m = current()
+    _ENTRIES.append({
+        "id": next(_IDS),
+        "at": datetime.now().isoformat(timespec="seconds"),
+        "variant": name,
+        "elapsed_ms": round(elapsed_ms, 1),
+        "rows": rows,
+        "binds": redact(binds),
+        "stages_ms": {k: round(v * 1000, 1) for k, v in m.stages.items()} if m else {},
+        "plan_key": key,
+        "sql": sql,
+    })
+    if key in _PLANS:
+        _PLANS.move_to_end(key)
+        return
+    db = SESSION_DB.get()
+    if not _settings.slow_query_explain or db is None:
+        return
+    # se marca antes de consultar: otra consulta lenta concurrente no repite el EXPLAIN
+    plan = _PLANS[key] = {"variant": name, "captured_at": None, "plan": None, "error": None}
+    while len(_PLANS) > max(1, _settings.slow_query_max_plans):
+        _PLANS.popitem(last=False)
+    task = asyncio.create_task(_capture(db, sql, "fr_" + key.rsplit("#", 1)[1], plan))
+    _TASKS.add(task)
+    task.add_done_callback(_TASKS.discard)
+
+
+async def _capture(db: dict, sql: str, statement_id: str, plan: dict) -> None:
+    from provisioning_api.db.oracle import connect_async  # db.oracle importa este módulo
+
+    try:
+        async with connect_async(db) as con:
+            plan["plan"] = await _explain(con, sql, statement_id)
+    except Exception as e:  # sin PLAN_TABLE, sin privilegios o sin sesión: se guarda el motivo
+        logger.info("flight recorder: sin plan para %s: %s", plan["variant"], e)
+        plan["error"] = str(e)
+    plan["captured_at"] = datetime.now().isoformat(timespec="seconds")
+
+
+def entries(with_plans: bool = False) -> list[dict]:
+    items = list(reversed(_ENTRIES))
+    if with_plans:
+        items = [{**e, "plan": _PLANS.get(e["plan_key"])} for e in items]
+    return items
+
+
+def plans() -> dict:
+    return dict(_PLANS)
+
+
+def clear() -> int:
+    n = len(_ENTRIES)
+    _ENTRIES.clear()
+    _PLANS.clear()
+    return n
@@ -1,41 +1,58 @@
-from contextlib import contextmanager
+from collections import OrderedDict
+from contextlib import asynccontextmanager, contextmanager
+import asyncio
+import hashlib
+import inspect
 import os
+import threading
+import time
 import oracledb
 
+from provisioning_api.core.config import get_settings
+from provisioning_api.core.metrics import add_rows, stage
+from provisioning_api.db import flight_recorder
+from provisioning_api.db.sql import variants
+
 oracledb.defaults.fetch_lobs = False
 
 _THICK_READY = False
 _THICK_ERR = None
+_DRIVER_INIT = False
+_DRIVER_LOCK = threading.Lock()
 
 
-def _maybe_init_thick_on_import():
+def init_driver() -> None:
     """
     Decide driver mode BEFORE any connection is attempted.
     If FORCE_ORACLE_THICK=1 or ORACLE_CLIENT_LIB_DIR is set -> try THICK now.
     Never attempt switching later (prevents DPY-2019).
-    """
-    global _THICK_READY, _THICK_ERR
-    force = os.getenv("FORCE_ORACLE_THICK") == "1"
-    lib_dir = os.getenv("ORACLE_CLIENT_LIB_DIR")
 
-    if not (force or lib_dir):
-        # stay in THIN, do nothing
+    Idempotente: lo llaman el warm-up del arranque y `_ensure_driver_mode`
+    antes de la primera conexión, no el import del módulo (cargar Instant
+    Client es lento y no hace falta para /health ni /metrics).
+    """
+    global _THICK_READY, _THICK_ERR, _DRIVER_INIT
+    if _DRIVER_INIT:
         return
+    with _DRIVER_LOCK:
+        if _DRIVER_INIT:
+            return
+        force = os.getenv("FORCE_ORACLE_THICK") == "1"
+        lib_dir = os.getenv("ORACLE_CLIENT_LIB_DIR")
 
-    try:
-        if lib_dir:
-            oracledb.init_oracle_client(lib_dir=lib_dir)
-        else:
-            # rely on PATH having the Instant Client directory
-            oracledb.init_oracle_client()
-        _THICK_READY = True
-    except Exception as e:
-        _THICK_ERR = e
-        _THICK_READY = False
-
-
-# initialize mode at import time
-_maybe_init_thick_on_import()
+        # sin ninguna de las dos se queda en THIN
+        if force or lib_dir:
+            try:
+                if lib_dir:
+                    oracledb.init_oracle_client(lib_dir=lib_dir)
+                else:
+                    # rely on PATH having the Instant Client directory
+                    oracledb.init_oracle_client()
+                _THICK_READY = True
+            except Exception as e:
+                _THICK_ERR = e
+                _THICK_READY = False
+        _DRIVER_INIT = True
 
 
 def _dsn_from(db: dict) -> str:
@@ -49,17 +66,229 @@ def _dsn_from(db: dict) -> str:
     return f'{db["host"]}:{db["port"]}/{svc}'.rstrip("/")
 
 
-@contextmanager
-def connect(db: dict):
+def db_identity(db: dict) -> tuple:
     """
-    Deterministic mode:
-      - If THICK was initialized at import, we are in THICK.
-      - Else THIN is used; if server is too old (DPY-3010), raise a clear error
-        instructing to start the process with THICK pre-initialized.
+    Identidad de un perfil de base: (host, port, service, user) más un digest de
+    la password, para que credenciales distintas nunca compartan sesiones ya
+    autenticadas ni resultados cacheados. Hay un pool por identidad.
     """
+    digest = hashlib.sha256(str(db.get("password", "")).encode("utf-8")).hexdigest()
+    return (
+        str(db["host"]).strip().lower(),
+        int(db["port"]),
+        (db.get("service") or "").strip(),
+        str(db["user"]).strip().upper(),
+        digest,
+    )
+
+
+def _pool_params(db: dict) -> dict:
+    s = get_settings()
     dsn = _dsn_from(db)
+    params = dict(
+        user=db["user"],
+        password=db["password"],
+        min=s.oracle_pool_min,
+        max=s.oracle_pool_max,
+        increment=s.oracle_pool_increment,
+        getmode=oracledb.POOL_GETMODE_TIMEDWAIT,
+        wait_timeout=s.oracle_pool_wait_timeout,
+        ping_interval=s.oracle_pool_ping_interval,
+        # las variantes de queries.sql_variant tienen texto estable: que entren todas
+        stmtcachesize=s.oracle_stmt_cache_size,
+    )
+    if s.oracle_drcp_cclass:
+        # DRCP: el broker del servidor reparte sesiones por connection class
+        dsn = f"{dsn}:pooled"
+        params.update(cclass=s.oracle_drcp_cclass, purity=oracledb.PURITY_SELF)
+    params["dsn"] = dsn
+    return params
+
+
+def _create_pool(db: dict):
+    return oracledb.create_pool(**_pool_params(db))
+
+
+def _create_async_pool(db: dict):
+    # los pools async sólo existen en modo THIN
+    return oracledb.create_pool_async(**_pool_params(db))
+
+
+class _PoolEntry:
+    __slots__ = ("pool", "created", "last_used", "acquires", "errors")
+
+    def __init__(self, pool):
+        now = time.monotonic()
+        self.pool = pool
+        self.created = now
+        self.last_used = now
+        self.acquires = 0
+        self.errors = 0
+
+
+class PoolRegistry:
+    """
+    Registro LRU de pools. Los pools sin sesiones prestadas que superan
+    `oracle_pool_idle_ttl` se cierran, y si hay más de `oracle_pool_max_pools`
+    se descartan primero los menos usados.
+    """
+
+    def __init__(self, factory):
+        self._factory = factory
+        self._entries: "OrderedDict[tuple, _PoolEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._creating: dict[tuple, threading.Lock] = {}
+        self.evictions = 0
+
+    def get(self, db: dict):
+        """
+        Pool del perfil, creándolo si hace falta. El pool se crea fuera del lock
+        del registro (con min >= 1 abre sesiones y puede tardar): sólo esperan
+        los que piden el mismo perfil, los demás siguen resolviendo el suyo.
+        """
+        key = db_identity(db)
+        with self._lock:
+            stale = self._evict_locked(time.monotonic())
+            entry = self._touch_locked(key)
+            if entry is None:
+                creating = self._creating.setdefault(key, threading.Lock())
+        if entry is None:
+            with creating:
+                with self._lock:
+                    entry = self._touch_locked(key)
+                if entry is None:
+                    try:
+                        pool = self._factory(db)
+                    except BaseException:
+                        with self._lock:
+                            self._creating.pop(key, None)
+                        raise
+                    with self._lock:
+                        entry = self._entries[key] = _PoolEntry(pool)
+                        self._creating.pop(key, None)
+                        stale += self._trim_locked()
+                        entry.acquires += 1
+        for pool in stale:
+            _close_pool(pool)
+        return entry.pool
+
+    def _touch_locked(self, key: tuple):
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            entry.last_used = time.monotonic()
+            entry.acquires += 1
+        return entry
+
+    def mark_error(self, db: dict) -> None:
+        with self._lock:
+            entry = self._entries.get(db_identity(db))
+            if entry is not None:
+                entry.errors += 1
+
+    def discard(self, db: dict) -> None:
+        """Cierra el pool del perfil si nadie tiene sesiones prestadas."""
+        key = db_identity(db)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or _busy(entry.pool) > 0:
+                return
+            del self._entries[key]
+        _close_pool(entry.pool)
+
+    def _evict_locked(self, now: float) -> list:
+        ttl = get_settings().oracle_pool_idle_ttl
+        stale = []
+        for key, entry in list(self._entries.items()):
+            if now - entry.last_used > ttl and _busy(entry.pool) == 0:
+                stale.append(self._entries.pop(key).pool)
+                self.evictions += 1
+        return stale
+
+    def _trim_locked(self) -> list:
+        limit = max(1, get_settings().oracle_pool_max_pools)
+        stale = []
+        for key, entry in list(self._entries.items()):
+            if len(self._entries) <= limit:
+                break
+            if _busy(entry.pool) == 0:
+                stale.append(self._entries.pop(key).pool)
+                self.evictions += 1
+        return stale
+
+    def stats(self) -> dict:
+        now = time.monotonic()
+        with self._lock:
+            pools = [
+                {
+                    "host": key[0],
+                    "port": key[1],
+                    "service": key[2],
+                    "user": key[3],
+                    "opened": getattr(e.pool, "opened", None),
+                    "busy": _busy(e.pool),
+                    "min": getattr(e.pool, "min", None),
+                    "max": getattr(e.pool, "max", None),
+                    "acquires": e.acquires,
+                    "errors": e.errors,
+                    "idle_seconds": round(now - e.last_used, 1),
+                    "age_seconds": round(now - e.created, 1),
+                }
+                for key, e in self._entries.items()
+            ]
+        return {"pools": pools, "evictions": self.evictions}
+
+    def drain(self) -> list:
+        with self._lock:
+            pools = [e.pool for e in self._entries.values()]
+            self._entries.clear()
+        return pools
+
+    def close_all(self) -> None:
+        for pool in self.drain():
+            _close_pool(pool)
+
 
-    # If THICK was requested but failed to init at import, fail fast with guidance
+def _busy(pool) -> int:
+    try:
+        return int(pool.busy)
+    except Exception:
+        return 0
+
+
+def _close_pool(pool) -> None:
+    try:
+        result = pool.close(force=True)
+    except Exception:
+        return
+    if inspect.isawaitable(result):
+        # pool async: el cierre es una corrutina, la dejamos corriendo en el loop
+        try:
+            asyncio.get_running_loop().create_task(result)
+        except RuntimeError:
+            result.close()
+
+
+_POOLS = PoolRegistry(_create_pool)
+_ASYNC_POOLS = PoolRegistry(_create_async_pool)
+
+
+def pool_stats() -> dict:
+    return {"sync": _POOLS.stats(), "async": _ASYNC_POOLS.stats()}
+
+
+async def close_pools_async() -> None:
+    _POOLS.close_all()
+    for pool in _ASYNC_POOLS.drain():
+        try:
+            await pool.close(force=True)
+        except Exception:
+            pass
+
+
+def _ensure_driver_mode() -> None:
+    init_driver()
+    # If THICK was requested but failed to init, fail fast with guidance
     if os.getenv("FORCE_ORACLE_THICK") == "1" and not _THICK_READY:
         raise RuntimeError(
             "El servidor requiere modo THICK pero no está disponible. "
@@ -68,39 +297,220 @@ def connect(db: dict):
             f"Detalle: {repr(_THICK_ERR)}"
         )
 
+
+def _connect_error(err: Exception) -> RuntimeError:
+    msg = str(err)
+    if "DPY-3010" in msg:
+        # Too old for THIN. We cannot switch now (DPY-2019), so instruct restart.
+        hint = []
+        if not _THICK_READY:
+            hint.append(
+                "Este servidor Oracle no es soportado en modo THIN. "
+                "Iniciá la app con THICK pre-inicializado: "
+                "instalá Instant Client 19/21 y seteá ORACLE_CLIENT_LIB_DIR "
+                "o agregá su carpeta al PATH, luego reiniciá el servicio/proceso."
+            )
+        return RuntimeError("Conexión rechazada (DPY-3010). " + " ".join(hint))
+    return RuntimeError(
+        f"Conexión Oracle fallida: {err}. "
+        "Verificá host/puerto/servicio y reachability (firewall/VPN)."
+    )
+
+
+@contextmanager
+def connect(db: dict):
+    """
+    Deterministic mode:
+      - If THICK was initialized (init_driver), we are in THICK.
+      - Else THIN is used; if server is too old (DPY-3010), raise a clear error
+        instructing to start the process with THICK pre-initialized.
+    Sessions are borrowed from the pool registered for the DB profile and
+    returned to it on exit.
+    """
+    _ensure_driver_mode()
+
     try:
-        con = oracledb.connect(user=db["user"], password=db["password"], dsn=dsn)
+        with stage("connect"):
+            pool = _POOLS.get(db)
+            con = pool.acquire()
     except oracledb.DatabaseError as err:
-        msg = str(err)
-        if "DPY-3010" in msg:
-            # Too old for THIN. We cannot switch now (DPY-2019), so instruct restart.
-            hint = []
-            if not _THICK_READY:
-                hint.append(
-                    "Este servidor Oracle no es soportado en modo THIN. "
-                    "Iniciá la app con THICK pre-inicializado: "
-                    "instalá Instant Client 19/21 y seteá ORACLE_CLIENT_LIB_DIR "
-                    "o agregá su carpeta al PATH, luego reiniciá el servicio/proceso."
-                )
-            raise RuntimeError("Conexión rechazada (DPY-3010). " + " ".join(hint))
-        raise RuntimeError(
-            f"Conexión Oracle fallida: {err}. "
-            "Verificá host/puerto/servicio y reachability (firewall/VPN)."
-        )
+        # pool sin sesiones válidas (credenciales, red): no lo dejamos cacheado
+        _POOLS.discard(db)
+        raise _connect_error(err)
 
     try:
         yield con
     finally:
         try:
-            con.close()
+            pool.release(con)
         except Exception:
-            pass
+            _POOLS.mark_error(db)
+
+
+class _ThreadedCursor:
+    """Cursor THICK con la interfaz async de oracledb; cada llamada corre en un thread."""
+
+    def __init__(self, cur):
+        self._cur = cur
+
+    @property
+    def description(self):
+        return self._cur.description
+
+    @property
+    def arraysize(self) -> int:
+        return self._cur.arraysize
+
+    @arraysize.setter
+    def arraysize(self, value: int) -> None:
+        self._cur.arraysize = value
+
+    async def execute(self, sql: str, binds=None):
+        await asyncio.to_thread(self._cur.execute, sql, binds)
+
+    async def executemany(self, sql: str, params, **kwargs):
+        await asyncio.to_thread(self._cur.executemany, sql, params, **kwargs)
+
+    def getbatcherrors(self):
+        return self._cur.getbatcherrors()
+
+    async def fetchall(self):
+        return await asyncio.to_thread(self._cur.fetchall)
+
+    async def fetchone(self):
+        return await asyncio.to_thread(self._cur.fetchone)
+
+    async def fetchmany(self, size=None):
+        return await asyncio.to_thread(self._cur.fetchmany, size)
+
+    def close(self) -> None:
+        self._cur.close()
+
+
+class _ThreadedConnection:
+    """Envuelve una conexión THICK (sin soporte asyncio nativo) para el path async."""
+
+    def __init__(self, con):
+        self._con = con
+
+    @property
+    def version(self) -> str:
+        return self._con.version
+
+    @property
+    def dsn(self):
+        return self._con.dsn
+
+    def cursor(self):
+        return _ThreadedCursor(self._con.cursor())
+
+    async def commit(self) -> None:
+        await asyncio.to_thread(self._con.commit)
+
+    async def rollback(self) -> None:
+        await asyncio.to_thread(self._con.rollback)
+
+
+@asynccontextmanager
+async def connect_async(db: dict):
+    """
+    Async counterpart of `connect`. In THIN mode sessions come from an
+    `oracledb` async pool and never block the event loop; in THICK mode
+    (no native asyncio support) the sync pool is used through worker threads.
+    """
+    _ensure_driver_mode()
+
+    if _THICK_READY:
+        try:
+            with stage("connect"):
+                # crear el pool (create_pool abre sesiones) no puede bloquear el loop
+                pool = await asyncio.to_thread(_POOLS.get, db)
+                con = await asyncio.to_thread(pool.acquire)
+        except oracledb.DatabaseError as err:
+            _POOLS.discard(db)
+            raise _connect_error(err)
+        token = flight_recorder.SESSION_DB.set(db)
+        try:
+            yield _ThreadedConnection(con)
+        finally:
+            flight_recorder.SESSION_DB.reset(token)
+            try:
+                await asyncio.to_thread(pool.release, con)
+            except Exception:
+                _POOLS.mark_error(db)
+        return
+
+    try:
+        with stage("connect"):
+            pool = _ASYNC_POOLS.get(db)
+            con = await pool.acquire()
+    except oracledb.DatabaseError as err:
+        _ASYNC_POOLS.discard(db)
+        raise _connect_error(err)
+    token = flight_recorder.SESSION_DB.set(db)
+    try:
+        yield con
+    finally:
+        flight_recorder.SESSION_DB.reset(token)
+        try:
+            await pool.release(con)
+        except Exception:
+            _ASYNC_POOLS.mark_error(db)
+
+
+@asynccontextmanager
+async def session_async(db: dict, con=None):
+    """`con` si el llamador ya tiene una sesión abierta; si no, una del pool."""
+    if con is not None:
+        yield con
+        return
+    async with connect_async(db) as own:
+        yield own
+
+
+class ResultTooLarge(RuntimeError):
+    """La consulta sin paginar superó el tope de filas/bytes configurado."""
+
+
+class _ResultGuard:
+    def __init__(self, max_rows, max_bytes):
+        self.max_rows, self.max_bytes = max_rows, max_bytes
+        self.rows = 0
+        self.bytes = 0
+
+    def check(self, batch) -> None:
+        self.rows += len(batch)
+        if self.max_rows is not None and self.rows > self.max_rows:
+            raise ResultTooLarge(
+                f"La consulta supera el máximo de {self.max_rows} filas sin paginar. "
+                "Acotá el rango de fechas o usá la exportación."
+            )
+        if self.max_bytes is not None:
+            self.bytes += sum(len(v) if isinstance(v, str) else 8 for r in batch for v in r)
+            if self.bytes > self.max_bytes:
+                raise ResultTooLarge(
+                    f"La consulta supera el máximo de {self.max_bytes} bytes sin paginar. "
+                    "Acotá el rango de fechas o usá la exportación."
+                )
+
+
+def _arraysize(arraysize) -> int:
+    return int(arraysize or get_settings().oracle_fetch_arraysize)
+
+
+def _elapsed_ms(t0: float) -> float:
+    return (time.perf_counter() - t0) * 1000
 
 
 def fetch_all(con, sql: str, binds: dict) -> list[dict]:
+    t0 = time.perf_counter()
     cur = con.cursor()
-    cur.execute(sql, binds)
-    rows = cur.fetchall()
+    with stage("execute"):
+        cur.execute(sql, binds)
+    with stage("fetch"):
+        rows = cur.fetchall()
+    variants.record(sql, _elapsed_ms(t0), len(rows))
+    add_rows(len(rows))
     cols = [d[0].lower() for d in cur.description]
     return [dict(zip(cols, r)) for r in rows]
 
@@ -112,7 +522,94 @@ def fetch_one(con, sql: str, binds: dict):
 
 
 def fetch_count(con, sql: str, binds: dict) -> int:
+    t0 = time.perf_counter()
     cur = con.cursor()
-    cur.execute(sql, binds)
-    row = cur.fetchone()
+    with stage("execute"):
+        cur.execute(sql, binds)
+    with stage("fetch"):
+        row = cur.fetchone()
+    variants.record(sql, _elapsed_ms(t0), 1)
+    return int(row[0]) if row and row[0] is not None else 0
+
+
+async def fetch_rows_async(con, sql: str, binds: dict, max_rows=None, max_bytes=None) -> tuple[list[str], list]:
+    """
+    Column names (lowercase, from cursor.description) and the raw row tuples.
+    With `max_rows`/`max_bytes` the result is read in batches and the call
+    fails with ResultTooLarge as soon as a cap is exceeded.
+    """
+    t0 = time.perf_counter()
+    cur = con.cursor()
+    if max_rows is None and max_bytes is None:
+        with stage("execute"):
+            await cur.execute(sql, binds)
+        with stage("fetch"):
+            rows = await cur.fetchall()
+    else:
+        guard = _ResultGuard(max_rows, max_bytes)
+        cur.arraysize = _arraysize(None)
+        with stage("execute"):
+            await cur.execute(sql, binds)
+        rows = []
+        with stage("fetch"):
+            while True:
+                batch = await cur.fetchmany()
+                if not batch:
+                    break
+                guard.check(batch)
+                rows.extend(batch)
+    elapsed = _elapsed_ms(t0)
+    variants.record(sql, elapsed, len(rows))
+    add_rows(len(rows))
+    await flight_recorder.observe(con, sql, binds, elapsed, len(rows))
+    return [d[0].lower() for d in cur.description], rows
+
+
+async def fetch_all_async(con, sql: str, binds: dict, max_rows=None, max_bytes=None) -> list[dict]:
+    cols, rows = await fetch_rows_async(con, sql, binds, max_rows, max_bytes)
+    with stage("convert"):
+        return [dict(zip(cols, r)) for r in rows]
+
+
+async def fetch_one_async(con, sql: str, binds: dict):
+    cur = con.cursor()
+    await cur.execute(sql, binds)
+    return await cur.fetchone()
+
+
+async def fetch_count_async(con, sql: str, binds: dict) -> int:
+    t0 = time.perf_counter()
+    cur = con.cursor()
+    with stage("execute"):
+        await cur.execute(sql, binds)
+    with stage("fetch"):
+        row = await cur.fetchone()
+    elapsed = _elapsed_ms(t0)
+    variants.record(sql, elapsed, 1)
+    await flight_recorder.observe(con, sql, binds, elapsed, 1)
     return int(row[0]) if row and row[0] is not None else 0
+
+
+async def fetch_batches_async(con, sql: str, binds: dict, arraysize=None):
+    """Yield lists of row dicts, one per `fetchmany` round trip."""
+    t0 = time.perf_counter()
+    rows = 0
+    cur = con.cursor()
+    cur.arraysize = _arraysize(arraysize)
+    try:
+        with stage("execute"):
+            await cur.execute(sql, binds)
+        cols = [d[0].lower() for d in cur.description]
+        while True:
+            with stage("fetch"):
+                batch = await cur.fetchmany()
+            if not batch:
+                break
+            rows += len(batch)
+            add_rows(len(batch))
+            with stage("convert"):
+                dicts = [dict(zip(cols, r)) for r in batch]
+            yield dicts
+    finally:
+        # incluye el tiempo en que el consumidor procesa cada lote
+        variants.record(sql, _elapsed_ms(t0), rows)
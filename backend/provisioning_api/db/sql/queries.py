@@ -1,3 +1,95 @@
+import hashlib
+from functools import lru_cache
+
+from provisioning_api.db.sql.variants import MAX_PROJECTIONS, register
+
+SELECT_COLUMNS = [
+    "a.pri_id",
+    "a.pri_cellular_number",
+    "a.pri_sim_msisdn",
+    "a.pri_sim_imsi",
+    "a.pri_action",
+    "a.pri_level_action",
+    "a.pri_status",
+    "TO_CHAR(a.pri_action_date,'YYYY-MM-DD HH24:MI:SS') AS pri_action_date",
+    "TO_CHAR(a.pri_system_date,'YYYY-MM-DD HH24:MI:SS') AS pri_system_date",
+    "a.pri_ne_type",
+    "a.pri_ne_id",
+    "a.pri_ne_service",
+    "a.pri_source_application",
+    "a.pri_source_app_id",
+    "a.pri_sis_id",
+    "TO_CHAR(a.pri_error_code) AS pri_error_code",
+    "a.pri_message_error",
+    "a.pri_correlation_id",
+    "a.pri_reason_code",
+    "TO_CHAR(a.pri_processed_date,'YYYY-MM-DD HH24:MI:SS') AS pri_processed_date",
+    "TO_CHAR(a.pri_response_date,'YYYY-MM-DD HH24:MI:SS') AS pri_response_date",
+    "TO_CHAR(a.pri_priority_date,'YYYY-MM-DD HH24:MI:SS') AS pri_priority_date",
+    "TO_CHAR(a.pri_in_queue,'YYYY-MM-DD HH24:MI:SS') AS pri_in_queue",
+    "TO_CHAR(a.pri_delivered_safir,'YYYY-MM-DD HH24:MI:SS') AS pri_delivered_safir",
+    "TO_CHAR(a.pri_received_safir,'YYYY-MM-DD HH24:MI:SS') AS pri_received_safir",
+    "a.pri_id_sended",
+    "a.pri_user_sender",
+    "a.pri_ne_entity",
+    "a.pri_acc_id",
+    "a.pri_main_pri_id",
+    "a.pri_resp_manager",
+    "a.pri_usr_id",
+    "a.pri_priority_usr",
+    "a.pri_save_last_tx_status",
+    "a.pri_crm_action",
+    "a.pri_request",
+    "a.pri_response",
+    "a.pri_sended_count",
+    "a.pri_main_sis_id",
+    "a.pri_imei",
+    "a.pri_card_number",
+    "a.pri_correlator_id",
+]
+
+# columnas DATE que la proyección devuelve como texto 'YYYY-MM-DD HH24:MI:SS'
+DATE_COLUMNS = tuple(
+    expr.rsplit(" AS ", 1)[1] for expr in SELECT_COLUMNS if "'YYYY-MM-DD HH24:MI:SS'" in expr
+)
+
+COLUMN_NAMES = tuple(expr.rsplit(" AS ", 1)[-1].split(".")[-1] for expr in SELECT_COLUMNS)
+
+# XML/JSON pesados: fuera de la proyección por defecto de /records, se piden
+# aparte con /records/{pri_id}/payload
+PAYLOAD_COLUMNS = ("pri_request", "pri_response")
+# orden y cursores de keyset dependen de estas dos
+REQUIRED_FIELDS = ("pri_id", "pri_action_date")
+DEFAULT_FIELDS = tuple(c for c in COLUMN_NAMES if c not in PAYLOAD_COLUMNS)
+
+
+def resolve_fields(fields) -> tuple | None:
+    """`fields` de Filters -> columnas a proyectar (None = todas, con "*")."""
+    if not fields:
+        return DEFAULT_FIELDS
+    if "*" in fields:
+        return None
+    unknown = sorted(set(fields) - set(COLUMN_NAMES))
+    if unknown:
+        raise ValueError(f"Campos desconocidos: {', '.join(unknown)}")
+    wanted = set(fields)
+    return tuple(c for c in COLUMN_NAMES if c in wanted)
+
+
+def _select_columns(fields) -> list[str]:
+    if fields is None:
+        return list(SELECT_COLUMNS)
+    wanted = set(fields) | set(REQUIRED_FIELDS)
+    return [expr for expr, name in zip(SELECT_COLUMNS, COLUMN_NAMES) if name in wanted]
+
+
+# columnas NUMBER que se proyectan sin TO_CHAR (el driver las entrega como int/float)
+NUMBER_COLUMNS = (
+    "pri_id", "pri_sis_id", "pri_correlation_id", "pri_id_sended", "pri_acc_id",
+    "pri_main_pri_id", "pri_usr_id", "pri_sended_count", "pri_main_sis_id", "pri_correlator_id",
+)
+
+
 def _is_set(val):
     if val is None:
         return False
@@ -7,7 +99,27 @@ def _is_set(val):
     return text.upper() != "TODOS"
 
 
-def build_sql(filters: dict, include_pagination: bool, use_legacy_pagination: bool = False):
+def _keyset_predicate(direction: str) -> str:
+    # Oracle no compara tuplas con < / >: se expande (fecha, id) y se deja una
+    # cota simple sobre la fecha para que el índice pueda hacer range scan.
+    if direction == "prev":
+        return (
+            "a.pri_action_date >= TO_DATE(:k_date,'YYYY-MM-DD HH24:MI:SS') "
+            "AND (a.pri_action_date > TO_DATE(:k_date,'YYYY-MM-DD HH24:MI:SS') OR a.pri_id > :k_id)"
+        )
+    return (
+        "a.pri_action_date <= TO_DATE(:k_date,'YYYY-MM-DD HH24:MI:SS') "
+        "AND (a.pri_action_date < TO_DATE(:k_date,'YYYY-MM-DD HH24:MI:SS') OR a.pri_id < :k_id)"
+    )
+
+
+# filtros opcionales: cada combinación de presentes es una variante de WHERE
+OPTIONAL_FILTERS = ("pri_id", "pri_action", "pri_ne_group", "pri_status")
+
+
+@lru_cache(maxsize=None)
+def _where_clause(optional: tuple) -> str:
+    """WHERE común a /records, el export y /stats para los filtros opcionales presentes."""
     where = [
         "a.pri_action_date BETWEEN TO_DATE(:start_date,'YYYY-MM-DD HH24:MI:SS') "
         "AND TO_DATE(:end_date,'YYYY-MM-DD HH24:MI:SS')",
@@ -15,69 +127,65 @@ def build_sql(filters: dict, include_pagination: bool, use_legacy_pagination: bo
     ]
     # Restrict to allowed level actions
     where.append("a.pri_level_action IN ('U','R')")
+    for name in optional:
+        where.append(f"a.{name} = :{name}")
+    return " AND ".join(where)
+
+
+def _where_binds(filters: dict) -> tuple[tuple, dict]:
+    """(filtros opcionales presentes, binds del WHERE) para `_where_clause`."""
     binds = {
         "start_date": filters["start_date"],
         "end_date": filters["end_date"],
         "pri_ne_id": filters["pri_ne_id"],
     }
-    if _is_set(filters.get("pri_id")):
-        where.append("a.pri_id = :pri_id")
-        binds["pri_id"] = filters.get("pri_id")
-    if _is_set(filters.get("pri_action")):
-        where.append("a.pri_action = :pri_action")
-        binds["pri_action"] = filters.get("pri_action")
-    if _is_set(filters.get("pri_ne_group")):
-        where.append("a.pri_ne_group = :pri_ne_group")
-        binds["pri_ne_group"] = filters.get("pri_ne_group")
-    if _is_set(filters.get("pri_status")):
-        where.append("a.pri_status = :pri_status")
-        binds["pri_status"] = filters.get("pri_status")
-
-    where_clause = " AND ".join(where)
-    select_columns = [
-        "a.pri_id",
-        "a.pri_cellular_number",
-        "a.pri_sim_msisdn",
-        "a.pri_sim_imsi",
-        "a.pri_action",
-        "a.pri_level_action",
-        "a.pri_status",
-        "TO_CHAR(a.pri_action_date,'YYYY-MM-DD HH24:MI:SS') AS pri_action_date",
-        "TO_CHAR(a.pri_system_date,'YYYY-MM-DD HH24:MI:SS') AS pri_system_date",
-        "a.pri_ne_type",
-        "a.pri_ne_id",
-        "a.pri_ne_service",
-        "a.pri_source_application",
-        "a.pri_source_app_id",
-        "a.pri_sis_id",
-        "TO_CHAR(a.pri_error_code) AS pri_error_code",
-        "a.pri_message_error",
-        "a.pri_correlation_id",
-        "a.pri_reason_code",
-        "TO_CHAR(a.pri_processed_date,'YYYY-MM-DD HH24:MI:SS') AS pri_processed_date",
-        "TO_CHAR(a.pri_response_date,'YYYY-MM-DD HH24:MI:SS') AS pri_response_date",
-        "TO_CHAR(a.pri_priority_date,'YYYY-MM-DD HH24:MI:SS') AS pri_priority_date",
-        "TO_CHAR(a.pri_in_queue,'YYYY-MM-DD HH24:MI:SS') AS pri_in_queue",
-        "TO_CHAR(a.pri_delivered_safir,'YYYY-MM-DD HH24:MI:SS') AS pri_delivered_safir",
-        "TO_CHAR(a.pri_received_safir,'YYYY-MM-DD HH24:MI:SS') AS pri_received_safir",
-        "a.pri_id_sended",
-        "a.pri_user_sender",
-        "a.pri_ne_entity",
-        "a.pri_acc_id",
-        "a.pri_main_pri_id",
-        "a.pri_resp_manager",
-        "a.pri_usr_id",
-        "a.pri_priority_usr",
-        "a.pri_save_last_tx_status",
-        "a.pri_crm_action",
-        "a.pri_request",
-        "a.pri_response",
-        "a.pri_sended_count",
-        "a.pri_main_sis_id",
-        "a.pri_imei",
-        "a.pri_card_number",
-        "a.pri_correlator_id",
-    ]
+    optional = tuple(name for name in OPTIONAL_FILTERS if _is_set(filters.get(name)))
+    for name in optional:
+        binds[name] = filters.get(name)
+    return optional, binds
+
+
+def _variant_name(optional: tuple, mode: str, legacy: bool, seek, with_total: bool, fields) -> str:
+    parts = ["+".join(optional) or "base", mode]
+    if seek:
+        parts.append(seek)
+    if legacy:
+        parts.append("legacy")
+    if with_total:
+        parts.append("total")
+    if fields is not None:
+        parts.append(_fields_tag(fields) if _is_projection(fields) else "cols=default")
+    return "|".join(parts)
+
+
+def _is_projection(fields) -> bool:
+    """Proyección elegida por el cliente (ni todas las columnas ni la de por defecto)."""
+    return fields is not None and fields != DEFAULT_FIELDS
+
+
+@lru_cache(maxsize=MAX_PROJECTIONS)
+def _fields_tag(fields: tuple) -> str:
+    # mismo largo no es misma proyección: el nombre lleva un hash del conjunto
+    digest = hashlib.blake2s(",".join(fields).encode(), digest_size=4).hexdigest()
+    return f"cols={len(fields)}:{digest}"
+
+
+@lru_cache(maxsize=MAX_PROJECTIONS)
+def sql_variant(optional: tuple, mode: str, legacy: bool = False, seek: str | None = None,
+                with_total: bool = False, fields: tuple | None = None) -> tuple[str, str]:
+    """
+    Textos (select, count) de una variante, armados una sola vez: el texto es
+    idéntico entre llamadas, así el statement cache del driver y el cursor
+    compartido del servidor lo reutilizan.
+
+    `optional`: filtros opcionales presentes (en el orden de OPTIONAL_FILTERS);
+    `mode`: "all" (sin paginar), "offset" o "keyset"; `seek`: None en la
+    primera página de keyset, "next" o "prev" con cursor.
+    """
+    where_clause = _where_clause(optional)
+    select_columns = _select_columns(fields)
+    if with_total:
+        select_columns = select_columns + ["COUNT(*) OVER () AS total_rows"]
     select_columns_sql = ",\n      ".join(select_columns)
     select_columns_with_rn_sql = ",\n          ".join(
         select_columns + ["ROW_NUMBER() OVER (ORDER BY a.pri_action_date DESC) AS rn"]
@@ -89,11 +197,22 @@ def build_sql(filters: dict, include_pagination: bool, use_legacy_pagination: bo
     WHERE {where_clause}
     """
 
-    if include_pagination:
-        binds["offset"] = int(filters.get("offset", 0))
-        binds["limit"] = int(filters.get("limit", 200))
-
-        if use_legacy_pagination:
+    if mode == "keyset":
+        seek_where = f"{where_clause} AND {_keyset_predicate(seek)}" if seek else where_clause
+        order = "ASC" if seek == "prev" else "DESC"
+        ordered_sql = f"""
+    SELECT
+      {select_columns_sql}
+    FROM swp_provisioning_interfaces a
+    WHERE {seek_where}
+    ORDER BY a.pri_action_date {order}, a.pri_id {order}
+    """
+        if legacy:
+            select_sql = f"SELECT q.* FROM ({ordered_sql}) q WHERE ROWNUM <= :limit"
+        else:
+            select_sql = f"{ordered_sql} FETCH FIRST :limit ROWS ONLY"
+    elif mode == "offset":
+        if legacy:
             select_sql = f"""
       SELECT q.* FROM (
         SELECT
@@ -114,4 +233,110 @@ def build_sql(filters: dict, include_pagination: bool, use_legacy_pagination: bo
         select_sql = base_select + " ORDER BY a.pri_action_date DESC"
 
     count_sql = f"SELECT COUNT(1) AS total FROM swp_provisioning_interfaces a WHERE {where_clause}"
+    if not _is_projection(fields):
+        register(select_sql, _variant_name(optional, mode, legacy, seek, with_total, fields))
+    register(count_sql, _variant_name(optional, "count", False, None, False, None))
+    return select_sql, count_sql
+
+
+def build_sql(filters: dict, include_pagination: bool, use_legacy_pagination: bool = False,
+              keyset: dict | None = None, with_total: bool = False, fields: tuple | None = None):
+    """
+    Devuelve (select_sql, count_sql, binds).
+
+    Con `keyset` (dict de `decode_cursor`, vacío para la primera página) la
+    paginación es por seek sobre (pri_action_date DESC, pri_id DESC): se pide
+    `limit + 1` filas para saber si hay otra página y el costo no depende de
+    cuántas páginas se saltaron. Una página "prev" se lee en orden ascendente
+    y el llamador la invierte.
+
+    `with_total` agrega `COUNT(*) OVER () AS total_rows` a cada fila, así el
+    total sale en el mismo statement que la página (el analítico se evalúa
+    antes de OFFSET/FETCH, pero después del predicado de keyset).
+
+    `fields` limita la proyección (ver `resolve_fields`); None trae las 42
+    columnas, como necesita el export.
+
+    Los textos salen de `sql_variant` (memoizado); acá sólo se arman los binds.
+    """
+    optional, binds = _where_binds(filters)
+
+    seek = None
+    if include_pagination and keyset is not None:
+        mode = "keyset"
+        binds["limit"] = int(filters.get("limit", 200)) + 1
+        if keyset:
+            seek = keyset["direction"]
+            binds["k_date"] = keyset["date"]
+            binds["k_id"] = keyset["id"]
+    elif include_pagination:
+        mode = "offset"
+        binds["offset"] = int(filters.get("offset", 0))
+        binds["limit"] = int(filters.get("limit", 200))
+    else:
+        mode = "all"
+
+    select_sql, count_sql = sql_variant(
+        optional, mode, bool(use_legacy_pagination), seek, with_total, fields,
+    )
+    if _is_projection(fields):
+        # se registra en cada uso: el registro las guarda como LRU y una que
+        # salió por falta de uso vuelve a entrar aunque siga en sql_variant
+        register(select_sql, _variant_name(optional, mode, bool(use_legacy_pagination), seek, with_total, fields),
+                 projection=True)
     return select_sql, count_sql, binds
+
+
+# /stats: tamaño de bucket -> formato de TRUNC, y columnas por las que se agrupa
+STATS_BUCKETS = {"minute": "MI", "hour": "HH24", "day": "DD"}
+STATS_DIMENSIONS = {
+    "pri_status": "a.pri_status",
+    "pri_action": "a.pri_action",
+    "pri_error_code": "TO_CHAR(a.pri_error_code)",
+}
+
+
+@lru_cache(maxsize=None)
+def _stats_sql(optional: tuple, bucket: str, dimension: str) -> str:
+    trunc = f"TRUNC(a.pri_action_date,'{STATS_BUCKETS[bucket]}')"
+    sql = f"""
+    SELECT TO_CHAR({trunc},'YYYY-MM-DD HH24:MI:SS') AS bucket,
+           {STATS_DIMENSIONS[dimension]} AS dim_value,
+           COUNT(*) AS n
+    FROM swp_provisioning_interfaces a
+    WHERE {_where_clause(optional)}
+    GROUP BY {trunc}, a.{dimension}
+    """
+    return register(sql, "|".join(["stats", bucket, dimension, "+".join(optional) or "base"]))
+
+
+def build_stats_sql(filters: dict, bucket: str, dimension: str) -> tuple[str, dict]:
+    """Conteos por (bucket, valor de `dimension`) con el mismo WHERE que `build_sql`."""
+    if bucket not in STATS_BUCKETS:
+        raise ValueError(f"Bucket desconocido: {bucket!r}")
+    if dimension not in STATS_DIMENSIONS:
+        raise ValueError(f"Dimensión desconocida: {dimension!r}")
+    optional, binds = _where_binds(filters)
+    return _stats_sql(optional, bucket, dimension), binds
+
+
+# tamaños fijos de lista IN: se rellena repitiendo el último id para que haya
+# pocas variantes de texto SQL (1000 es el máximo de Oracle por lista)
+PAYLOAD_IN_SIZES = (1, 10, 100, 1000)
+
+
+def build_payload_sql(ids: list) -> tuple[str, dict]:
+    """SELECT de las columnas pesadas para hasta 1000 `ids`."""
+    size = next(n for n in PAYLOAD_IN_SIZES if n >= len(ids))
+    padded = list(ids) + [ids[-1]] * (size - len(ids))
+    binds = {f"id{i}": v for i, v in enumerate(padded)}
+    return _payload_sql(size), binds
+
+
+@lru_cache(maxsize=None)
+def _payload_sql(size: int) -> str:
+    sql = (
+        f"SELECT a.pri_id, {', '.join('a.' + c for c in PAYLOAD_COLUMNS)} "
+        f"FROM swp_provisioning_interfaces a WHERE a.pri_id IN ({', '.join(f':id{i}' for i in range(size))})"
+    )
+    return register(sql, f"payload|in={size}")
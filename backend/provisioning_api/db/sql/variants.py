@@ -0,0 +1,93 @@
+"""
+Registro de variantes de SQL: cada texto precompilado (ver
+`queries.sql_variant`) se registra con un nombre legible y acumula
+ejecuciones, filas y latencia (media, p95 sobre las últimas ejecuciones y
+máximo) para ajustar índices y `ORACLE_STMT_CACHE_SIZE`.
+
+Las variantes con una proyección elegida por el cliente (`Filters.fields`)
+son prácticamente ilimitadas: se registran con `projection=True` y sólo se
+conservan las `MAX_PROJECTIONS` usadas más recientemente.
+"""
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict, deque
+
+_RECENT = 512  # ejecuciones que se usan para el p95
+MAX_PROJECTIONS = 1024
+
+
+class VariantStats:
+    __slots__ = ("name", "sql", "executions", "rows", "total_ms", "max_ms", "_recent")
+
+    def __init__(self, name: str, sql: str):
+        self.name, self.sql = name, sql
+        self.executions = self.rows = 0
+        self.total_ms = self.max_ms = 0.0
+        self._recent: deque = deque(maxlen=_RECENT)
+
+    def record(self, elapsed_ms: float, rows: int) -> None:
+        self.executions += 1
+        self.rows += rows
+        self.total_ms += elapsed_ms
+        self.max_ms = max(self.max_ms, elapsed_ms)
+        self._recent.append(elapsed_ms)
+
+    def as_dict(self) -> dict:
+        recent = sorted(self._recent)
+        p95 = recent[min(len(recent) - 1, int(len(recent) * 0.95))] if recent else None
+        return {
+            "name": self.name,
+            "executions": self.executions,
+            "rows": self.rows,
+            "mean_ms": round(self.total_ms / self.executions, 2) if self.executions else None,
+            "p95_ms": round(p95, 2) if p95 is not None else None,
+            "max_ms": round(self.max_ms, 2),
+            "sql": self.sql,
+        }
+
+
+_BY_SQL: dict[str, VariantStats] = {}
+_PROJECTIONS: OrderedDict[str, None] = OrderedDict()  # LRU de las variantes con projection=True
+_LOCK = threading.Lock()
+
+
+def register(sql: str, name: str, projection: bool = False) -> str:
+    with _LOCK:
+        _BY_SQL.setdefault(sql, VariantStats(name, sql))
+        if projection:
+            _PROJECTIONS[sql] = None
+            _PROJECTIONS.move_to_end(sql)
+            while len(_PROJECTIONS) > MAX_PROJECTIONS:
+                old, _ = _PROJECTIONS.popitem(last=False)
+                _BY_SQL.pop(old, None)
+    return sql
+
+
+def name_of(sql: str) -> str | None:
+    st = _BY_SQL.get(sql)
+    return st.name if st is not None else None
+
+
+def record(sql: str, elapsed_ms: float, rows: int) -> None:
+    """Suma una ejecución; los textos no registrados se ignoran."""
+    st = _BY_SQL.get(sql)
+    if st is not None:
+        with _LOCK:
+            st.record(elapsed_ms, rows)
+
+
+def stats(executed_only: bool = True) -> list[dict]:
+    with _LOCK:
+        items = [st.as_dict() for st in _BY_SQL.values() if st.executions or not executed_only]
+    return sorted(items, key=lambda d: (d["mean_ms"] or 0) * d["executions"], reverse=True)
+
+
+def reset() -> int:
+    """Pone en cero los contadores (las variantes siguen registradas)."""
+    with _LOCK:
+        for st in _BY_SQL.values():
+            st.executions = st.rows = 0
+            st.total_ms = st.max_ms = 0.0
+            st._recent.clear()
+        return len(_BY_SQL)
@@ -1,17 +1,61 @@
-from fastapi import FastAPI
+import asyncio
+import time
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 
 from provisioning_api.api.routes.records  import router as records_router
 from provisioning_api.api.routes.export   import router as export_router
+from provisioning_api.api.routes.export_jobs import router as export_jobs_router
 from provisioning_api.api.routes.ai       import router as ai_router
 from provisioning_api.api.routes.options  import router as options_router
+from provisioning_api.api.routes.cache    import router as cache_router
+from provisioning_api.api.routes.replay   import router as replay_router
+from provisioning_api.api.routes.sql      import router as sql_router
+from provisioning_api.api.routes.stats    import router as stats_router
+from provisioning_api.api.routes.mirror   import router as mirror_router
+from provisioning_api.api.routes.tail     import router as tail_router
+from provisioning_api.ai.graph           import warm_up as warm_up_ai
 from provisioning_api.core.config        import get_settings
-from provisioning_api.core.logging       import configure_logging
+from provisioning_api.core.logging       import configure_logging, logger
+from provisioning_api.core.metrics       import begin_request, end_request, observe_request, render_prometheus
+from provisioning_api.db.oracle          import close_pools_async, init_driver, pool_stats
+from provisioning_api.mirror.sync        import run_forever as run_mirror_sync
+from provisioning_api.services           import admission, export_jobs
 
 configure_logging()
 settings = get_settings()
 
-app = FastAPI(title="Dashboard Provisioning API")
+
+def warm_up() -> float:
+    """Lo pesado que no se carga al importar: modo del driver Oracle y grafo de /ai."""
+    t0 = time.perf_counter()
+    init_driver()
+    warm_up_ai()
+    return time.perf_counter() - t0
+
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    if settings.startup_warmup:
+        logger.info("warm-up de arranque: %.2fs", await asyncio.to_thread(warm_up))
+    mirror_task = None
+    if settings.mirror_enabled and settings.mirror_sync_in_app:
+        mirror_task = asyncio.create_task(run_mirror_sync())
+    yield
+    await export_jobs.shutdown()
+    if mirror_task is not None:
+        mirror_task.cancel()
+        try:
+            await mirror_task
+        except asyncio.CancelledError:
+            pass
+    await close_pools_async()
+
+
+app = FastAPI(title="Dashboard Provisioning API", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -19,15 +63,72 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
-    expose_headers=["Content-Disposition"],
+    expose_headers=["Content-Disposition", "X-Total", "X-Next-Cursor", "X-Prev-Cursor",
+                    "X-Count-Strategy", "X-Has-More", "X-Total-Estimate", "X-Source", "X-Fresh-As-Of",
+                    "Server-Timing", "Accept-Ranges", "Content-Range"],
 )
 
+
+async def _observed_body(body, m, method: str, route: str, status: int):
+    # streaming: los headers ya salieron; el request se observa al terminar el cuerpo
+    try:
+        async for chunk in body:
+            m.bytes += len(chunk)
+            yield chunk
+    finally:
+        observe_request(m, method, route, status)
+
+
+@app.middleware("http")
+async def request_metrics(request: Request, call_next):
+    m, token = begin_request()
+    try:
+        response = await call_next(request)
+    except Exception:
+        observe_request(m, request.method, getattr(request.scope.get("route"), "path", "unmatched"), 500)
+        raise
+    finally:
+        end_request(token)
+    route = getattr(request.scope.get("route"), "path", "unmatched")
+    length = response.headers.get("content-length")
+    if length is not None:
+        m.bytes = int(length)
+        total = observe_request(m, request.method, route, response.status_code)
+        response.headers["Server-Timing"] = m.server_timing(total)
+    else:
+        response.headers["Server-Timing"] = m.server_timing()
+        response.body_iterator = _observed_body(response.body_iterator, m, request.method, route,
+                                                response.status_code)
+    return response
+
 app.include_router(records_router, prefix=settings.api_prefix)
 app.include_router(export_router,  prefix=settings.api_prefix)
+app.include_router(export_jobs_router, prefix=settings.api_prefix)
 app.include_router(ai_router,      prefix=settings.api_prefix)
 app.include_router(options_router, prefix=settings.api_prefix)
+app.include_router(cache_router,   prefix=settings.api_prefix)
+app.include_router(replay_router,  prefix=settings.api_prefix)
+app.include_router(sql_router,     prefix=settings.api_prefix)
+app.include_router(stats_router,   prefix=settings.api_prefix)
+app.include_router(mirror_router,  prefix=settings.api_prefix)
+app.include_router(tail_router,    prefix=settings.api_prefix)
 
 
 @app.get("/health")
 def health():
     return {"status": "ok"}
+
+
+@app.get("/health/pools")
+def health_pools():
+    return pool_stats()
+
+
+@app.get("/health/admission")
+def health_admission():
+    return admission.stats()
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    return PlainTextResponse(render_prometheus(), media_type="text/plain; version=0.0.4; charset=utf-8")
@@ -0,0 +1,96 @@
+"""
+Lecturas de /records desde el espejo local.
+
+`covering` decide si el espejo puede contestar un pedido: la base del pedido
+es la espejada (misma `db_identity`), el NE está en `MIRROR_NE_IDS`, no se
+piden columnas de payload y la ventana cae dentro de lo sincronizado (con un
+atraso tolerado de `MIRROR_MAX_STALENESS` segundos si la ventana llega a
+"ahora"). Devuelve `fresh_as_of`: hasta cuándo está completo el espejo.
+"""
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime, timedelta
+
+from provisioning_api.core.cache import TTLCache
+from provisioning_api.core.config import get_settings
+from provisioning_api.core.metrics import add_rows, stage
+from provisioning_api.db.oracle import db_identity
+from provisioning_api.db.sql.queries import (
+    COLUMN_NAMES, OPTIONAL_FILTERS, PAYLOAD_COLUMNS, REQUIRED_FIELDS, _is_set, resolve_fields,
+)
+from provisioning_api.mirror import store
+from provisioning_api.repositories.records_repository import _keyset_for, _keyset_page
+
+_FMT = "%Y-%m-%d %H:%M:%S"
+
+_settings = get_settings()
+# estado por NE releído como mucho una vez por segundo (el sync puede correr en otro proceso)
+_STATES = TTLCache(maxsize=1024, ttl=1)
+
+
+def _read_state(ne: str) -> dict:
+    return {"state": store.state(ne), "matches": store.matches(store.source_db())}
+
+
+async def _state(ne: str) -> dict | None:
+    hit = _STATES.get(ne)
+    if hit is None:
+        # lecturas de SQLite: fuera del event loop
+        hit = await asyncio.to_thread(_read_state, ne)
+        _STATES.set(ne, hit)
+    return hit["state"] if hit["matches"] else None
+
+
+async def covering(db: dict, filters: dict) -> str | None:
+    if not _settings.mirror_enabled:
+        return None
+    src = store.source_db()
+    ne = filters.get("pri_ne_id")
+    if src is None or ne not in _settings.mirror_ne_ids or db_identity(db) != db_identity(src):
+        return None
+    try:
+        fields = resolve_fields(filters.get("fields"))
+        start = datetime.strptime(str(filters["start_date"]).strip(), _FMT)
+        end = datetime.strptime(str(filters["end_date"]).strip(), _FMT)
+    except (KeyError, ValueError):
+        return None  # Oracle contesta (o rechaza) como siempre
+    if fields is None or any(c in PAYLOAD_COLUMNS for c in fields):
+        return None
+    st = await _state(ne)
+    if not st or not st["synced_until"] or not st["covered_from"]:
+        return None
+    if start < datetime.strptime(st["covered_from"], _FMT):
+        return None
+    synced = datetime.strptime(st["synced_until"], _FMT)
+    # lo posterior a "ahora" todavía no existe: sólo cuenta el atraso del espejo
+    if min(end, datetime.now()) > synced + timedelta(seconds=_settings.mirror_max_staleness):
+        return None
+    return st["synced_until"]
+
+
+async def load_page(filters: dict, raw: bool, fresh_as_of: str) -> dict:
+    """Página de /records con la misma forma que `records_repository.fetch_page` más el total."""
+    keyset = _keyset_for(filters)
+    limit = int(filters.get("limit", 200))
+    offset = int(filters.get("offset", 0))
+    optional = tuple(name for name in OPTIONAL_FILTERS if _is_set(filters.get(name)))
+    wanted = set(resolve_fields(filters.get("fields"))) | set(REQUIRED_FIELDS)
+    fields = tuple(c for c in COLUMN_NAMES if c in wanted)
+    with stage("mirror"):
+        cols, rows, total = await asyncio.to_thread(store.query_page, filters, optional, fields, keyset, limit, offset)
+    add_rows(len(rows))
+
+    page = {"next_cursor": None, "prev_cursor": None, "has_more": None}
+    if keyset is not None:
+        rows, cursors = _keyset_page(rows, cols, keyset, limit)
+        page.update(cursors)
+    else:
+        page["has_more"] = offset + len(rows) < total
+    if raw:
+        page["columns"], page["items"] = cols, rows
+    else:
+        with stage("convert"):
+            page["items"] = [dict(zip(cols, r)) for r in rows]
+    return {**page, "total": total, "count_strategy": "mirror", "source": "mirror", "fresh_as_of": fresh_as_of}
+
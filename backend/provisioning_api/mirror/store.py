@@ -0,0 +1,191 @@
+"""
+Almacén local (SQLite) del espejo de swp_provisioning_interfaces.
+
+Guarda, para los NE configurados en `MIRROR_NE_IDS`, las columnas de la
+proyección por defecto de /records (sin pri_request/pri_response) más
+pri_ne_group, con los mismos valores que entrega Oracle (fechas como texto
+'YYYY-MM-DD HH24:MI:SS'). `sync_state` lleva por NE el high-watermark
+(pri_action_date, pri_id), desde cuándo hay datos y hasta cuándo están
+completos. Todas las funciones son bloqueantes: desde async van con
+`asyncio.to_thread`.
+"""
+from __future__ import annotations
+
+import hashlib
+import sqlite3
+from contextlib import contextmanager
+
+from provisioning_api.core.config import get_settings
+from provisioning_api.db.oracle import db_identity
+from provisioning_api.db.sql.queries import DEFAULT_FIELDS, NUMBER_COLUMNS
+
+# pri_ne_group no se proyecta en /records pero es filtro de /records
+MIRROR_COLUMNS = DEFAULT_FIELDS + ("pri_ne_group",)
+
+_SCHEMA = [
+    "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)",
+    "CREATE TABLE IF NOT EXISTS records ({})".format(", ".join(
+        "pri_id INTEGER PRIMARY KEY" if c == "pri_id" else f"{c} {'NUMERIC' if c in NUMBER_COLUMNS else 'TEXT'}"
+        for c in MIRROR_COLUMNS
+    )),
+    "CREATE INDEX IF NOT EXISTS ix_records_ne_date ON records (pri_ne_id, pri_action_date, pri_id)",
+    """CREATE TABLE IF NOT EXISTS sync_state (
+        pri_ne_id TEXT PRIMARY KEY,
+        covered_from TEXT,
+        synced_until TEXT,
+        wm_date TEXT,
+        wm_id INTEGER,
+        last_error TEXT
+    )""",
+]
+_UPSERT = "INSERT OR REPLACE INTO records ({}) VALUES ({})".format(
+    ", ".join(MIRROR_COLUMNS), ", ".join("?" for _ in MIRROR_COLUMNS),
+)
+_STATE_FIELDS = ("pri_ne_id", "covered_from", "synced_until", "wm_date", "wm_id", "last_error")
+
+_settings = get_settings()
+
+
+def source_db() -> dict | None:
+    """Perfil de la base que se espeja (MIRROR_DB_*), o None si no está configurado."""
+    s = _settings
+    if not (s.mirror_db_host and s.mirror_db_service and s.mirror_db_user):
+        return None
+    return {
+        "host": s.mirror_db_host, "port": s.mirror_db_port, "service": s.mirror_db_service,
+        "user": s.mirror_db_user, "password": s.mirror_db_password or "",
+    }
+
+
+def _identity_tag(db: dict) -> str:
+    return hashlib.sha256(repr(db_identity(db)).encode("utf-8")).hexdigest()
+
+
+@contextmanager
+def connect():
+    con = sqlite3.connect(_settings.mirror_path, timeout=30)
+    try:
+        con.execute("PRAGMA journal_mode=WAL")
+        con.execute("PRAGMA synchronous=NORMAL")
+        yield con
+    finally:
+        con.close()
+
+
+def init(db: dict) -> None:
+    """Crea el esquema; si el espejo era de otra base (u otras credenciales) lo vacía."""
+    tag = _identity_tag(db)
+    with connect() as con, con:
+        for stmt in _SCHEMA:
+            con.execute(stmt)
+        row = con.execute("SELECT value FROM meta WHERE key = 'identity'").fetchone()
+        if row is not None and row[0] != tag:
+            con.execute("DELETE FROM records")
+            con.execute("DELETE FROM sync_state")
+        con.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('identity', ?)", (tag,))
+
+
+def matches(db: dict) -> bool:
+    with connect() as con:
+        try:
+            row = con.execute("SELECT value FROM meta WHERE key = 'identity'").fetchone()
+        except sqlite3.OperationalError:  # todavía sin esquema
+            return False
+    return row is not None and row[0] == _identity_tag(db)
+
+
+def state(ne: str) -> dict | None:
+    with connect() as con:
+        try:
+            row = con.execute(f"SELECT {', '.join(_STATE_FIELDS)} FROM sync_state WHERE pri_ne_id = ?",
+                              (ne,)).fetchone()
+        except sqlite3.OperationalError:
+            return None
+    return dict(zip(_STATE_FIELDS, row)) if row else None
+
+
+def states() -> list[dict]:
+    with connect() as con:
+        try:
+            rows = con.execute(f"SELECT {', '.join(_STATE_FIELDS)} FROM sync_state ORDER BY pri_ne_id").fetchall()
+            counts = dict(con.execute("SELECT pri_ne_id, COUNT(*) FROM records GROUP BY pri_ne_id").fetchall())
+        except sqlite3.OperationalError:
+            return []
+    return [{**dict(zip(_STATE_FIELDS, r)), "rows": counts.get(r[0], 0)} for r in rows]
+
+
+def upsert(ne: str, cols: list[str], rows: list, covered_from: str) -> None:
+    """Un lote del sync y el avance del watermark, en la misma transacción."""
+    pos = [cols.index(c) for c in MIRROR_COLUMNS]
+    i_date, i_id = cols.index("pri_action_date"), cols.index("pri_id")
+    last = rows[-1]
+    with connect() as con, con:
+        con.executemany(_UPSERT, ([r[i] for i in pos] for r in rows))
+        con.execute(
+            "INSERT INTO sync_state (pri_ne_id, covered_from, wm_date, wm_id) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT (pri_ne_id) DO UPDATE SET wm_date = excluded.wm_date, wm_id = excluded.wm_id "
+            "WHERE (excluded.wm_date, excluded.wm_id) > (sync_state.wm_date, sync_state.wm_id) "
+            "OR sync_state.wm_date IS NULL",
+            (ne, covered_from, last[i_date], last[i_id]),
+        )
+
+
+def finish_cycle(ne: str, covered_from: str, synced_until: str) -> None:
+    """Cierra una pasada: descarta lo anterior a `covered_from` y marca hasta dónde está completo."""
+    with connect() as con, con:
+        con.execute("DELETE FROM records WHERE pri_ne_id = ? AND pri_action_date < ?", (ne, covered_from))
+        con.execute(
+            "INSERT INTO sync_state (pri_ne_id, covered_from, synced_until, last_error) VALUES (?, ?, ?, NULL) "
+            "ON CONFLICT (pri_ne_id) DO UPDATE SET covered_from = excluded.covered_from, "
+            "synced_until = excluded.synced_until, last_error = NULL",
+            (ne, covered_from, synced_until),
+        )
+
+
+def record_error(ne: str, error: str) -> None:
+    with connect() as con, con:
+        con.execute(
+            "INSERT INTO sync_state (pri_ne_id, last_error) VALUES (?, ?) "
+            "ON CONFLICT (pri_ne_id) DO UPDATE SET last_error = excluded.last_error",
+            (ne, error),
+        )
+
+
+# ----------------- lecturas -----------------
+
+def _where(filters: dict, optional: tuple) -> tuple[str, list]:
+    where = ["pri_ne_id = ?", "pri_action_date BETWEEN ? AND ?"]
+    params = [filters["pri_ne_id"], filters["start_date"].strip(), filters["end_date"].strip()]
+    for name in optional:
+        where.append(f"{name} = ?")
+        params.append(filters[name])
+    return " AND ".join(where), params
+
+
+def query_page(filters: dict, optional: tuple, fields: tuple, keyset: dict | None,
+               limit: int, offset: int) -> tuple[list[str], list, int]:
+    """
+    (columnas, filas, total) con el mismo orden que /records. Con `keyset` se
+    leen `limit + 1` filas (en orden ascendente si es "prev"), como en Oracle.
+    """
+    where, params = _where(filters, optional)
+    cols = list(fields)
+    sql = f"SELECT {', '.join(cols)} FROM records WHERE {where}"
+    page_params = list(params)
+    if keyset is not None:
+        order = "DESC"
+        if keyset:
+            op = ">" if keyset["direction"] == "prev" else "<"
+            order = "ASC" if keyset["direction"] == "prev" else "DESC"
+            sql += f" AND (pri_action_date, pri_id) {op} (?, ?)"
+            page_params += [keyset["date"], keyset["id"]]
+        sql += f" ORDER BY pri_action_date {order}, pri_id {order} LIMIT ?"
+        page_params.append(limit + 1)
+    else:
+        sql += " ORDER BY pri_action_date DESC, pri_id DESC LIMIT ? OFFSET ?"
+        page_params += [limit, offset]
+    with connect() as con:
+        rows = con.execute(sql, page_params).fetchall()
+        total = con.execute(f"SELECT COUNT(*) FROM records WHERE {where}", params).fetchone()[0]
+    return cols, rows, total
+
@@ -0,0 +1,121 @@
+"""
+Sync incremental Oracle -> espejo local.
+
+Por cada NE de `MIRROR_NE_IDS` lee en orden ascendente de (pri_action_date,
+pri_id) desde el watermark, en lotes de `MIRROR_BATCH_ROWS` por keyset, y
+los guarda junto con el nuevo watermark (una pasada cortada se retoma desde
+el último lote). Cada pasada vuelve a leer los últimos
+`MIRROR_LOOKBACK_SECONDS` antes del watermark para levantar filas que
+llegan con fecha atrasada; los cambios posteriores sobre filas más viejas
+no se reflejan. Al terminar la pasada se descarta lo anterior a
+`MIRROR_HISTORY_DAYS` y se marca el espejo completo hasta el inicio de la
+pasada.
+
+Corre dentro de la app (`MIRROR_SYNC_IN_APP=1`, una tarea por worker de
+uvicorn) o como proceso aparte:
+
+    python -m provisioning_api.mirror.sync
+"""
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime, timedelta
+from functools import lru_cache
+
+from provisioning_api.core.config import get_settings
+from provisioning_api.core.logging import configure_logging, logger
+from provisioning_api.db.oracle import connect_async, fetch_rows_async
+from provisioning_api.db.sql.queries import _keyset_predicate, _select_columns
+from provisioning_api.db.sql.variants import register
+from provisioning_api.mirror import store
+from provisioning_api.mirror.store import MIRROR_COLUMNS
+
+_FMT = "%Y-%m-%d %H:%M:%S"
+
+_settings = get_settings()
+
+
+@lru_cache(maxsize=2)
+def _sync_sql(legacy: bool) -> str:
+    # proyección por defecto de /records + pri_ne_group; "prev" es el seek hacia adelante en el tiempo
+    cols = ",\n      ".join(_select_columns(MIRROR_COLUMNS[:-1]) + ["a.pri_ne_group"])
+    ordered = f"""
+    SELECT
+      {cols}
+    FROM swp_provisioning_interfaces a
+    WHERE a.pri_ne_id = :pri_ne_id
+      AND a.pri_level_action IN ('U','R')
+      AND {_keyset_predicate("prev")}
+    ORDER BY a.pri_action_date ASC, a.pri_id ASC
+    """
+    if legacy:
+        sql = f"SELECT q.* FROM ({ordered}) q WHERE ROWNUM <= :limit"
+    else:
+        sql = f"{ordered} FETCH FIRST :limit ROWS ONLY"
+    return register(sql, "mirror|sync" + ("|legacy" if legacy else ""))
+
+
+def _legacy(con) -> bool:
+    try:
+        return int(con.version.split(".")[0]) < 12
+    except Exception:
+        return False
+
+
+async def sync_ne(con, ne: str) -> int:
+    """Una pasada para un NE; devuelve las filas leídas."""
+    started = datetime.now()
+    covered_from = (started - timedelta(days=_settings.mirror_history_days)).strftime(_FMT)
+    st = await asyncio.to_thread(store.state, ne)
+    if st and st["wm_date"]:
+        since = datetime.strptime(st["wm_date"], _FMT) - timedelta(seconds=_settings.mirror_lookback_seconds)
+        seek = (max(since.strftime(_FMT), covered_from), 0)
+    else:
+        seek = (covered_from, 0)
+
+    sql, total = _sync_sql(_legacy(con)), 0
+    while True:
+        binds = {"pri_ne_id": ne, "k_date": seek[0], "k_id": seek[1], "limit": _settings.mirror_batch_rows}
+        cols, rows = await fetch_rows_async(con, sql, binds)
+        if rows:
+            await asyncio.to_thread(store.upsert, ne, cols, rows, covered_from)
+            total += len(rows)
+            seek = (rows[-1][cols.index("pri_action_date")], rows[-1][cols.index("pri_id")])
+        if len(rows) < _settings.mirror_batch_rows:
+            break
+    await asyncio.to_thread(store.finish_cycle, ne, covered_from, started.strftime(_FMT))
+    return total
+
+
+async def sync_once() -> dict:
+    """Una pasada por todos los NE configurados: {pri_ne_id: filas leídas o error}."""
+    db = store.source_db()
+    if db is None:
+        raise RuntimeError("Espejo sin base configurada: faltan MIRROR_DB_HOST/SERVICE/USER.")
+    await asyncio.to_thread(store.init, db)
+    out: dict = {}
+    async with connect_async(db) as con:
+        for ne in _settings.mirror_ne_ids:
+            try:
+                out[ne] = await sync_ne(con, ne)
+            except Exception as e:
+                logger.warning("mirror: sync de %s falló: %s", ne, e)
+                await asyncio.to_thread(store.record_error, ne, str(e))
+                out[ne] = str(e)
+    return out
+
+
+async def run_forever() -> None:
+    while True:
+        try:
+            logger.info("mirror: pasada %s", await sync_once())
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:  # sin conexión, credenciales, etc.: se reintenta en la próxima pasada
+            logger.warning("mirror: pasada fallida: %s", e)
+        await asyncio.sleep(_settings.mirror_sync_interval)
+
+
+if __name__ == "__main__":
+    configure_logging()
+    asyncio.run(run_forever())
@@ -1,21 +1,59 @@
-from provisioning_api.db.oracle import fetch_all
-
-
-def get_distinct_options(con, f: dict) -> dict:
-    where = [
-        "a.pri_ne_id = :pri_ne_id",
-        "a.pri_action_date BETWEEN TO_DATE(:start_date,'YYYY-MM-DD HH24:MI:SS') AND TO_DATE(:end_date,'YYYY-MM-DD HH24:MI:SS')",
-    ]
-    binds = {
-        "pri_ne_id": f["pri_ne_id"],
-        "start_date": f["start_date"],
-        "end_date": f["end_date"],
-    }
-
-    def q(col: str) -> str:
-        return f"SELECT DISTINCT {col} AS v FROM swp_provisioning_interfaces a WHERE {' AND '.join(where)} ORDER BY {col}"
-
-    actions = [r["v"] for r in fetch_all(con, q("a.pri_action"), binds) if r["v"] is not None]
-    groups = [r["v"] for r in fetch_all(con, q("a.pri_ne_group"), binds) if r["v"] is not None]
-    status = [r["v"] for r in fetch_all(con, q("a.pri_status"), binds) if r["v"] is not None]
-    return {"pri_action": actions, "pri_ne_group": groups, "pri_status": status}
+from provisioning_api.core.config import get_settings
+from provisioning_api.db.oracle import fetch_all_async
+from provisioning_api.db.sql.variants import register
+
+OPTION_COLUMNS = ("pri_action", "pri_ne_group", "pri_status")
+
+# Un solo recorrido de la tabla: GROUPING SETS produce los tres DISTINCT a la
+# vez, separados por día para poder cachear cada día por su cuenta.
+_OPTIONS_BY_DAY_SQL = register("""
+    SELECT TO_CHAR(TRUNC(a.pri_action_date),'YYYY-MM-DD') AS d,
+           a.pri_action, a.pri_ne_group, a.pri_status,
+           GROUPING(a.pri_action) AS g_action,
+           GROUPING(a.pri_ne_group) AS g_group,
+           GROUPING(a.pri_status) AS g_status
+    FROM swp_provisioning_interfaces a
+    WHERE a.pri_ne_id = :pri_ne_id
+      AND a.pri_action_date BETWEEN TO_DATE(:start_date,'YYYY-MM-DD HH24:MI:SS') AND TO_DATE(:end_date,'YYYY-MM-DD HH24:MI:SS')
+    GROUP BY GROUPING SETS (
+      (TRUNC(a.pri_action_date), a.pri_action),
+      (TRUNC(a.pri_action_date), a.pri_ne_group),
+      (TRUNC(a.pri_action_date), a.pri_status)
+    )
+""", "options|by_day")
+
+
+def empty_options() -> dict:
+    return {col: set() for col in OPTION_COLUMNS}
+
+
+def merge_options(parts) -> dict:
+    """Une conjuntos por columna y los devuelve ordenados, como el DISTINCT ... ORDER BY original."""
+    merged = empty_options()
+    for part in parts:
+        for col in OPTION_COLUMNS:
+            merged[col] |= part[col]
+    return {col: sorted(merged[col]) for col in OPTION_COLUMNS}
+
+
+async def fetch_options_by_day(con, pri_ne_id: str, start_date: str, end_date: str) -> dict:
+    """{'YYYY-MM-DD': {'pri_action': set, 'pri_ne_group': set, 'pri_status': set}} del rango."""
+    s = get_settings()
+    rows = await fetch_all_async(
+        con, _OPTIONS_BY_DAY_SQL,
+        {"pri_ne_id": pri_ne_id, "start_date": start_date, "end_date": end_date},
+        max_rows=s.max_unpaginated_rows, max_bytes=s.max_unpaginated_bytes,
+    )
+    days: dict = {}
+    for r in rows:
+        day = days.setdefault(r["d"], empty_options())
+        # GROUPING(col) = 0 indica a qué conjunto pertenece la fila
+        for col, flag in (("pri_action", "g_action"), ("pri_ne_group", "g_group"), ("pri_status", "g_status")):
+            if r[flag] == 0 and r[col] is not None:
+                day[col].add(r[col])
+    return days
+
+
+async def get_distinct_options(con, f: dict) -> dict:
+    days = await fetch_options_by_day(con, f["pri_ne_id"], f["start_date"], f["end_date"])
+    return merge_options(days.values())
@@ -1,5 +1,21 @@
-from provisioning_api.db.oracle import fetch_all, fetch_count
-from provisioning_api.db.sql.queries import build_sql
+from provisioning_api.core.config import get_settings
+from provisioning_api.core.metrics import stage
+from provisioning_api.db.oracle import fetch_all_async, fetch_count_async, fetch_batches_async, fetch_rows_async
+from provisioning_api.db.sql.queries import PAYLOAD_IN_SIZES, build_payload_sql, build_sql, resolve_fields
+from provisioning_api.db.sql.variants import register
+from provisioning_api.utils.pagination import decode_cursor, encode_cursor
+
+# NE de un pri_ne_group con movimiento en la ventana (para /records multi-NE)
+GROUP_MEMBERS_SQL = register("""
+    SELECT DISTINCT a.pri_ne_id
+    FROM swp_provisioning_interfaces a
+    WHERE a.pri_action_date BETWEEN TO_DATE(:start_date,'YYYY-MM-DD HH24:MI:SS')
+                                AND TO_DATE(:end_date,'YYYY-MM-DD HH24:MI:SS')
+      AND a.pri_ne_group = :pri_ne_group
+      AND a.pri_level_action IN ('U','R')
+      AND a.pri_ne_id IS NOT NULL
+    ORDER BY a.pri_ne_id
+""", "ne_group|members")
 
 def _supports_offset_fetch(con) -> bool:
     try:
@@ -8,17 +24,128 @@ def _supports_offset_fetch(con) -> bool:
     except Exception:
         return True  # si no sabemos, asumimos 12+
 
-def fetch_records(con, filters: dict, paginated: bool = True):
+def _keyset_for(filters: dict):
+    """None = paginación por OFFSET (legacy); dict = keyset (vacío en la primera página)."""
+    if filters.get("cursor"):
+        return decode_cursor(filters["cursor"])
+    if filters.get("pagination") == "keyset":
+        return {}
+    return None
+
+def _keyset_page(rows: list, cols: list, keyset: dict, limit: int) -> tuple[list, dict]:
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    backwards = keyset.get("direction") == "prev"
+    if backwards:
+        rows.reverse()
+    # hacia adelante hay más si sobró una fila, o si venimos retrocediendo;
+    # hacia atrás hay más si se partió de un cursor "next" o sobró al retroceder
+    more_after = has_more if not backwards else True
+    more_before = bool(keyset) if not backwards else has_more
+    i_date, i_id = cols.index("pri_action_date"), cols.index("pri_id")
+    cursors = {"next_cursor": None, "prev_cursor": None, "has_more": bool(rows) and more_after}
+    if rows and more_after:
+        cursors["next_cursor"] = encode_cursor(rows[-1][i_date], rows[-1][i_id], "next")
+    if rows and more_before:
+        cursors["prev_cursor"] = encode_cursor(rows[0][i_date], rows[0][i_id], "prev")
+    return rows, cursors
+
+def count_signature(filters: dict) -> tuple:
+    """Clave estable del COUNT de un filtro: no depende de la página pedida."""
+    _, count_sql, binds = build_sql(filters, include_pagination=False)
+    return count_sql, tuple(sorted((k, str(v)) for k, v in binds.items()))
+
+async def count_records(con, filters: dict) -> int:
+    _, count_sql, binds = build_sql(filters, include_pagination=False)
+    return await fetch_count_async(con, count_sql, binds)
+
+async def fetch_page(con, filters: dict, window_total: bool = False, lookahead: bool = False,
+                     raw: bool = False) -> dict:
+    """
+    Una página de /records, sin total salvo que `window_total` lo pida en el
+    mismo statement (`total` queda None si no se pudo obtener así).
+    `lookahead` lee una fila extra en modo OFFSET para informar `has_more`.
+    Con `raw` las filas quedan como tuplas y `columns` trae los nombres, sin
+    armar un dict por fila. Sólo se proyectan las columnas de `filters["fields"]`.
+    """
     legacy = not _supports_offset_fetch(con)
-    select_sql, count_sql, binds = build_sql(
-        filters, include_pagination=paginated, use_legacy_pagination=legacy
+    keyset = _keyset_for(filters)
+    limit = int(filters.get("limit", 200))
+    # con keyset el COUNT OVER() contaría sólo lo que queda después del cursor
+    window_total = window_total and keyset is None
+    query_filters = {**filters, "limit": limit + 1} if lookahead and keyset is None else filters
+    select_sql, _, binds = build_sql(
+        query_filters, include_pagination=True, use_legacy_pagination=legacy,
+        keyset=keyset, with_total=window_total, fields=resolve_fields(filters.get("fields")),
     )
+    cols, rows = await fetch_rows_async(con, select_sql, binds)
 
-    items = fetch_all(con, select_sql, binds)
+    page = {"next_cursor": None, "prev_cursor": None, "has_more": None, "total": None}
+    if keyset is not None:
+        rows, cursors = _keyset_page(rows, cols, keyset, limit)
+        page.update(cursors)
+    elif lookahead:
+        page["has_more"] = len(rows) > limit
+        rows = rows[:limit]
 
-    if paginated:
-        binds_count = {k: v for k, v in binds.items() if k not in ("offset", "limit")}
-        total = fetch_count(con, count_sql, binds_count) if count_sql else len(items)
+    # columnas auxiliares que no son parte del registro
+    extra = [i for i, c in enumerate(cols) if c in ("total_rows", "rn")]
+    if window_total and rows:
+        page["total"] = int(rows[0][cols.index("total_rows")])
+    if extra:
+        keep = [i for i in range(len(cols)) if i not in extra]
+        cols = [cols[i] for i in keep]
+        rows = [tuple(r[i] for i in keep) for r in rows]
+
+    if raw:
+        page["columns"], page["items"] = cols, rows
     else:
-        total = fetch_count(con, count_sql, binds) if count_sql else len(items)
-    return items, int(total)
+        with stage("convert"):
+            page["items"] = [dict(zip(cols, r)) for r in rows]
+    return page
+
+async def fetch_keyset_rows(con, filters: dict, keyset: dict, n: int) -> tuple[list[str], list]:
+    """
+    (columnas, filas) crudas de hasta `n + 1` filas en orden de keyset desde
+    `keyset` (vacío = las más nuevas), sin armar la página: la base del merge
+    de /records con varios NE.
+    """
+    select_sql, _, binds = build_sql(
+        {**filters, "limit": n}, include_pagination=True, use_legacy_pagination=not _supports_offset_fetch(con),
+        keyset=keyset, fields=resolve_fields(filters.get("fields")),
+    )
+    return await fetch_rows_async(con, select_sql, binds)
+
+async def fetch_group_members(con, filters: dict) -> list[str]:
+    binds = {k: filters[k] for k in ("start_date", "end_date", "pri_ne_group")}
+    _, rows = await fetch_rows_async(con, GROUP_MEMBERS_SQL, binds)
+    return [r[0] for r in rows]
+
+async def fetch_records(con, filters: dict, paginated: bool = True) -> dict:
+    if paginated:
+        page = await fetch_page(con, filters)
+        page["total"] = await count_records(con, filters)
+        return page
+
+    select_sql, count_sql, binds = build_sql(filters, include_pagination=False)
+    s = get_settings()
+    items = await fetch_all_async(con, select_sql, binds,
+                                  max_rows=s.max_unpaginated_rows, max_bytes=s.max_unpaginated_bytes)
+    return {"items": items, "total": len(items)}
+
+async def iter_record_batches(con, filters: dict, arraysize=None):
+    """Filas del rango completo (sin paginar), de a un lote de dicts por round trip."""
+    select_sql, _, binds = build_sql(filters, include_pagination=False)
+    async for batch in fetch_batches_async(con, select_sql, binds, arraysize):
+        yield batch
+
+async def fetch_payloads(con, pri_ids: list) -> list[dict]:
+    """pri_request/pri_response de los `pri_ids` pedidos, en listas IN de a 1000."""
+    ids = list(dict.fromkeys(int(i) for i in pri_ids))
+    s = get_settings()
+    chunk = PAYLOAD_IN_SIZES[-1]
+    items = []
+    for start in range(0, len(ids), chunk):
+        sql, binds = build_payload_sql(ids[start:start + chunk])
+        items.extend(await fetch_all_async(con, sql, binds, max_bytes=s.max_unpaginated_bytes))
+    return items
@@ -0,0 +1,16 @@
+from provisioning_api.core.config import get_settings
+from provisioning_api.db.oracle import fetch_all_async
+from provisioning_api.db.sql.queries import build_stats_sql
+
+
+async def fetch_buckets(con, filters: dict, bucket: str, dimension: str) -> dict:
+    """{'YYYY-MM-DD HH24:MI:SS' (inicio del bucket): {valor: conteo}} con los buckets que tienen filas."""
+    s = get_settings()
+    sql, binds = build_stats_sql(filters, bucket, dimension)
+    rows = await fetch_all_async(
+        con, sql, binds, max_rows=s.max_unpaginated_rows, max_bytes=s.max_unpaginated_bytes,
+    )
+    out: dict = {}
+    for r in rows:
+        out.setdefault(r["bucket"], {})[r["dim_value"]] = int(r["n"])
+    return out
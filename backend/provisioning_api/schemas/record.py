@@ -1,4 +1,4 @@
-from typing import Optional, Union
+from typing import Literal, Optional, Union
 from pydantic import BaseModel
 
 Num = Union[int, float, str]
@@ -51,7 +51,18 @@ class Record(BaseModel):
 
 class RecordsResponse(BaseModel):
     items: list[Record]
-    total: int
+    total: Optional[int] = None
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
+    count_strategy: str = "exact"
+    has_more: Optional[bool] = None
+    total_estimate: Optional[int] = None
+    # "mirror" si contestó el espejo local; `fresh_as_of` dice hasta cuándo está completo
+    source: str = "oracle"
+    fresh_as_of: Optional[str] = None
+    # consultas multi-NE: NE consultados y total por NE
+    ne_ids: Optional[list[str]] = None
+    ne_totals: Optional[dict[str, int]] = None
 
 
 class DBParams(BaseModel):
@@ -65,15 +76,71 @@ class DBParams(BaseModel):
 class Filters(BaseModel):
     start_date: str
     end_date: str
-    pri_ne_id: str
+    # /records acepta varios NE (`pri_ne_ids`) o sólo `pri_ne_group` (se consultan
+    # todos sus NE); el resto de los endpoints requiere `pri_ne_id`
+    pri_ne_id: Optional[str] = None
+    pri_ne_ids: Optional[list[str]] = None
     pri_id: Optional[int] = None
     pri_action: Optional[str] = None
     pri_ne_group: Optional[str] = None
     pri_status: Optional[str] = None
     limit: int = 200
     offset: int = 0
+    # "keyset" pagina con cursores opacos (next_cursor/prev_cursor) en vez de OFFSET
+    pagination: Literal["offset", "keyset"] = "offset"
+    cursor: Optional[str] = None
+    # cómo se calcula `total`: ver records_service.get_records
+    count: Literal["exact", "cached", "parallel", "window", "none"] = "exact"
+    # columnas de /records; por defecto todas menos pri_request/pri_response
+    # (ver /records/{pri_id}/payload), ["*"] trae todas. El export ignora este campo.
+    fields: Optional[list[str]] = None
 
 
 class RecordsRequest(BaseModel):
     db: DBParams
     filters: Filters
+
+
+class RecordsPageRequest(RecordsRequest):
+    # json: items como objetos; columnar: {"columns", "data": columna -> valores};
+    # arrow: stream IPC de Apache Arrow con los metadatos en headers X-*
+    format: Literal["json", "columnar", "arrow"] = "json"
+
+
+class ExportRequest(RecordsRequest):
+    # nombre registrado en utils.export_formats (sql, csv, jsonl, parquet)
+    format: str = "sql"
+    compression: Optional[Literal["gzip", "zstd"]] = None
+
+
+class ExportJobResumeRequest(BaseModel):
+    # las credenciales no se guardan en disco: después de un reinicio hay que volver a mandarlas
+    db: Optional[DBParams] = None
+
+
+class StatsRequest(RecordsRequest):
+    # TRUNC de pri_action_date y columna por la que se cuentan las filas
+    bucket: Literal["minute", "hour", "day"] = "hour"
+    dimension: Literal["pri_status", "pri_action", "pri_error_code"] = "pri_status"
+
+
+class AiQueryRequest(BaseModel):
+    db: DBParams
+    # una pregunta (`text`) o varias (`texts`, se procesan en paralelo)
+    text: Optional[str] = None
+    texts: Optional[list[str]] = None
+
+
+class PayloadRequest(BaseModel):
+    db: DBParams
+
+
+class PayloadBatchRequest(PayloadRequest):
+    pri_ids: list[int]
+
+
+class ReplayRequest(BaseModel):
+    source: DBParams
+    target: DBParams
+    filters: Filters
+    batch_size: int = 1000
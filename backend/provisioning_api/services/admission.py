@@ -0,0 +1,126 @@
+"""
+Control de admisión por perfil de base.
+
+Cada `db_identity` tiene un cupo de `ADMISSION_MAX_CONCURRENT` requests
+ejecutándose contra Oracle y una fila de espera de `ADMISSION_MAX_QUEUE`.
+Con la fila llena, o tras `ADMISSION_QUEUE_TIMEOUT` segundos esperando, se
+rechaza enseguida con `Overloaded` (las rutas responden 429 con
+Retry-After) en vez de apilar consultas sobre una base saturada.
+
+El cupo es por request, no por sesión: un /records con count=parallel usa
+dos sesiones con un solo cupo, y un `admit` anidado para la misma base (p.
+ej. /ai/query -> get_records) no vuelve a pedir cupo, así no hay deadlock.
+"""
+from __future__ import annotations
+
+import asyncio
+import math
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+
+from provisioning_api.core.config import get_settings
+from provisioning_api.db.oracle import db_identity
+
+_settings = get_settings()
+
+
+class Overloaded(RuntimeError):
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class Gate:
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.active = 0
+        self.waiters: deque[asyncio.Future] = deque()
+        self.admitted = self.rejected = 0
+        self.hold_ewma = 1.0  # segundos que dura un request admitido (para Retry-After)
+
+    def retry_after(self) -> int:
+        return max(1, math.ceil(self.hold_ewma * (len(self.waiters) + 1) / self.limit))
+
+    async def acquire(self) -> None:
+        if self.active < self.limit and not self.waiters:
+            self.active += 1
+            self.admitted += 1
+            return
+        if len(self.waiters) >= _settings.admission_max_queue:
+            self.rejected += 1
+            raise Overloaded("Base saturada: demasiadas consultas en curso, reintentá en unos segundos.",
+                             self.retry_after())
+        fut = asyncio.get_running_loop().create_future()
+        self.waiters.append(fut)
+        try:
+            await asyncio.wait_for(asyncio.shield(fut), _settings.admission_queue_timeout)
+        except asyncio.TimeoutError:
+            self._abandon(fut)
+            self.rejected += 1
+            raise Overloaded("Base saturada: se agotó la espera por un cupo, reintentá en unos segundos.",
+                             self.retry_after())
+        except BaseException:
+            self._abandon(fut)
+            raise
+        self.admitted += 1
+
+    def _abandon(self, fut: asyncio.Future) -> None:
+        if fut.done() and not fut.cancelled():
+            # el cupo ya se había traspasado a este waiter: se devuelve
+            self.release(None)
+        else:
+            fut.cancel()
+            try:
+                self.waiters.remove(fut)
+            except ValueError:
+                pass
+
+    def release(self, held: float | None) -> None:
+        if held is not None:
+            self.hold_ewma = 0.8 * self.hold_ewma + 0.2 * held
+        # el cupo pasa directo al primer waiter vivo, sin liberarlo
+        while self.waiters:
+            fut = self.waiters.popleft()
+            if not fut.done():
+                fut.set_result(None)
+                return
+        self.active -= 1
+
+    def stats(self) -> dict:
+        return {
+            "limit": self.limit, "active": self.active, "waiting": len(self.waiters),
+            "admitted": self.admitted, "rejected": self.rejected, "hold_ewma_s": round(self.hold_ewma, 3),
+        }
+
+
+_GATES: dict[tuple, Gate] = {}
+_ADMITTED: ContextVar[frozenset] = ContextVar("admitted_dbs", default=frozenset())
+
+
+@asynccontextmanager
+async def admit(db: dict):
+    """Ocupa un cupo de la base de `db` mientras dura el bloque; Overloaded si no hay."""
+    ident = db_identity(db)
+    held = _ADMITTED.get()
+    if not _settings.admission_enabled or ident in held:
+        yield
+        return
+    gate = _GATES.get(ident)
+    if gate is None:
+        gate = _GATES[ident] = Gate(max(1, _settings.admission_max_concurrent))
+    await gate.acquire()
+    _ADMITTED.set(held | {ident})
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        # set y no reset: en un export el bloque termina en otra tarea (la del streaming)
+        _ADMITTED.set(held)
+        gate.release(time.perf_counter() - t0)
+
+
+def stats() -> list[dict]:
+    # sin credenciales: host/puerto/servicio/usuario
+    return [{"db": "{}:{}/{} ({})".format(*ident[:4]), **g.stats()} for ident, g in _GATES.items()]
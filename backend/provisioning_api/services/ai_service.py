@@ -0,0 +1,47 @@
+"""
+/ai/query: interpreta la pregunta con el pipeline de LangGraph y ejecuta la
+página de registros y las opciones de filtros en una misma sesión del pool,
+en lugar de tres round trips (/ai/ask, /records, /options).
+"""
+import asyncio
+
+from provisioning_api.ai.graph import run_pipeline, run_pipeline_batch
+from provisioning_api.core.config import get_settings
+from provisioning_api.db.oracle import connect_async
+from provisioning_api.schemas.record import Filters
+from provisioning_api.services.admission import admit
+from provisioning_api.services.options_service import get_distinct_options
+from provisioning_api.services.records_service import get_records
+from provisioning_api.services.response_cache import USE
+from provisioning_api.utils.records_json import records_to_items
+
+async def query(db: dict, text: str, cache: str = USE) -> dict:
+    parsed = await asyncio.to_thread(run_pipeline, text)
+    return await _execute(db, parsed, cache)
+
+async def query_batch(db: dict, texts: list[str], cache: str = USE) -> list[dict]:
+    parsed = await asyncio.to_thread(run_pipeline_batch, texts)
+    sem = asyncio.Semaphore(max(1, get_settings().ai_query_concurrency))
+
+    async def run(p: dict) -> dict:
+        async with sem:
+            return await _execute(db, p, cache)
+
+    return await asyncio.gather(*(run(p) for p in parsed))
+
+async def _execute(db: dict, parsed: dict, cache: str) -> dict:
+    """Resultado del pipeline + `records` y `options` (None si el pipeline dio errores)."""
+    out = {**parsed, "records": None, "options": None}
+    if parsed["errors"]:
+        return out
+    # mismos defaults y misma forma (`rows`) que /records en JSON, así comparten
+    # la entrada de la cache de respuestas
+    filters = Filters(**parsed["filters"]).model_dump()
+    # un solo cupo para las dos consultas (los `cached` de adentro no piden otro)
+    async with admit(db), connect_async(db) as con:
+        page = await get_records(db, filters, cache, shape="rows", con=con)
+        out["options"] = await get_distinct_options(db, filters, cache, con=con)
+    # la página cacheada se comparte: se arma una nueva con items como dicts
+    out["records"] = {k: v for k, v in page.items() if k != "columns"}
+    out["records"]["items"] = records_to_items(page["columns"], page["items"])
+    return out
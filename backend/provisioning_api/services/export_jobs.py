@@ -0,0 +1,345 @@
+"""
+Exports en segundo plano: alta, progreso, descarga y cancelación.
+
+La ventana se parte en `EXPORT_JOB_SLICES` tramos de igual duración que se
+leen a la vez (hasta `EXPORT_JOB_CONCURRENCY` sesiones por job), cada uno a
+su archivo bajo `EXPORT_JOBS_DIR/<job_id>/`. Un tramo se lee por keyset
+(pri_action_date DESC, pri_id DESC) de a `EXPORT_JOB_BATCH_ROWS` filas y,
+después de escribir cada lote, `job.json` guarda el checkpoint (fecha, id y
+bytes escritos): un job fallido o cortado se retoma truncando cada archivo al
+último checkpoint y siguiendo desde ahí. Terminados los tramos se concatenan,
+el más nuevo primero (el orden de /export), en el archivo que se descarga.
+
+Sólo formatos que se pueden partir (`ExportFormat.sliced`: sql, csv, jsonl);
+con compresión cada lote es un miembro gzip / frame zstd propio. Las
+credenciales quedan sólo en memoria: si el proceso se reinicia, el job se
+retoma mandando otra vez `db`, que tiene que ser la misma base.
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import os
+import re
+import shutil
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from provisioning_api.core.config import get_settings
+from provisioning_api.core.logging import logger
+from provisioning_api.db.oracle import connect_async, db_identity
+from provisioning_api.repositories.records_repository import count_records, fetch_keyset_rows
+from provisioning_api.services.admission import Overloaded, admit
+from provisioning_api.utils.export_formats import compress_member, filename_for, media_type_for, resolve
+
+_FMT = "%Y-%m-%d %H:%M:%S"
+_ID = re.compile(r"[0-9a-f]{32}")
+
+_settings = get_settings()
+
+
+class JobNotFound(LookupError):
+    pass
+
+
+class JobStateError(RuntimeError):
+    """La operación no corresponde al estado del job (409)."""
+
+
+class Job:
+    def __init__(self, state: dict, db: dict | None = None):
+        self.state = state
+        self.db = db
+        self.task: asyncio.Task | None = None
+        self.cancelled = False
+        self._lock = asyncio.Lock()
+
+    @property
+    def id(self) -> str:
+        return self.state["job_id"]
+
+    @property
+    def dir(self) -> str:
+        return os.path.join(_settings.export_jobs_dir, self.id)
+
+    def part(self, i: int) -> str:
+        return os.path.join(self.dir, f"part-{i:04d}")
+
+    def output(self) -> str:
+        return os.path.join(self.dir, "output")
+
+    async def save(self, **changes) -> None:
+        self.state.update(changes, updated=time.time())
+        data = json.dumps(self.state)  # foto consistente antes de soltar el loop
+        async with self._lock:
+            await asyncio.to_thread(_write_state, self.dir, data)
+
+
+def _write_state(path: str, data: str) -> None:
+    # nombre propio: un save cancelado puede seguir escribiendo en su hilo
+    tmp = os.path.join(path, f"job.json.{uuid.uuid4().hex}.tmp")
+    with open(tmp, "w", encoding="utf-8") as fh:
+        fh.write(data)
+    os.replace(tmp, os.path.join(path, "job.json"))
+
+
+def _db_tag(db: dict) -> str:
+    return hashlib.sha256(repr(db_identity(db)).encode("utf-8")).hexdigest()
+
+
+def _slices(start_date: str, end_date: str, n: int) -> list[dict]:
+    """Tramos disjuntos de igual duración (al segundo, como DATE), el más nuevo primero."""
+    start = datetime.strptime(start_date.strip(), _FMT)
+    end = datetime.strptime(end_date.strip(), _FMT)
+    if end < start:
+        raise ValueError("end_date es anterior a start_date")
+    seconds = int((end - start).total_seconds()) + 1
+    n = max(1, min(n, seconds))
+    bounds = [start + timedelta(seconds=seconds * i // n) for i in range(n + 1)]
+    out = [
+        {"start": bounds[i].strftime(_FMT), "end": (bounds[i + 1] - timedelta(seconds=1)).strftime(_FMT),
+         "rows": 0, "bytes": 0, "total": None, "checkpoint": None, "done": False}
+        for i in range(n)
+    ]
+    return out[::-1]
+
+
+_JOBS: dict[str, Job] = {}
+_RUNNING = asyncio.Semaphore(max(1, _settings.export_jobs_max_running))
+
+
+def _load(job_id: str) -> Job:
+    """Job en memoria o, después de un reinicio, desde su `job.json` (sin credenciales)."""
+    job = _JOBS.get(job_id)
+    if job is not None:
+        return job
+    path = os.path.join(_settings.export_jobs_dir, job_id, "job.json")
+    if not _ID.fullmatch(job_id) or not os.path.exists(path):
+        raise JobNotFound(f"No existe el export {job_id}")
+    with open(path, encoding="utf-8") as fh:
+        state = json.load(fh)
+    if state["status"] in ("queued", "running"):
+        state["status"] = "interrupted"  # el proceso que lo corría ya no está
+    job = _JOBS[job_id] = Job(state)
+    return job
+
+
+def _view(job: Job) -> dict:
+    st = job.state
+    totals = [s["total"] for s in st["slices"]]
+    total = sum(totals) if None not in totals else None
+    view = {
+        "job_id": job.id,
+        "status": st["status"],
+        "format": st["format"],
+        "compression": st["compression"],
+        "created": st["created"],
+        "updated": st["updated"],
+        "rows": st["rows"],
+        "total": total,
+        "progress": round(st["rows"] / total, 4) if total else (1.0 if st["status"] == "done" else None),
+        "slices": [{k: s[k] for k in ("start", "end", "rows", "total", "done")} for s in st["slices"]],
+        "error": st["error"],
+        "size": st["size"],
+        "resumable": st["status"] in ("failed", "interrupted"),
+    }
+    if st["status"] == "done":
+        view["download"] = f"{_settings.api_prefix}/export/jobs/{job.id}/download"
+    return view
+
+
+def _purge() -> None:
+    """Borra los jobs terminados hace más de `EXPORT_JOB_TTL`."""
+    root = _settings.export_jobs_dir
+    if not os.path.isdir(root):
+        return
+    limit = time.time() - _settings.export_job_ttl
+    for job_id in os.listdir(root):
+        try:
+            job = _load(job_id)
+        except (JobNotFound, OSError, ValueError, KeyError):
+            continue
+        if job.task is None and job.state["updated"] < limit:
+            _JOBS.pop(job_id, None)
+            shutil.rmtree(job.dir, ignore_errors=True)
+
+
+async def submit(db: dict, filters: dict, format_name: str, compression: str | None) -> dict:
+    fmt, compression = resolve(format_name, compression)
+    if fmt.sliced is None:
+        raise ValueError(f"El formato {fmt.name} no se puede exportar por jobs; usá sql, csv o jsonl.")
+    if not filters.get("pri_ne_id"):
+        raise ValueError("pri_ne_id es requerido")
+    slices = _slices(str(filters["start_date"]), str(filters["end_date"]), _settings.export_job_slices)
+    _purge()
+    now = time.time()
+    job = Job({
+        "job_id": uuid.uuid4().hex, "status": "queued", "created": now, "updated": now,
+        "db_tag": _db_tag(db), "format": fmt.name, "compression": compression,
+        "filters": {k: v for k, v in filters.items() if k not in ("cursor", "offset", "limit", "fields")},
+        "slices": slices, "rows": 0, "error": None, "size": None,
+    }, db)
+    await asyncio.to_thread(os.makedirs, job.dir, exist_ok=True)
+    await job.save()
+    _JOBS[job.id] = job
+    job.task = asyncio.create_task(_run(job))
+    return _view(job)
+
+
+async def resume(job_id: str, db: dict | None) -> dict:
+    job = _load(job_id)
+    if job.state["status"] not in ("failed", "interrupted"):
+        raise JobStateError(f"El export {job_id} está {job.state['status']}; sólo se retoma uno fallido o interrumpido.")
+    if db is not None:
+        if _db_tag(db) != job.state["db_tag"]:
+            raise JobStateError("La base no es la del export original.")
+        job.db = db
+    if job.db is None:
+        raise JobStateError("El servidor se reinició: mandá `db` para retomar el export.")
+    await job.save(status="queued", error=None)
+    job.task = asyncio.create_task(_run(job))
+    return _view(job)
+
+
+def status(job_id: str) -> dict:
+    return _view(_load(job_id))
+
+
+def list_jobs() -> list[dict]:
+    root = _settings.export_jobs_dir
+    ids = os.listdir(root) if os.path.isdir(root) else []
+    out = []
+    for job_id in ids:
+        try:
+            out.append(_view(_load(job_id)))
+        except (JobNotFound, OSError, ValueError, KeyError):
+            continue
+    return sorted(out, key=lambda v: v["created"], reverse=True)
+
+
+async def cancel(job_id: str) -> None:
+    """Corta el job si está corriendo y borra sus archivos."""
+    job = _load(job_id)
+    job.cancelled = True
+    if job.task is not None and not job.task.done():
+        job.task.cancel()
+        try:
+            await job.task
+        except (asyncio.CancelledError, Exception):
+            pass
+    _JOBS.pop(job_id, None)
+    await asyncio.to_thread(shutil.rmtree, job.dir, True)
+
+
+def download(job_id: str) -> tuple[str, str, str]:
+    """(ruta, nombre de archivo, media type) de un job terminado."""
+    job = _load(job_id)
+    if job.state["status"] != "done":
+        raise JobStateError(f"El export {job_id} todavía no terminó ({job.state['status']}).")
+    fmt, compression = resolve(job.state["format"], job.state["compression"])
+    return job.output(), filename_for(fmt, compression), media_type_for(fmt, compression)
+
+
+async def shutdown() -> None:
+    """Corta los jobs en curso; quedan "interrupted" en disco y se pueden retomar."""
+    tasks = [j.task for j in _JOBS.values() if j.task is not None and not j.task.done()]
+    for t in tasks:
+        t.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
+# ----------------- ejecución -----------------
+
+async def _run(job: Job) -> None:
+    try:
+        async with _RUNNING:
+            while True:
+                # un cupo de admisión para todo el job; sin cupo espera en vez de fallar con 429
+                try:
+                    async with admit(job.db):
+                        await job.save(status="running")
+                        await _run_slices(job)
+                    break
+                except Overloaded as e:
+                    await asyncio.sleep(e.retry_after)
+            size = await asyncio.to_thread(_assemble, job)
+            await job.save(status="done", size=size)
+    except asyncio.CancelledError:
+        if not job.cancelled:
+            await job.save(status="interrupted")
+        raise
+    except Exception as e:
+        logger.warning("export %s: %s", job.id, e)
+        await job.save(status="failed", error=str(e))
+
+
+async def _run_slices(job: Job) -> None:
+    sem = asyncio.Semaphore(max(1, _settings.export_job_concurrency))
+    tasks = [asyncio.create_task(_run_slice(job, i, sem))
+             for i, s in enumerate(job.state["slices"]) if not s["done"]]
+    try:
+        await asyncio.gather(*tasks)
+    except BaseException:
+        # si un tramo falla los demás se cortan: un resume no puede encontrarlos escribiendo
+        for t in tasks:
+            t.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+
+
+def _truncate(path: str, size: int) -> None:
+    with open(path, "ab") as fh:
+        fh.truncate(size)
+
+
+def _append(path: str, data: bytes) -> None:
+    with open(path, "ab") as fh:
+        fh.write(data)
+
+
+async def _run_slice(job: Job, i: int, sem: asyncio.Semaphore) -> None:
+    sl = job.state["slices"][i]
+    fmt, compression = resolve(job.state["format"], job.state["compression"])
+    encoder = fmt.sliced()
+    batch = _settings.export_job_batch_rows
+    filters = {**job.state["filters"], "start_date": sl["start"], "end_date": sl["end"], "fields": ["*"]}
+    path = job.part(i)
+    # lo escrito después del último checkpoint se descarta y se vuelve a leer
+    await asyncio.to_thread(_truncate, path, sl["bytes"])
+    async with sem, connect_async(job.db) as con:
+        if sl["total"] is None:
+            sl["total"] = await count_records(con, filters)
+        while True:
+            seek = {"direction": "next", "date": sl["checkpoint"][0], "id": sl["checkpoint"][1]} \
+                if sl["checkpoint"] else {}
+            cols, rows = await fetch_keyset_rows(con, filters, seek, batch)
+            last = len(rows) <= batch
+            rows = rows[:batch]
+            if rows:
+                data = compress_member(encoder.encode([dict(zip(cols, r)) for r in rows]), compression)
+                await asyncio.to_thread(_append, path, data)
+                i_date, i_id = cols.index("pri_action_date"), cols.index("pri_id")
+                sl["checkpoint"] = [rows[-1][i_date], rows[-1][i_id]]
+                sl["bytes"] += len(data)
+                sl["rows"] += len(rows)
+                job.state["rows"] += len(rows)
+            if last:
+                sl["done"] = True
+            await job.save()
+            if last:
+                return
+
+
+def _assemble(job: Job) -> int:
+    """Encabezado + tramos en orden -> archivo final; los tramos se borran."""
+    fmt, compression = resolve(job.state["format"], job.state["compression"])
+    with open(job.output(), "wb") as out:
+        out.write(compress_member(fmt.header, compression))
+        for i in range(len(job.state["slices"])):
+            with open(job.part(i), "rb") as fh:
+                shutil.copyfileobj(fh, out, 1024 * 1024)
+    for i in range(len(job.state["slices"])):
+        os.remove(job.part(i))
+    return os.path.getsize(job.output())
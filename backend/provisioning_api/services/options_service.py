@@ -0,0 +1,81 @@
+from datetime import date, datetime, time, timedelta
+
+from provisioning_api.core.cache import TTLCache
+from provisioning_api.core.config import get_settings
+from provisioning_api.db.oracle import db_identity, session_async
+from provisioning_api.repositories import options_repository
+from provisioning_api.repositories.options_repository import (
+    OPTION_COLUMNS, empty_options, fetch_options_by_day, merge_options,
+)
+from provisioning_api.services.response_cache import USE, cached
+
+_FMT = "%Y-%m-%d %H:%M:%S"
+# más tramos faltantes que esto se leen en un solo rango (re-leyendo días ya cacheados)
+_MAX_RUNS = 3
+
+_settings = get_settings()
+_DAYS = TTLCache(maxsize=_settings.options_day_cache_size, ttl=_settings.options_day_cache_ttl)
+
+async def get_distinct_options(db: dict, filters: dict, cache: str = USE, con=None) -> dict:
+    """`con`: sesión ya abierta a reutilizar (ver ai_service); si no, se pide una al pool."""
+    return await cached("options", db, filters, lambda: _load_options(db, filters, con), cache)
+
+def _day_bounds(d: date) -> tuple[datetime, datetime]:
+    start = datetime.combine(d, time.min)
+    return start, start + timedelta(days=1, seconds=-1)
+
+def _missing_runs(missing: list[date]) -> list[list[date]]:
+    runs: list[list[date]] = []
+    for d in missing:
+        if runs and d - runs[-1][-1] == timedelta(days=1):
+            runs[-1].append(d)
+        else:
+            runs.append([d])
+    if len(runs) > _MAX_RUNS:
+        return [missing]
+    return runs
+
+async def _load_options(db: dict, filters: dict, con=None) -> dict:
+    """
+    Las opciones se arman por día calendario: los días completos y ya asentados
+    se cachean por (perfil, pri_ne_id, día), así ampliar la ventana sólo
+    consulta los días que faltan y se unen los conjuntos. No sale del espejo
+    local: éste sólo guarda pri_level_action U/R y las opciones cubren todos.
+    """
+    try:
+        start = datetime.strptime(filters["start_date"].strip(), _FMT)
+        end = datetime.strptime(filters["end_date"].strip(), _FMT)
+    except ValueError:
+        async with session_async(db, con) as session:
+            return await options_repository.get_distinct_options(session, filters)
+
+    now = datetime.now()
+    settle = timedelta(seconds=_settings.response_cache_settle_seconds)
+    ident, ne = db_identity(db), filters["pri_ne_id"]
+
+    parts, missing, cacheable = [], [], set()
+    d = start.date()
+    while d <= end.date():
+        day_start, day_end = _day_bounds(d)
+        if start <= day_start and day_end <= end and day_end + settle < now:
+            cacheable.add(d)
+            hit = _DAYS.get((ident, ne, d))
+            if hit is not None:
+                parts.append(hit)
+                d += timedelta(days=1)
+                continue
+        missing.append(d)
+        d += timedelta(days=1)
+
+    if missing:
+        async with session_async(db, con) as session:
+            for run in _missing_runs(missing):
+                q_start = max(start, _day_bounds(run[0])[0])
+                q_end = min(end, _day_bounds(run[-1])[1])
+                days = await fetch_options_by_day(session, ne, q_start.strftime(_FMT), q_end.strftime(_FMT))
+                for day in run:
+                    part = days.get(day.isoformat(), empty_options())
+                    if day in cacheable:
+                        _DAYS.set((ident, ne, day), {col: frozenset(part[col]) for col in OPTION_COLUMNS})
+                    parts.append(part)
+    return merge_options(parts)
@@ -1,13 +1,205 @@
-from provisioning_api.db.oracle import connect
-from provisioning_api.repositories.records_repository import fetch_records
-from provisioning_api.utils.sql_export import generate_insert_statements
-
-def get_records(db: dict, filters: dict):
-    with connect(db) as con:
-        return fetch_records(con, filters, paginated=True)
-
-def generate_inserts(db: dict, filters: dict) -> str:
-    # sin paginar para exportar todo
-    with connect(db) as con:
-        items, _ = fetch_records(con, filters, paginated=False)
-        return generate_insert_statements(items)
+import asyncio
+import heapq
+from itertools import islice
+
+from provisioning_api.core.cache import TTLCache
+from provisioning_api.core.config import get_settings
+from provisioning_api.core.metrics import stage
+from provisioning_api.db.oracle import connect_async, db_identity, session_async
+from provisioning_api.db.sql.queries import _is_set
+from provisioning_api.mirror import reader as mirror
+from provisioning_api.services.admission import admit
+from provisioning_api.repositories.records_repository import (
+    _keyset_for, _keyset_page, count_records, count_signature, fetch_group_members, fetch_keyset_rows,
+    fetch_page, fetch_payloads, iter_record_batches,
+)
+from provisioning_api.services.response_cache import USE, cached
+from provisioning_api.utils.columnar import to_columns
+from provisioning_api.utils.export_formats import encode_stream
+
+_settings = get_settings()
+_COUNTS = TTLCache(maxsize=_settings.count_cache_size, ttl=_settings.count_cache_ttl)
+_GROUPS = TTLCache(maxsize=1024, ttl=_settings.fanout_group_ttl)
+
+async def get_records(db: dict, filters: dict, cache: str = USE, shape: str = "items", con=None) -> dict:
+    """
+    `shape` define cómo vienen las filas:
+      - items:    lista de dicts
+      - rows:     `columns` + tuplas del cursor en `items`
+      - columnar: `columns` + `data` (columna -> valores)
+    Con `con` todo corre en esa sesión (count=parallel pasa a exact).
+    Con varios NE (`pri_ne_ids`, o `pri_ne_group` sin NE) ver `_load_fanout`.
+    """
+    return await cached(f"records:{shape}", db, filters, lambda: _load_records(db, filters, shape, con), cache)
+
+async def _load_records(db: dict, filters: dict, shape: str, con=None) -> dict:
+    ne_ids = await _resolve_ne_ids(db, filters, con)
+    if len(ne_ids) == 1:
+        page = await _load_page(db, {**filters, "pri_ne_id": ne_ids[0]}, raw=shape != "items", con=con)
+    else:
+        page = await _load_fanout(db, filters, ne_ids, raw=shape != "items")
+    if shape == "columnar":
+        with stage("convert"):
+            page["data"] = to_columns(page["columns"], page.pop("items"))
+    return page
+
+async def _load_page(db: dict, filters: dict, raw: bool, con=None) -> dict:
+    """
+    Página de /records con el total según `filters["count"]`:
+      - exact:    COUNT(1) después de la página (comportamiento original)
+      - cached:   reutiliza el total del mismo filtro entre páginas
+      - parallel: el COUNT corre a la vez que la página, en otra sesión
+      - window:   COUNT(*) OVER () en el mismo statement
+      - none:     sin total; `has_more` (lee limit+1) y `total_estimate`
+    `count_strategy` informa qué estrategia produjo `total`. Si el espejo local
+    cubre la ventana contesta él, con total exacto (`count_strategy` "mirror").
+    """
+    fresh_as_of = await mirror.covering(db, filters)
+    if fresh_as_of is not None:
+        return await mirror.load_page(filters, raw, fresh_as_of)
+
+    strategy = filters.get("count") or "exact"
+    key = (db_identity(db), count_signature(filters))
+
+    if strategy == "cached":
+        total = _COUNTS.get(key)
+        if total is not None:
+            async with session_async(db, con) as session:
+                page = await fetch_page(session, filters, raw=raw)
+            return {**page, "total": total, "count_strategy": "cached"}
+        strategy = "exact"
+
+    if strategy == "parallel" and con is None:
+        # cada mitad toma y suelta su propia sesión: ninguna espera una segunda
+        # sesión del pool mientras retiene la primera
+        async def own_page():
+            async with connect_async(db) as own:
+                return await fetch_page(own, filters, raw=raw)
+
+        async def own_count():
+            async with connect_async(db) as own:
+                return await count_records(own, filters)
+
+        page, total = await asyncio.gather(own_page(), own_count())
+        _COUNTS.set(key, total)
+        return {**page, "total": total, "count_strategy": "parallel"}
+
+    async with session_async(db, con) as con:
+        if strategy == "none":
+            page = await fetch_page(con, filters, lookahead=True, raw=raw)
+            return {**page, "total": None, "total_estimate": _COUNTS.get_stale(key), "count_strategy": "none"}
+
+        if strategy == "window":
+            page = await fetch_page(con, filters, window_total=True, raw=raw)
+            if page["total"] is not None:
+                _COUNTS.set(key, page["total"])
+                return {**page, "count_strategy": "window"}
+            # página vacía o keyset: el analítico no sirve, contamos aparte
+        else:
+            page = await fetch_page(con, filters, raw=raw)
+        total = await count_records(con, filters)
+    _COUNTS.set(key, total)
+    return {**page, "total": total, "count_strategy": "exact"}
+
+async def _resolve_ne_ids(db: dict, filters: dict, con=None) -> list[str]:
+    """NE a consultar: `pri_ne_id` + `pri_ne_ids` sin repetir, o los NE del `pri_ne_group`."""
+    ids = [filters.get("pri_ne_id")] + list(filters.get("pri_ne_ids") or [])
+    ids = list(dict.fromkeys(str(ne).strip() for ne in ids if _is_set(ne)))
+    if not ids:
+        if not _is_set(filters.get("pri_ne_group")):
+            raise ValueError("pri_ne_id es requerido (o pri_ne_ids, o pri_ne_group)")
+        key = (db_identity(db), str(filters["pri_ne_group"]).strip(), filters["start_date"], filters["end_date"])
+        ids = _GROUPS.get(key)
+        if ids is None:
+            async with session_async(db, con) as session:
+                ids = await fetch_group_members(session, filters)
+            _GROUPS.set(key, ids)
+        if not ids:
+            raise ValueError(f"El grupo {filters['pri_ne_group']} no tiene NE con registros en la ventana")
+    if len(ids) > _settings.fanout_max_ne:
+        raise ValueError(f"Se pidieron {len(ids)} NE; el máximo es {_settings.fanout_max_ne}.")
+    return ids
+
+async def _load_fanout(db: dict, filters: dict, ne_ids: list[str], raw: bool) -> dict:
+    """
+    Página de /records sobre varios NE: una consulta por NE, todas a la vez en
+    hasta `FANOUT_CONCURRENCY` sesiones del pool, cada una en orden de keyset
+    (pri_action_date DESC, pri_id DESC) y usando el índice por NE. Las listas
+    ya ordenadas se combinan con un merge por heap que sólo recorre hasta el
+    final de la página.
+
+    Cada NE lee `limit + 1` filas desde el cursor (keyset) u `offset + limit + 1`
+    (offset, acotado por `MAX_UNPAGINATED_ROWS`). El total es la suma de los
+    COUNT por NE, también en paralelo y compartidos con el cache de totales de
+    una consulta de un solo NE; con count=none no se cuenta.
+    """
+    keyset = _keyset_for(filters)
+    limit = int(filters.get("limit", 200))
+    offset = int(filters.get("offset", 0))
+    need = limit if keyset is not None else offset + limit
+    if need > _settings.max_unpaginated_rows:
+        raise ValueError(f"offset + limit supera {_settings.max_unpaginated_rows} filas por NE; usá pagination=keyset.")
+    seek = keyset or {}
+    per_ne = [{**filters, "pri_ne_id": ne, "pri_ne_ids": None} for ne in ne_ids]
+    sem = asyncio.Semaphore(max(1, _settings.fanout_concurrency))
+
+    async def rows_of(f: dict):
+        async with sem, connect_async(db) as con:
+            return await fetch_keyset_rows(con, f, seek, need)
+
+    async def count_of(f: dict) -> int:
+        key = (db_identity(db), count_signature(f))
+        total = _COUNTS.get(key)
+        if total is None:
+            async with sem, connect_async(db) as con:
+                total = await count_records(con, f)
+            _COUNTS.set(key, total)
+        return total
+
+    counting = (filters.get("count") or "exact") != "none"
+    results = await asyncio.gather(*[rows_of(f) for f in per_ne], *[count_of(f) for f in per_ne if counting])
+    pages, counts = results[:len(per_ne)], results[len(per_ne):]
+
+    cols = pages[0][0]
+    i_date, i_id = cols.index("pri_action_date"), cols.index("pri_id")
+    # "prev" se lee ascendente (como en una sola consulta) y _keyset_page lo invierte
+    merged = heapq.merge(*(rows for _, rows in pages), key=lambda r: (r[i_date], r[i_id]),
+                         reverse=seek.get("direction") != "prev")
+    with stage("merge"):
+        if keyset is not None:
+            rows, cursors = _keyset_page(list(islice(merged, limit + 1)), cols, keyset, limit)
+            page = {**cursors}
+        else:
+            window = list(islice(merged, offset, offset + limit + 1))
+            rows = window[:limit]
+            page = {"next_cursor": None, "prev_cursor": None, "has_more": len(window) > limit}
+
+    if raw:
+        page["columns"], page["items"] = cols, rows
+    else:
+        with stage("convert"):
+            page["items"] = [dict(zip(cols, r)) for r in rows]
+    if counting:
+        return {**page, "total": sum(counts), "count_strategy": "fanout",
+                "ne_ids": ne_ids, "ne_totals": dict(zip(ne_ids, counts))}
+    return {**page, "total": None, "count_strategy": "none", "ne_ids": ne_ids}
+
+async def get_payloads(db: dict, pri_ids: list) -> list[dict]:
+    """Columnas pesadas (pri_request/pri_response) bajo demanda, fuera de la página."""
+    if len(pri_ids) > _settings.max_unpaginated_rows:
+        raise ValueError(f"Se pidieron {len(pri_ids)} pri_id; el máximo es {_settings.max_unpaginated_rows}.")
+    if not pri_ids:
+        return []
+    async with admit(db), connect_async(db) as con:
+        return await fetch_payloads(con, pri_ids)
+
+async def stream_export(db: dict, filters: dict, fmt, compression=None):
+    """
+    Exportación del rango completo como chunks de bytes: se codifica un lote de
+    `oracle_fetch_arraysize` filas por vez, así la memoria no depende del total.
+    """
+    batch_size = get_settings().oracle_fetch_arraysize
+    # el cupo de admisión se ocupa durante todo el export
+    async with admit(db), connect_async(db) as con:
+        async for chunk in encode_stream(iter_record_batches(con, filters, batch_size), fmt, compression):
+            yield chunk
@@ -0,0 +1,59 @@
+"""
+Replay: copia las filas filtradas de la base origen a un perfil destino con
+`executemany`, sin pasar por un script. Se aplican las mismas reglas que el
+script de INSERTs (RAW_OVERRIDES); el id base se lee una sola vez en destino.
+"""
+import time
+
+from provisioning_api.core.config import get_settings
+from provisioning_api.db.oracle import connect_async, db_identity, fetch_count_async
+from provisioning_api.db.sql.queries import DATE_COLUMNS
+from provisioning_api.repositories.records_repository import iter_record_batches
+from provisioning_api.services.admission import admit
+from provisioning_api.utils.sql_export import replay_bind_columns, replay_insert_sql
+
+_BASE_ID_SQL = "SELECT NVL(MAX(pri_id), 0) FROM swp_provisioning_interfaces"
+
+async def replay_records(source: dict, target: dict, filters: dict, batch_size: int) -> dict:
+    s = get_settings()
+    insert_sql = replay_insert_sql(DATE_COLUMNS)
+    bind_cols = replay_bind_columns()
+    t0 = time.perf_counter()
+    read = inserted = error_count = 0
+    errors = []
+
+    # un cupo de admisión en cada base (uno solo si son la misma), siempre en el
+    # mismo orden: dos replays cruzados no se quedan esperando el cupo del otro
+    first, second = sorted((source, target), key=db_identity)
+    async with admit(first), admit(second), connect_async(source) as src, connect_async(target) as dst:
+        # la tabla destino no debería recibir inserts concurrentes durante el replay
+        base_id = await fetch_count_async(dst, _BASE_ID_SQL, {})
+        async for batch in iter_record_batches(src, filters, batch_size):
+            params = []
+            for i, r in enumerate(batch):
+                row = {c: r.get(c) for c in bind_cols}
+                row["pri_id"] = base_id + read + i + 1
+                params.append(row)
+            cur = dst.cursor()
+            await cur.executemany(insert_sql, params, batcherrors=True)
+            batch_errors = cur.getbatcherrors()
+            await dst.commit()
+            for err in batch_errors:
+                if len(errors) < s.replay_max_errors:
+                    errors.append({
+                        "row": read + err.offset + 1,
+                        "source_pri_id": batch[err.offset].get("pri_id"),
+                        "error": err.message,
+                    })
+            error_count += len(batch_errors)
+            inserted += len(batch) - len(batch_errors)
+            read += len(batch)
+
+    return {
+        "rows_read": read,
+        "rows_inserted": inserted,
+        "error_count": error_count,
+        "errors": errors,
+        "base_id": base_id,
+        "elapsed_ms": round((time.perf_counter() - t0) * 1000, 1),
+    }
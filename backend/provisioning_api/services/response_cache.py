@@ -0,0 +1,143 @@
+"""
+Cache de respuestas para /records y /options.
+
+La clave es el perfil de base (`db_identity`) más los filtros normalizados.
+El TTL depende de la ventana: si `end_date` ya quedó atrás (más el margen de
+asentamiento) los datos no cambian y se guardan por mucho tiempo; si la
+ventana incluye "ahora", sólo unos segundos.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+from datetime import datetime, timedelta
+
+from provisioning_api.core.cache import TTLCache
+from provisioning_api.core.config import get_settings
+from provisioning_api.core.metrics import stage
+from provisioning_api.db.oracle import db_identity
+from provisioning_api.db.sql.queries import _is_set
+from provisioning_api.services.admission import admit
+from provisioning_api.utils.records_json import dumps
+
+USE, REFRESH, BYPASS = "use", "refresh", "bypass"
+
+_settings = get_settings()
+RESPONSES = TTLCache(
+    maxsize=_settings.response_cache_max_entries,
+    ttl=_settings.response_cache_ttl_live,
+    max_bytes=_settings.response_cache_max_bytes,
+)
+
+
+def normalize_filters(filters: dict) -> tuple:
+    """Filtros sin valores vacíos/"TODOS", con strings recortados y orden estable."""
+    out = []
+    for k, v in filters.items():
+        if isinstance(v, (list, tuple)):
+            v = tuple(v)
+        elif not _is_set(v):
+            continue
+        elif isinstance(v, str):
+            v = v.strip()
+        out.append((k, v))
+    return tuple(sorted(out, key=lambda kv: kv[0]))
+
+
+def cache_key(kind: str, db: dict, filters: dict) -> tuple:
+    return kind, db_identity(db), normalize_filters(filters)
+
+
+def ttl_for(filters: dict, now: datetime | None = None) -> int:
+    now = now or datetime.now()
+    try:
+        end = datetime.strptime(str(filters.get("end_date", "")).strip(), "%Y-%m-%d %H:%M:%S")
+    except ValueError:
+        return _settings.response_cache_ttl_live
+    if end + timedelta(seconds=_settings.response_cache_settle_seconds) < now:
+        return _settings.response_cache_ttl_past
+    return _settings.response_cache_ttl_live
+
+
+def _size_of(value) -> int:
+    # orjson si está: medir no debería costar lo que la serialización que se ahorra en la respuesta
+    try:
+        return len(dumps(value))
+    except (TypeError, ValueError):
+        return len(json.dumps(value, default=str, separators=(",", ":")))
+
+
+class _LeaderGone(Exception):
+    """El request que ejecutaba la carga se canceló: otro que esperaba la retoma."""
+
+
+_INFLIGHT: dict[tuple, asyncio.Future] = {}
+_COALESCED = 0
+
+
+async def _single_flight(key: tuple, db: dict, loader, store=None):
+    """
+    Un solo `loader()` en vuelo por clave: los requests idénticos que llegan
+    mientras corre esperan su resultado (o su excepción) en vez de repetir la
+    consulta. Sólo el que ejecuta ocupa cupo de admisión y llama a `store`.
+    """
+    global _COALESCED
+    while key in _INFLIGHT:
+        _COALESCED += 1
+        try:
+            with stage("coalesced"):
+                return await asyncio.shield(_INFLIGHT[key])
+        except _LeaderGone:
+            continue
+    fut = _INFLIGHT[key] = asyncio.get_running_loop().create_future()
+    try:
+        async with admit(db):
+            value = await loader()
+        if store is not None:
+            store(value)
+    except asyncio.CancelledError:
+        fut.set_exception(_LeaderGone())
+        raise
+    except BaseException as e:
+        fut.set_exception(e)
+        raise
+    else:
+        fut.set_result(value)
+        return value
+    finally:
+        _INFLIGHT.pop(key, None)
+        if not fut.cancelled():
+            fut.exception()  # marcada como leída aunque nadie la espere
+
+
+async def cached(kind: str, db: dict, filters: dict, loader, policy: str = USE):
+    """
+    Devuelve el valor cacheado o ejecuta `loader()` y lo guarda.
+    `refresh` ignora lo cacheado pero guarda el resultado nuevo; `bypass` no
+    lee ni escribe. Los valores cacheados se comparten: no mutarlos.
+
+    Salvo con `bypass`, la carga se comparte con los requests idénticos en
+    vuelo (misma clave que la cache); siempre pasa por la admisión de la base.
+    """
+    if policy == BYPASS:
+        async with admit(db):
+            return await loader()
+    key = cache_key(kind, db, filters)
+    use_cache = _settings.response_cache_enabled
+    if use_cache and policy == USE:
+        hit = RESPONSES.get(key)
+        if hit is not None:
+            return hit
+
+    def store(value):
+        RESPONSES.set(key, value, ttl=ttl_for(filters), size=_size_of(value))
+
+    return await _single_flight(key, db, loader, store if use_cache else None)
+
+
+def purge() -> int:
+    return RESPONSES.clear()
+
+
+def stats() -> dict:
+    return {**RESPONSES.stats(), "inflight": len(_INFLIGHT), "coalesced": _COALESCED}
@@ -0,0 +1,111 @@
+from datetime import datetime, timedelta
+
+from provisioning_api.core.cache import TTLCache
+from provisioning_api.core.config import get_settings
+from provisioning_api.db.oracle import db_identity, session_async
+from provisioning_api.db.sql.queries import OPTIONAL_FILTERS, _is_set
+from provisioning_api.repositories.stats_repository import fetch_buckets
+from provisioning_api.services.response_cache import USE, cached
+
+_FMT = "%Y-%m-%d %H:%M:%S"
+_STEPS = {"minute": timedelta(minutes=1), "hour": timedelta(hours=1), "day": timedelta(days=1)}
+# más tramos faltantes que esto se leen en un solo rango (re-leyendo buckets ya cacheados)
+_MAX_RUNS = 3
+
+_settings = get_settings()
+_BUCKETS = TTLCache(maxsize=_settings.stats_bucket_cache_size, ttl=_settings.stats_bucket_cache_ttl)
+
+async def get_stats(db: dict, filters: dict, bucket: str, dimension: str, cache: str = USE) -> dict:
+    key_filters = {**filters, "bucket": bucket, "dimension": dimension}
+    return await cached("stats", db, key_filters, lambda: _load_stats(db, filters, bucket, dimension), cache)
+
+def _truncate(d: datetime, bucket: str) -> datetime:
+    # mismo corte que TRUNC(fecha, 'MI' | 'HH24' | 'DD') en Oracle
+    if bucket == "minute":
+        return d.replace(second=0)
+    if bucket == "hour":
+        return d.replace(minute=0, second=0)
+    return d.replace(hour=0, minute=0, second=0)
+
+def _missing_runs(missing: list[int]) -> list[list[int]]:
+    runs: list[list[int]] = []
+    for i in missing:
+        if runs and i - runs[-1][-1] == 1:
+            runs[-1].append(i)
+        else:
+            runs.append([i])
+    if len(runs) > _MAX_RUNS:
+        return [missing]
+    return runs
+
+async def _load_stats(db: dict, filters: dict, bucket: str, dimension: str) -> dict:
+    """
+    Conteos por bucket de tiempo y valor de `dimension`. Los buckets completos
+    dentro de la ventana y ya asentados se cachean por (perfil, filtros,
+    dimensión, bucket): refrescar un gráfico de 30 días sólo consulta el
+    bucket en curso y, si la ventana no arranca en un corte, el primero.
+    """
+    step = _STEPS.get(bucket)
+    if step is None:
+        raise ValueError(f"Bucket desconocido: {bucket!r}")
+    try:
+        start = datetime.strptime(filters["start_date"].strip(), _FMT)
+        end = datetime.strptime(filters["end_date"].strip(), _FMT)
+    except ValueError:
+        raise ValueError("start_date y end_date deben tener formato YYYY-MM-DD HH:MM:SS")
+    if end < start:
+        raise ValueError("end_date es anterior a start_date")
+
+    first = _truncate(start, bucket)
+    n = int((_truncate(end, bucket) - first) / step) + 1
+    if n > _settings.stats_max_buckets:
+        raise ValueError(f"La ventana tiene {n} buckets de {bucket}; el máximo es {_settings.stats_max_buckets}.")
+    starts = [first + i * step for i in range(n)]
+
+    now = datetime.now()
+    settle = timedelta(seconds=_settings.response_cache_settle_seconds)
+    scope = (
+        db_identity(db), filters["pri_ne_id"],
+        tuple((k, filters[k]) for k in OPTIONAL_FILTERS if _is_set(filters.get(k))),
+        dimension, bucket,
+    )
+
+    counts: list = [None] * n
+    missing, cacheable = [], set()
+    for i, b in enumerate(starts):
+        b_end = b + step - timedelta(seconds=1)
+        if start <= b and b_end <= end and b_end + settle < now:
+            cacheable.add(i)
+            hit = _BUCKETS.get((scope, b))
+            if hit is not None:
+                counts[i] = hit
+                continue
+        missing.append(i)
+
+    if missing:
+        async with session_async(db) as session:
+            for run in _missing_runs(missing):
+                q_start = max(start, starts[run[0]])
+                q_end = min(end, starts[run[-1]] + step - timedelta(seconds=1))
+                found = await fetch_buckets(
+                    session, {**filters, "start_date": q_start.strftime(_FMT), "end_date": q_end.strftime(_FMT)},
+                    bucket, dimension,
+                )
+                for i in run:
+                    part = found.get(starts[i].strftime(_FMT), {})
+                    if i in cacheable:
+                        _BUCKETS.set((scope, starts[i]), part)
+                    counts[i] = part
+
+    values = sorted({v for part in counts for v in part}, key=lambda v: (v is None, str(v)))
+    return {
+        "bucket": bucket,
+        "dimension": dimension,
+        "values": values,
+        "buckets": [
+            {"start": b.strftime(_FMT), "total": sum(part.values()), "counts": [part.get(v, 0) for v in values]}
+            for b, part in zip(starts, counts)
+        ],
+        "total": sum(sum(part.values()) for part in counts),
+        "queried_buckets": len(missing),
+    }
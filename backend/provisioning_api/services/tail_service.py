@@ -0,0 +1,207 @@
+"""
+Live tail de /records: filas nuevas de un NE y filtros, empujadas por SSE.
+
+Hay un solo poller por (perfil de base, NE, filtros opcionales, columnas),
+compartido por todos los que miran lo mismo. Cada vuelta lee sólo lo que
+está después del watermark (pri_action_date, pri_id) con la variante keyset
+"prev" de `build_sql` (orden ascendente, sin COUNT) y codifica el evento una
+vez para todos. El intervalo arranca en `TAIL_MIN_INTERVAL` y se duplica
+mientras no aparezcan filas, hasta `TAIL_MAX_INTERVAL`. Cada vuelta ocupa un
+cupo de la admisión de la base; si la base está saturada la vuelta se saltea
+y el poller espera al menos el Retry-After.
+
+Cada suscriptor tiene una cola de `TAIL_QUEUE_SIZE` eventos; si se llena
+(cliente lento) se vacía y recibe un evento `reset` para que vuelva a pedir
+la página, así un cliente lento no frena a los demás ni acumula memoria.
+Las filas que llegan con fecha anterior al watermark no se emiten.
+"""
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime, timedelta
+
+from provisioning_api.core.config import get_settings
+from provisioning_api.core.logging import logger
+from provisioning_api.db.oracle import connect_async, db_identity, fetch_one_async, fetch_rows_async
+from provisioning_api.db.sql.queries import OPTIONAL_FILTERS, _is_set, build_sql, resolve_fields
+from provisioning_api.repositories.records_repository import _supports_offset_fetch
+from provisioning_api.services.admission import Overloaded, admit
+from provisioning_api.utils.pagination import encode_cursor
+from provisioning_api.utils.records_json import dumps, records_to_items
+
+_FMT = "%Y-%m-%d %H:%M:%S"
+_NOW_SQL = "SELECT TO_CHAR(SYSDATE,'YYYY-MM-DD HH24:MI:SS') FROM dual"
+
+_settings = get_settings()
+
+
+class TooManyPollers(RuntimeError):
+    pass
+
+
+def _event(name: str, data) -> bytes:
+    return b"event: " + name.encode() + b"\ndata: " + dumps(data) + b"\n\n"
+
+
+class Subscriber:
+    def __init__(self):
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=_settings.tail_queue_size)
+        self.dropped = 0
+
+    def push(self, frame: bytes) -> None:
+        try:
+            self.queue.put_nowait(frame)
+        except asyncio.QueueFull:
+            self.dropped += 1
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(_event("reset", {"reason": "cliente lento: se descartaron eventos"}))
+
+
+class Poller:
+    def __init__(self, key: tuple, db: dict, filters: dict):
+        self.key, self.db, self.filters = key, db, filters
+        self.subscribers: set[Subscriber] = set()
+        self.watermark: tuple[str, int] | None = None
+        self.interval = _settings.tail_min_interval
+        self.polls = self.rows = self.throttled = 0
+        self.task: asyncio.Task | None = None
+
+    async def _poll(self, con) -> int:
+        """Lee y emite lo nuevo; devuelve cuántas filas salieron."""
+        if self.watermark is None:
+            # el reloj de Oracle, no el de la app: las filas se fechan con SYSDATE
+            self.watermark = ((await fetch_one_async(con, _NOW_SQL, {}))[0], 0)
+        k_date, k_id = self.watermark
+        end = (datetime.now() + timedelta(days=1)).strftime(_FMT)
+        query = {**self.filters, "start_date": k_date, "end_date": end, "limit": _settings.tail_batch_rows}
+        sql, _, binds = build_sql(
+            query, include_pagination=True, use_legacy_pagination=not _supports_offset_fetch(con),
+            keyset={"direction": "prev", "date": k_date, "id": k_id},
+            fields=resolve_fields(self.filters.get("fields")),
+        )
+        cols, rows = await fetch_rows_async(con, sql, binds)
+        rows = rows[:_settings.tail_batch_rows]
+        self.polls += 1
+        if not rows:
+            return 0
+        i_date, i_id = cols.index("pri_action_date"), cols.index("pri_id")
+        self.watermark = (rows[-1][i_date], rows[-1][i_id])
+        self.rows += len(rows)
+        # más nuevas primero, como /records
+        frame = _event("rows", {
+            "items": records_to_items(cols, rows[::-1]),
+            "cursor": encode_cursor(self.watermark[0], self.watermark[1], "prev"),
+        })
+        for sub in list(self.subscribers):
+            sub.push(frame)
+        return len(rows)
+
+    async def run(self) -> None:
+        while self.subscribers:
+            try:
+                async with admit(self.db), connect_async(self.db) as con:
+                    n = await self._poll(con)
+                    # lote lleno: hay más esperando, se sigue sin dormir
+                    while n >= _settings.tail_batch_rows and self.subscribers:
+                        n = await self._poll(con)
+                if n:
+                    self.interval = _settings.tail_min_interval
+                else:
+                    self.interval = min(self.interval * 2, _settings.tail_max_interval)
+            except asyncio.CancelledError:
+                raise
+            except Overloaded as e:
+                # base saturada: no se consulta igual, se espera más
+                self.throttled += 1
+                self.interval = max(min(self.interval * 2, _settings.tail_max_interval), e.retry_after)
+            except Exception as e:
+                logger.warning("tail %s: %s", self.filters.get("pri_ne_id"), e)
+                frame = _event("error", {"detail": str(e)})
+                for sub in list(self.subscribers):
+                    sub.push(frame)
+                self.interval = _settings.tail_max_interval
+            await asyncio.sleep(self.interval)
+
+    def stats(self) -> dict:
+        return {
+            "pri_ne_id": self.filters.get("pri_ne_id"),
+            "filters": {k: self.filters[k] for k in OPTIONAL_FILTERS if _is_set(self.filters.get(k))},
+            "subscribers": len(self.subscribers),
+            "interval": self.interval,
+            "polls": self.polls,
+            "rows": self.rows,
+            "throttled": self.throttled,
+            "watermark": self.watermark,
+        }
+
+
+_POLLERS: dict[tuple, Poller] = {}
+
+
+def _poller_key(db: dict, filters: dict) -> tuple:
+    optional = tuple((k, str(filters[k]).strip()) for k in OPTIONAL_FILTERS if _is_set(filters.get(k)))
+    return db_identity(db), str(filters["pri_ne_id"]).strip(), optional, resolve_fields(filters.get("fields"))
+
+
+def _check_capacity(key: tuple) -> None:
+    if key not in _POLLERS and len(_POLLERS) >= _settings.tail_max_pollers:
+        raise TooManyPollers(f"Hay {len(_POLLERS)} live tails activos; el máximo es {_settings.tail_max_pollers}.")
+
+
+def _subscribe(db: dict, filters: dict) -> tuple[Poller, Subscriber]:
+    key = _poller_key(db, filters)
+    poller = _POLLERS.get(key)
+    if poller is None:
+        _check_capacity(key)
+        poller = _POLLERS[key] = Poller(key, db, filters)
+    sub = Subscriber()
+    poller.subscribers.add(sub)
+    if poller.task is None or poller.task.done():
+        poller.task = asyncio.create_task(poller.run())
+    else:
+        # alguien nuevo mirando: vuelve al intervalo corto
+        poller.interval = _settings.tail_min_interval
+    return poller, sub
+
+
+def _unsubscribe(poller: Poller, sub: Subscriber) -> None:
+    poller.subscribers.discard(sub)
+    if not poller.subscribers:
+        if poller.task is not None:
+            poller.task.cancel()
+        _POLLERS.pop(poller.key, None)
+
+
+def open_tail(db: dict, filters: dict):
+    """
+    Devuelve el generador de eventos SSE. El cupo de pollers se verifica acá,
+    así un exceso se informa antes de empezar la respuesta; la suscripción se
+    hace dentro del generador, que es el único que la puede deshacer (si la
+    respuesta nunca se itera no queda un suscriptor colgado).
+    """
+    resolve_fields(filters.get("fields"))  # ValueError antes de responder
+    _check_capacity(_poller_key(db, filters))
+
+    async def events():
+        try:
+            poller, sub = _subscribe(db, filters)
+        except TooManyPollers as e:  # se llenó entre el chequeo y la primera lectura
+            yield _event("error", {"detail": str(e)})
+            return
+        try:
+            yield _event("ready", {"pri_ne_id": poller.filters["pri_ne_id"], "subscribers": len(poller.subscribers)})
+            while True:
+                try:
+                    frame = await asyncio.wait_for(sub.queue.get(), timeout=_settings.tail_heartbeat)
+                except asyncio.TimeoutError:
+                    frame = b": ping\n\n"  # mantiene viva la conexión a través de proxies
+                yield frame
+        finally:
+            _unsubscribe(poller, sub)
+
+    return events()
+
+
+def pollers() -> list[dict]:
+    return [p.stats() for p in _POLLERS.values()]
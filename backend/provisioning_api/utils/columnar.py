@@ -0,0 +1,48 @@
+"""Salidas columnares de /records: JSON columna -> arreglo y Apache Arrow IPC."""
+from __future__ import annotations
+
+import importlib
+import io
+from functools import lru_cache
+from typing import Any
+
+ARROW_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+
+
+@lru_cache(maxsize=None)
+def load_pyarrow(submodule: str):
+    """(pyarrow, pyarrow.<submodule>) o None sin pyarrow.
+
+    pyarrow es opcional y pesado: cada submódulo (ipc, parquet) se importa con
+    el primer pedido que lo usa, acá y en utils.export_formats.
+    """
+    try:
+        return importlib.import_module("pyarrow"), importlib.import_module(f"pyarrow.{submodule}")
+    except ImportError:  # pragma: no cover - depende del entorno
+        return None
+
+
+def arrow_available() -> bool:
+    return load_pyarrow("ipc") is not None
+
+
+def to_columns(cols: list[str], rows: list) -> dict[str, list]:
+    """Transpone tuplas de filas a {columna: valores} sin armar dicts por fila."""
+    if not rows:
+        return {c: [] for c in cols}
+    return dict(zip(cols, map(list, zip(*rows))))
+
+
+def to_arrow_ipc(data: dict[str, list], metadata: dict[str, Any] | None = None) -> bytes:
+    """Serializa columnas como un stream IPC de Arrow (una sola record batch)."""
+    mods = load_pyarrow("ipc")
+    if mods is None:
+        raise RuntimeError("El formato arrow requiere pyarrow instalado en el servidor.")
+    pa, pa_ipc = mods
+    table = pa.table(data)
+    if metadata:
+        table = table.replace_schema_metadata({k: str(v) for k, v in metadata.items() if v is not None})
+    sink = io.BytesIO()
+    with pa_ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue()
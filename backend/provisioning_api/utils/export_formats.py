@@ -0,0 +1,256 @@
+"""
+Registro de formatos de exportación.
+
+Cada formato es un encoder que recibe lotes de filas (dicts) y devuelve bytes
+a medida que avanza, así la exportación se puede enviar en streaming. La
+compresión (gzip/zstd) se aplica encima, también de a chunks.
+"""
+from __future__ import annotations
+
+import csv
+import io
+import zlib
+from typing import Callable, Optional, get_args
+
+from provisioning_api.schemas.record import Record
+from provisioning_api.utils.columnar import load_pyarrow
+from provisioning_api.utils.records_json import dumps
+from provisioning_api.core.config import get_settings
+from provisioning_api.core.metrics import stage
+from provisioning_api.utils.sql_export import (
+    COLUMNS, InsertAllScript, build_formatters, iter_insert_statements,
+)
+
+try:  # opcional: zstd necesita zstandard
+    import zstandard
+except ImportError:  # pragma: no cover - depende del entorno
+    zstandard = None
+
+
+class Encoder:
+    """Convierte lotes de filas en bytes; `finish` devuelve lo que quede pendiente."""
+
+    def encode(self, rows: list[dict]) -> bytes:
+        raise NotImplementedError
+
+    def finish(self) -> bytes:
+        return b""
+
+
+class SqlInsertEncoder(Encoder):
+    def __init__(self):
+        self._formatters = build_formatters()
+
+    def encode(self, rows: list[dict]) -> bytes:
+        return "".join(iter_insert_statements(rows, self._formatters)).encode("utf-8")
+
+
+class SqlInsertAllEncoder(Encoder):
+    """INSERT ALL por bloques con id base único y COMMIT periódico."""
+
+    def __init__(self):
+        s = get_settings()
+        self._script = InsertAllScript(s.export_insert_all_rows, s.export_commit_every)
+
+    def encode(self, rows: list[dict]) -> bytes:
+        return self._script.feed(rows).encode("utf-8")
+
+    def finish(self) -> bytes:
+        return self._script.finish().encode("utf-8")
+
+
+CSV_HEADER = (",".join(COLUMNS) + "\n").encode("utf-8")
+
+
+class CsvEncoder(Encoder):
+    def __init__(self, header: bool = True):
+        # sin header: un tramo de un export por jobs (el encabezado va una sola vez al principio)
+        self._header_written = not header
+
+    def encode(self, rows: list[dict]) -> bytes:
+        buf = io.StringIO()
+        writer = csv.writer(buf, lineterminator="\n")
+        if not self._header_written:
+            writer.writerow(COLUMNS)
+            self._header_written = True
+        writer.writerows([r.get(c) for c in COLUMNS] for r in rows)
+        return buf.getvalue().encode("utf-8")
+
+    def finish(self) -> bytes:
+        # un CSV vacío igual lleva encabezado
+        return b"" if self._header_written else CSV_HEADER
+
+
+class JsonLinesEncoder(Encoder):
+    def encode(self, rows: list[dict]) -> bytes:
+        return b"".join(dumps({c: r.get(c) for c in COLUMNS}) + b"\n" for r in rows)
+
+
+def _parquet_type(pa, annotation):
+    """Tipo Arrow de un campo de Record: lo que el modelo admite, sin redondear."""
+    allowed = set(get_args(annotation) or (annotation,)) - {type(None)}
+    if str in allowed:
+        # Num (int | float | str): un valor no numérico tiene que entrar igual
+        return pa.string()
+    if float in allowed:
+        return pa.float64()
+    return pa.int64()
+
+
+def _parquet_schema():
+    pa = load_pyarrow("parquet")[0]
+    types = {name: _parquet_type(pa, field.annotation) for name, field in Record.model_fields.items()}
+    return pa.schema([(c, types[c]) for c in COLUMNS])
+
+
+# columnas de texto que igual pueden llegar como número (Num): se pasan a str al escribir
+_STRINGIFY = frozenset(
+    name for name, field in Record.model_fields.items()
+    if str in get_args(field.annotation) and set(get_args(field.annotation)) - {str, type(None)}
+)
+
+
+class ParquetEncoder(Encoder):
+    """Un row group por lote; el footer se escribe en `finish`."""
+
+    def __init__(self):
+        self._pa, pq = load_pyarrow("parquet")
+        self._sink = io.BytesIO()
+        self._schema = _parquet_schema()
+        self._writer = pq.ParquetWriter(self._sink, self._schema, compression="snappy")
+
+    def _drain(self) -> bytes:
+        data = self._sink.getvalue()
+        self._sink.seek(0)
+        self._sink.truncate()
+        return data
+
+    def encode(self, rows: list[dict]) -> bytes:
+        data = {}
+        for c in COLUMNS:
+            values = [r.get(c) for r in rows]
+            if c in _STRINGIFY:
+                values = [v if v is None or isinstance(v, str) else str(v) for v in values]
+            data[c] = values
+        self._writer.write_table(self._pa.Table.from_pydict(data, schema=self._schema))
+        return self._drain()
+
+    def finish(self) -> bytes:
+        self._writer.close()
+        return self._drain()
+
+
+class ExportFormat:
+    """
+    `sliced` es el encoder para un tramo de un export por jobs: sin prelude ni
+    cierre, así los tramos se concatenan detrás de `header`. None = el formato
+    no se puede partir (INSERT ALL numera filas, parquet tiene footer).
+    """
+
+    def __init__(self, name: str, extension: str, media_type: str, encoder: Callable[[], Encoder],
+                 available: Callable[[], bool] = lambda: True,
+                 sliced: Optional[Callable[[], Encoder]] = None, header: bytes = b""):
+        self.name = name
+        self.extension = extension
+        self.media_type = media_type
+        self.encoder = encoder
+        self.available = available
+        self.sliced = sliced
+        self.header = header
+
+
+EXPORT_FORMATS: dict[str, ExportFormat] = {}
+
+
+def register_format(fmt: ExportFormat) -> None:
+    EXPORT_FORMATS[fmt.name] = fmt
+
+
+register_format(ExportFormat("sql", "sql", "application/sql", SqlInsertEncoder, sliced=SqlInsertEncoder))
+register_format(ExportFormat("sql_batch", "sql", "application/sql", SqlInsertAllEncoder))
+register_format(ExportFormat("csv", "csv", "text/csv; charset=utf-8", CsvEncoder,
+                             sliced=lambda: CsvEncoder(header=False), header=CSV_HEADER))
+register_format(ExportFormat("jsonl", "jsonl", "application/x-ndjson", JsonLinesEncoder, sliced=JsonLinesEncoder))
+register_format(ExportFormat("parquet", "parquet", "application/vnd.apache.parquet", ParquetEncoder,
+                             available=lambda: load_pyarrow("parquet") is not None))
+
+
+# ----------------- compresión -----------------
+
+class _Identity:
+    def compress(self, data: bytes) -> bytes:
+        return data
+
+    def flush(self) -> bytes:
+        return b""
+
+
+class _Zstd:
+    def __init__(self):
+        self._obj = zstandard.ZstdCompressor(level=3).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._obj.compress(data)
+
+    def flush(self) -> bytes:
+        return self._obj.flush()
+
+
+COMPRESSIONS = {
+    # (extensión, media type, factory, disponible)
+    "gzip": ("gz", "application/gzip", lambda: zlib.compressobj(6, zlib.DEFLATED, 31), lambda: True),
+    "zstd": ("zst", "application/zstd", _Zstd, lambda: zstandard is not None),
+}
+
+
+def resolve(format_name: str, compression: Optional[str]) -> tuple[ExportFormat, Optional[str]]:
+    """Valida formato y compresión; ValueError si no existen o falta la dependencia."""
+    fmt = EXPORT_FORMATS.get(format_name)
+    if fmt is None:
+        raise ValueError(f"Formato de exportación desconocido: {format_name!r}. "
+                         f"Disponibles: {', '.join(sorted(EXPORT_FORMATS))}")
+    if not fmt.available():
+        raise ValueError(f"El formato {format_name} no está disponible en este servidor (falta pyarrow).")
+    if compression:
+        if compression not in COMPRESSIONS:
+            raise ValueError(f"Compresión desconocida: {compression!r}")
+        if not COMPRESSIONS[compression][3]():
+            raise ValueError(f"La compresión {compression} no está disponible en este servidor (falta zstandard).")
+    return fmt, compression or None
+
+
+def compress_member(data: bytes, compression: Optional[str]) -> bytes:
+    """
+    `data` como un miembro gzip / frame zstd completo: varios se concatenan en
+    un archivo válido, así un tramo de un export por jobs se puede cortar y
+    retomar en el borde de cualquier lote.
+    """
+    if not compression or not data:
+        return data
+    obj = COMPRESSIONS[compression][2]()
+    return obj.compress(data) + obj.flush()
+
+
+def filename_for(fmt: ExportFormat, compression: Optional[str]) -> str:
+    # se conserva el nombre histórico del archivo de INSERTs
+    base = "provisioning_inserts" if fmt.name == "sql" else "provisioning_export"
+    name = f"{base}.{fmt.extension}"
+    return f"{name}.{COMPRESSIONS[compression][0]}" if compression else name
+
+
+def media_type_for(fmt: ExportFormat, compression: Optional[str]) -> str:
+    return COMPRESSIONS[compression][1] if compression else fmt.media_type
+
+
+async def encode_stream(batches, fmt: ExportFormat, compression: Optional[str]):
+    """Lotes de filas (async) -> chunks de bytes ya codificados y comprimidos."""
+    encoder = fmt.encoder()
+    compressor = COMPRESSIONS[compression][2]() if compression else _Identity()
+    async for rows in batches:
+        with stage("encode"):
+            chunk = compressor.compress(encoder.encode(rows))
+        if chunk:
+            yield chunk
+    tail = compressor.compress(encoder.finish()) + compressor.flush()
+    if tail:
+        yield tail
@@ -0,0 +1,29 @@
+"""Cursores opacos para la paginación por keyset de /records."""
+from __future__ import annotations
+
+import base64
+import json
+from typing import Optional
+
+
+def encode_cursor(pri_action_date: str, pri_id: int, direction: str) -> str:
+    raw = json.dumps({"d": pri_action_date, "i": int(pri_id), "dir": direction}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str]) -> dict:
+    """
+    Devuelve el keyset {"date", "id", "direction"}; sin cursor es la primera
+    página (keyset vacío). Un cursor mal formado levanta ValueError.
+    """
+    if not cursor:
+        return {}
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        direction = data.get("dir", "next")
+        if direction not in ("next", "prev"):
+            raise ValueError(direction)
+        return {"date": str(data["d"]), "id": int(data["i"]), "direction": direction}
+    except Exception as e:
+        raise ValueError(f"Cursor de paginación inválido: {cursor!r}") from e
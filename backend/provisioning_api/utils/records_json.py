@@ -0,0 +1,53 @@
+"""
+Serialización directa de páginas de /records a JSON.
+
+Las filas vienen de la proyección fija de `build_sql`, así que no se vuelven a
+validar con `Record`: se arman los objetos en el orden de campos del modelo
+(el mismo wire format que producía `response_model=RecordsResponse`) y se
+codifican de una vez.
+"""
+from __future__ import annotations
+
+import json
+from functools import lru_cache
+
+from provisioning_api.core.metrics import stage
+from provisioning_api.schemas.record import Record, RecordsResponse
+
+try:  # orjson es opcional; sin él se usa json de la stdlib con el mismo formato
+    import orjson
+except ImportError:  # pragma: no cover - depende del entorno
+    orjson = None
+
+RECORD_FIELDS = tuple(Record.model_fields)
+PAGE_FIELDS = tuple(f for f in RecordsResponse.model_fields if f != "items")
+
+
+def dumps(value) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+@lru_cache(maxsize=64)
+def _field_indexes(columns: tuple) -> tuple:
+    """(campos, posiciones) de Record presentes en las columnas del cursor, en orden del modelo."""
+    pos = {c: i for i, c in enumerate(columns)}
+    present = [f for f in RECORD_FIELDS if f in pos]
+    return tuple(present), tuple(pos[f] for f in present)
+
+
+def records_to_items(columns, rows) -> list[dict]:
+    # los campos que no se proyectaron (ver Filters.fields) no se emiten
+    fields, idx = _field_indexes(tuple(columns))
+    return [dict(zip(fields, [r[i] for i in idx])) for r in rows]
+
+
+def render_records_json(page: dict) -> bytes:
+    """Página con `columns` + filas crudas (`items`) -> bytes JSON de RecordsResponse."""
+    with stage("convert"):
+        body = {"items": records_to_items(page["columns"], page["items"])}
+    for f in PAGE_FIELDS:
+        body[f] = page.get(f, RecordsResponse.model_fields[f].default)
+    with stage("encode"):
+        return dumps(body)
@@ -1,6 +1,7 @@
-from typing import Any, Dict, Iterable, List
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
 import datetime as dt
-import re
+
+from provisioning_api.db.sql.queries import DATE_COLUMNS, NUMBER_COLUMNS
 
 COLUMNS = [
   "pri_id","pri_cellular_number","pri_sim_msisdn","pri_sim_imsi","pri_action",
@@ -17,41 +18,170 @@ RAW_OVERRIDES = {
   "pri_id": "(SELECT NVL(MAX(pri_id), 0) + 1 FROM swp_provisioning_interfaces)",
   "pri_action_date": "TO_DATE('30-04-2025 00:00:01', 'DD-MM-YYYY HH24:MI:SS')",
   "pri_system_date": "TO_DATE('30-04-2025 00:00:01', 'DD-MM-YYYY HH24:MI:SS')",
-  "pri_status": "PENDING"
+  # literal de texto: sin comillas Oracle lo toma como una columna y el INSERT
+  # falla con ORA-00984
+  "pri_status": "'PENDING'"
 }
 
-DATE_RE = re.compile(r"^\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}$")
-NUM_RE  = re.compile(r"^-?\d+(?:\.\d+)?$")
+# ----------------- formateadores por columna -----------------
+# El tipo de cada columna sale de la proyección de build_sql: las DATE llegan
+# como texto 'YYYY-MM-DD HH24:MI:SS', las NUMBER como int/float y el resto es
+# VARCHAR, que siempre va entre comillas (un MSISDN numérico sigue siendo texto).
+
+Formatter = Callable[[Any], str]
+
+
+def _quote(v: Any) -> str:
+    return "'" + str(v).strip().replace("'", "''") + "'"
+
 
+def fmt_string(v: Any) -> str:
+    return "NULL" if v is None else _quote(v)
 
-def esc(v: Any) -> str:
-    if v is None: return "NULL"
-    if isinstance(v, (int, float)): return str(v)
+
+def fmt_number(v: Any) -> str:
+    if v is None:
+        return "NULL"
+    if isinstance(v, str):
+        return _quote(v)
+    return str(v)
+
+
+def fmt_date(v: Any) -> str:
+    if v is None:
+        return "NULL"
     if isinstance(v, dt.datetime):
-        s = v.strftime("%Y-%m-%d %H:%M:%S"); return f"TO_DATE('{s}','YYYY-MM-DD HH24:MI:SS')"
-    if isinstance(v, dt.date):
-        s = v.strftime("%Y-%m-%d 00:00:00"); return f"TO_DATE('{s}','YYYY-MM-DD HH24:MI:SS')"
-    s = str(v).strip()
-    if DATE_RE.match(s): return f"TO_DATE('{s}','YYYY-MM-DD HH24:MI:SS')"
-    if NUM_RE.match(s):  return s
-    s_esc = s.replace("'", "''")
-    return f"'{s_esc}'"
-
-
-def _format_row(row: Dict[str, Any]) -> List[str]:
-    out: List[str] = []
+        v = v.strftime("%Y-%m-%d %H:%M:%S")
+    elif isinstance(v, dt.date):
+        v = v.strftime("%Y-%m-%d 00:00:00")
+    return f"TO_DATE('{v}','YYYY-MM-DD HH24:MI:SS')"
+
+
+def build_formatters(date_columns: Iterable[str] = DATE_COLUMNS,
+                     number_columns: Iterable[str] = NUMBER_COLUMNS) -> List[Tuple[str, Optional[Formatter]]]:
+    """
+    Tabla (columna, formateador) en el orden de COLUMNS; las columnas de
+    RAW_OVERRIDES llevan None y se emiten tal cual.
+    """
+    date_columns, number_columns = set(date_columns), set(number_columns)
+    table: List[Tuple[str, Optional[Formatter]]] = []
     for col in COLUMNS:
         if col in RAW_OVERRIDES:
-            out.append(RAW_OVERRIDES[col])
+            table.append((col, None))
+        elif col in date_columns:
+            table.append((col, fmt_date))
+        elif col in number_columns:
+            table.append((col, fmt_number))
         else:
-            out.append(esc(row.get(col)))
-    return out
+            table.append((col, fmt_string))
+    return table
 
 
-def generate_insert_statements(rows: Iterable[Dict[str, Any]]) -> str:
-    lines: List[str] = []
-    cols = ", ".join(COLUMNS)
+def format_row(row: Dict[str, Any], formatters: List[Tuple[str, Optional[Formatter]]]) -> List[str]:
+    get = row.get
+    return [RAW_OVERRIDES[col] if fmt is None else fmt(get(col)) for col, fmt in formatters]
+
+
+def iter_insert_statements(rows: Iterable[Dict[str, Any]], formatters=None) -> Iterator[str]:
+    """Una línea `INSERT ...;\n` por fila, a medida que se consumen las filas."""
+    formatters = formatters or build_formatters()
+    prefix = f"INSERT INTO swp_provisioning_interfaces ({', '.join(COLUMNS)}) VALUES ("
     for r in rows:
-        values = ", ".join(_format_row(r))
-        lines.append(f"INSERT INTO swp_provisioning_interfaces ({cols}) VALUES ({values});")
+        yield prefix + ", ".join(format_row(r, formatters)) + ");\n"
+
+
+# ----------------- modo por lotes -----------------
+# En lugar de un MAX(pri_id) por fila, el script toma el id base una vez en
+# una variable de SQL*Plus y cada fila usa :base_id + n; las filas se agrupan
+# en bloques INSERT ALL y se confirma cada `commit_every` filas.
+
+BATCH_PRELUDE = (
+    "SET DEFINE OFF\n"
+    "VARIABLE base_id NUMBER\n"
+    "BEGIN SELECT NVL(MAX(pri_id), 0) INTO :base_id FROM swp_provisioning_interfaces; END;\n"
+    "/\n"
+)
+
+
+_PRI_ID_POS = COLUMNS.index("pri_id")
+
+
+def insert_all_block(rows: List[Dict[str, Any]], first_offset: int, formatters=None) -> str:
+    """Un INSERT ALL con `rows`; la fila i recibe pri_id = :base_id + first_offset + i."""
+    formatters = formatters or build_formatters()
+    cols = ", ".join(COLUMNS)
+    lines = ["INSERT ALL"]
+    for i, r in enumerate(rows):
+        values = format_row(r, formatters)
+        values[_PRI_ID_POS] = f":base_id + {first_offset + i}"
+        lines.append(f"  INTO swp_provisioning_interfaces ({cols}) VALUES ({', '.join(values)})")
+    lines.append("SELECT 1 FROM dual;")
     return "\n".join(lines) + "\n"
+
+
+class InsertAllScript:
+    """
+    Generador incremental del script por lotes: `feed` recibe filas y devuelve
+    el texto listo; `finish` cierra el último bloque y el COMMIT final.
+    """
+
+    def __init__(self, block_rows: int = 500, commit_every: int = 5000):
+        self.block_rows = max(1, block_rows)
+        self.commit_every = max(self.block_rows, commit_every)
+        self._pending: List[Dict[str, Any]] = []
+        self._written = 0
+        self._since_commit = 0
+        self._started = False
+        self._formatters = build_formatters()
+
+    def _flush_block(self, rows: List[Dict[str, Any]]) -> str:
+        out = insert_all_block(rows, self._written + 1, self._formatters)
+        self._written += len(rows)
+        self._since_commit += len(rows)
+        if self._since_commit >= self.commit_every:
+            out += "COMMIT;\n"
+            self._since_commit = 0
+        return out
+
+    def feed(self, rows: Iterable[Dict[str, Any]]) -> str:
+        parts: List[str] = []
+        if not self._started:
+            parts.append(BATCH_PRELUDE)
+            self._started = True
+        self._pending.extend(rows)
+        while len(self._pending) >= self.block_rows:
+            block, self._pending = self._pending[:self.block_rows], self._pending[self.block_rows:]
+            parts.append(self._flush_block(block))
+        return "".join(parts)
+
+    def finish(self) -> str:
+        out = "" if self._started else BATCH_PRELUDE
+        if self._pending:
+            out += self._flush_block(self._pending)
+            self._pending = []
+        if self._since_commit:
+            out += "COMMIT;\n"
+        return out
+
+
+def replay_insert_sql(date_columns: Iterable[str]) -> str:
+    """
+    INSERT con binds para `executemany` al replicar filas en otra base: mismas
+    reglas que el script (RAW_OVERRIDES), salvo pri_id, que llega calculado.
+    """
+    date_columns = set(date_columns)
+    values = []
+    for col in COLUMNS:
+        if col == "pri_id":
+            values.append(":pri_id")
+        elif col in RAW_OVERRIDES:
+            values.append(RAW_OVERRIDES[col])
+        elif col in date_columns:
+            values.append(f"TO_DATE(:{col},'YYYY-MM-DD HH24:MI:SS')")
+        else:
+            values.append(f":{col}")
+    return f"INSERT INTO swp_provisioning_interfaces ({', '.join(COLUMNS)}) VALUES ({', '.join(values)})"
+
+
+def replay_bind_columns() -> List[str]:
+    return [c for c in COLUMNS if c == "pri_id" or c not in RAW_OVERRIDES]
@@ -0,0 +1,9 @@
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+# core.config lee ".env" del directorio actual: las pruebas corren sin el .env
+# local (credenciales, Instant Client) para no depender de la máquina
+os.chdir(Path(__file__).resolve().parent)
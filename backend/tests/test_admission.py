@@ -0,0 +1,92 @@
+import asyncio
+
+import pytest
+
+from provisioning_api.services import admission
+from provisioning_api.services.admission import Gate, Overloaded
+
+
+@pytest.fixture
+def queue(monkeypatch):
+    def configure(max_queue: int, timeout: float = 5.0):
+        monkeypatch.setattr(admission._settings, "admission_max_queue", max_queue)
+        monkeypatch.setattr(admission._settings, "admission_queue_timeout", timeout)
+    return configure
+
+
+def test_rejects_when_queue_is_full(queue):
+    queue(max_queue=1)
+
+    async def scenario():
+        gate = Gate(1)
+        await gate.acquire()
+        waiter = asyncio.create_task(gate.acquire())
+        await asyncio.sleep(0)
+        assert len(gate.waiters) == 1
+
+        with pytest.raises(Overloaded) as exc:
+            await gate.acquire()
+        assert exc.value.retry_after >= 1
+        assert gate.rejected == 1
+
+        # el cupo pasa al que esperaba, sin liberarse en el medio
+        gate.release(0.5)
+        await waiter
+        assert gate.stats()["active"] == 1 and gate.admitted == 2
+        gate.release(0.5)
+        assert gate.active == 0
+
+    asyncio.run(scenario())
+
+
+def test_rejects_after_queue_timeout(queue):
+    queue(max_queue=4, timeout=0.01)
+
+    async def scenario():
+        gate = Gate(1)
+        await gate.acquire()
+        with pytest.raises(Overloaded, match="se agotó la espera"):
+            await gate.acquire()
+        assert not gate.waiters and gate.rejected == 1
+        gate.release(None)
+        assert gate.active == 0
+
+    asyncio.run(scenario())
+
+
+def test_retry_after_scales_with_queue():
+    gate = Gate(2)
+    gate.hold_ewma = 4.0
+    assert gate.retry_after() == 2
+    gate.waiters.extend([None] * 3)
+    assert gate.retry_after() == 8
+
+
+def test_admit_maps_db_to_gate(queue, monkeypatch):
+    queue(max_queue=0)
+    monkeypatch.setattr(admission._settings, "admission_enabled", True)
+    monkeypatch.setattr(admission._settings, "admission_max_concurrent", 1)
+    monkeypatch.setattr(admission, "_GATES", {})
+    db = {"host": "h", "port": 1521, "service": "s", "user": "u", "password": "p"}
+
+    async def scenario():
+        entered, leave = asyncio.Event(), asyncio.Event()
+
+        async def holder():
+            async with admission.admit(db):
+                # anidado para la misma base: no pide otro cupo
+                async with admission.admit(db):
+                    pass
+                entered.set()
+                await leave.wait()
+
+        task = asyncio.create_task(holder())
+        await entered.wait()
+        with pytest.raises(Overloaded):
+            async with admission.admit(db):
+                pass
+        leave.set()
+        await task
+        assert admission.stats()[0]["active"] == 0
+
+    asyncio.run(scenario())
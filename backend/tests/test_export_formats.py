@@ -0,0 +1,25 @@
+import io
+
+import pytest
+
+from provisioning_api.utils.export_formats import resolve
+
+pq = pytest.importorskip("pyarrow.parquet")
+
+
+def _parquet(rows: list[dict]) -> list[dict]:
+    encoder = resolve("parquet", None)[0].encoder()
+    data = encoder.encode(rows) + encoder.finish()
+    return pq.read_table(io.BytesIO(data)).to_pylist()
+
+
+def test_parquet_keeps_non_integer_numbers():
+    rows = [
+        {"pri_id": 1, "pri_correlation_id": 12.5, "pri_sis_id": "ABC", "pri_status": "OK"},
+        {"pri_id": 2, "pri_correlation_id": 7, "pri_sis_id": None},
+    ]
+    out = _parquet(rows)
+    assert [r["pri_id"] for r in out] == [1, 2]
+    assert [r["pri_correlation_id"] for r in out] == ["12.5", "7"]
+    assert [r["pri_sis_id"] for r in out] == ["ABC", None]
+    assert [r["pri_status"] for r in out] == ["OK", None]
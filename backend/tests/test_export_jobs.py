@@ -0,0 +1,42 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from provisioning_api.services.export_jobs import _slices
+
+_FMT = "%Y-%m-%d %H:%M:%S"
+
+
+def _bounds(slices: list[dict]) -> list[tuple[datetime, datetime]]:
+    return [(datetime.strptime(s["start"], _FMT), datetime.strptime(s["end"], _FMT)) for s in slices]
+
+
+@pytest.mark.parametrize("start, end, n", [
+    ("2025-04-01 00:00:00", "2025-04-30 23:59:59", 8),
+    ("2025-04-01 00:00:00", "2025-04-01 00:00:10", 3),
+    ("2025-04-01 10:00:00", "2025-04-01 10:00:00", 4),
+])
+def test_slices_cover_window_without_gaps(start, end, n):
+    slices = _slices(start, end, n)
+    bounds = _bounds(slices)[::-1]   # vienen del más nuevo al más viejo
+    assert bounds[0][0] == datetime.strptime(start, _FMT)
+    assert bounds[-1][1] == datetime.strptime(end, _FMT)
+    for (_, prev_end), (next_start, _) in zip(bounds, bounds[1:]):
+        assert next_start - prev_end == timedelta(seconds=1)
+    lengths = {(b - a).total_seconds() for a, b in bounds}
+    assert max(lengths) - min(lengths) <= 1
+    assert all(s["rows"] == 0 and s["checkpoint"] is None and not s["done"] for s in slices)
+
+
+def test_slices_newest_first_and_capped():
+    slices = _slices("2025-04-01 00:00:00", "2025-04-01 00:00:02", 10)
+    # no hay más tramos que segundos en la ventana
+    assert [s["start"] for s in slices] == [
+        "2025-04-01 00:00:02", "2025-04-01 00:00:01", "2025-04-01 00:00:00",
+    ]
+    assert len(_slices("2025-04-01 00:00:00", "2025-04-02 00:00:00", 0)) == 1
+
+
+def test_slices_reject_reversed_window():
+    with pytest.raises(ValueError, match="anterior"):
+        _slices("2025-04-02 00:00:00", "2025-04-01 00:00:00", 4)
@@ -0,0 +1,44 @@
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from provisioning_api.api.routes import export
+from provisioning_api.services import records_service
+
+BODY = {
+    "db": {"host": "h", "port": 1521, "service": "s", "user": "u", "password": "p"},
+    "filters": {"start_date": "2025-04-30 00:00:00", "end_date": "2025-04-30 23:59:59", "pri_ne_id": "NE1"},
+}
+
+
+def _client(monkeypatch) -> TestClient:
+    @asynccontextmanager
+    async def connect_async(db):
+        yield None
+
+    async def iter_record_batches(con, filters, arraysize=None):
+        yield [{"pri_id": 7, "pri_cellular_number": "5491100000000", "pri_status": "OK"}]
+
+    monkeypatch.setattr(records_service, "connect_async", connect_async)
+    monkeypatch.setattr(records_service, "iter_record_batches", iter_record_batches)
+    app = FastAPI()
+    app.include_router(export.router, prefix="/api")
+    return TestClient(app)
+
+
+def test_generate_inserts_quotes_status(monkeypatch):
+    res = _client(monkeypatch).post("/api/generate-inserts", json=BODY)
+    assert res.status_code == 200
+    lines = res.text.splitlines()
+    assert len(lines) == 1 and lines[0].startswith("INSERT INTO swp_provisioning_interfaces (")
+    # el estado de la fila original no se copia: va el literal entre comillas
+    assert ", 'PENDING', " in lines[0]
+    assert ", PENDING, " not in lines[0] and "'OK'" not in lines[0]
+    assert "'5491100000000'" in lines[0]
+
+
+def test_sql_batch_quotes_status(monkeypatch):
+    res = _client(monkeypatch).post("/api/generate-inserts", json={**BODY, "format": "sql_batch"})
+    assert res.status_code == 200
+    assert ", 'PENDING', " in res.text and ", PENDING, " not in res.text
@@ -0,0 +1,87 @@
+"""
+`_keyset_predicate` evaluado en SQLite (TO_DATE como identidad sobre texto
+'YYYY-MM-DD HH:MM:SS', que ordena igual que la fecha) junto con `_keyset_page`:
+recorrer todas las páginas hacia adelante y hacia atrás no pierde ni repite filas
+aunque muchas compartan pri_action_date.
+"""
+import sqlite3
+
+import pytest
+
+from provisioning_api.db.sql.queries import _keyset_predicate, build_sql
+from provisioning_api.repositories.records_repository import _keyset_page
+from provisioning_api.utils.pagination import decode_cursor
+
+COLS = ["pri_id", "pri_action_date"]
+LIMIT = 3
+
+
+@pytest.fixture
+def con():
+    con = sqlite3.connect(":memory:")
+    con.create_function("TO_DATE", 2, lambda value, fmt: value)
+    con.execute("CREATE TABLE swp_provisioning_interfaces (pri_id INTEGER, pri_action_date TEXT)")
+    # bloques de fechas repetidas con pri_id intercalados entre bloques
+    rows = [(i, f"2025-04-30 10:0{i % 3}:00") for i in range(1, 15)]
+    con.executemany("INSERT INTO swp_provisioning_interfaces VALUES (?, ?)", rows)
+    yield con
+    con.close()
+
+
+def _fetch(con, keyset: dict) -> list[tuple]:
+    seek = keyset.get("direction")
+    order = "ASC" if seek == "prev" else "DESC"
+    where = f"WHERE {_keyset_predicate(seek)}" if seek else ""
+    sql = (f"SELECT pri_id, pri_action_date FROM swp_provisioning_interfaces a {where} "
+           f"ORDER BY a.pri_action_date {order}, a.pri_id {order} LIMIT :limit")
+    binds = {"limit": LIMIT + 1}
+    if seek:
+        binds.update(k_date=keyset["date"], k_id=keyset["id"])
+    return con.execute(sql, binds).fetchall()
+
+
+def _all_desc(con) -> list[int]:
+    return [r[0] for r in con.execute(
+        "SELECT pri_id FROM swp_provisioning_interfaces ORDER BY pri_action_date DESC, pri_id DESC")]
+
+
+def test_predicate_breaks_ties_on_pri_id():
+    where = _keyset_predicate("next")
+    assert "a.pri_action_date <= TO_DATE(:k_date" in where
+    assert "a.pri_id < :k_id" in where
+    assert "a.pri_id > :k_id" in _keyset_predicate("prev")
+
+
+def test_walk_forward_and_back(con):
+    pages, keyset = [], {}
+    while True:
+        rows, cursors = _keyset_page(_fetch(con, keyset), COLS, keyset, LIMIT)
+        pages.append([r[0] for r in rows])
+        if not cursors["next_cursor"]:
+            break
+        keyset = decode_cursor(cursors["next_cursor"])
+
+    assert [i for page in pages for i in page] == _all_desc(con)
+    assert all(len(page) == LIMIT for page in pages[:-1])
+
+    # desde la última página, "prev" devuelve las mismas páginas en orden inverso
+    back = [pages[-1]]
+    while cursors["prev_cursor"]:
+        keyset = decode_cursor(cursors["prev_cursor"])
+        rows, cursors = _keyset_page(_fetch(con, keyset), COLS, keyset, LIMIT)
+        back.append([r[0] for r in rows])
+    assert back[::-1] == pages
+
+
+def test_build_sql_keyset_binds():
+    filters = {"start_date": "2025-04-30 00:00:00", "end_date": "2025-04-30 23:59:59",
+               "pri_ne_id": "NE1", "limit": LIMIT}
+    keyset = {"date": "2025-04-30 10:00:00", "id": 7, "direction": "next"}
+    select_sql, _, binds = build_sql(filters, include_pagination=True, keyset=keyset)
+    assert _keyset_predicate("next") in select_sql
+    assert "ORDER BY a.pri_action_date DESC, a.pri_id DESC" in select_sql
+    assert binds["limit"] == LIMIT + 1
+    assert (binds["k_date"], binds["k_id"]) == ("2025-04-30 10:00:00", 7)
+
+    first_sql, _, first_binds = build_sql(filters, include_pagination=True, keyset={})
+    assert ":k_id" not in first_sql and "k_id" not in first_binds
@@ -0,0 +1,72 @@
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import date
+
+import pytest
+
+from provisioning_api.repositories.options_repository import OPTION_COLUMNS, empty_options, merge_options
+from provisioning_api.services import options_service
+from provisioning_api.services.options_service import _load_options, _missing_runs
+
+DB = {"host": "h", "port": 1521, "service": "s", "user": "u", "password": "p"}
+
+
+def _part(**values) -> dict:
+    part = empty_options()
+    for col, vals in values.items():
+        part[col] |= set(vals)
+    return part
+
+
+def test_merge_options_unions_and_sorts():
+    merged = merge_options([
+        _part(pri_action=["BA"], pri_status=["OK", "ERROR"]),
+        _part(pri_action=["AL", "BA"], pri_ne_group=["G1"]),
+        {col: frozenset() for col in OPTION_COLUMNS},   # día cacheado sin filas
+    ])
+    assert merged == {"pri_action": ["AL", "BA"], "pri_ne_group": ["G1"], "pri_status": ["ERROR", "OK"]}
+
+
+def test_merge_options_empty():
+    assert merge_options([]) == {col: [] for col in OPTION_COLUMNS}
+
+
+def test_missing_runs():
+    d = [date(2025, 4, i) for i in range(1, 31)]
+    assert _missing_runs([d[0], d[1], d[4], d[5], d[9]]) == [[d[0], d[1]], [d[4], d[5]], [d[9]]]
+    # más de _MAX_RUNS tramos: un solo rango
+    assert _missing_runs([d[0], d[2], d[4], d[6]]) == [[d[0], d[2], d[4], d[6]]]
+
+
+@pytest.fixture
+def fake_oracle(monkeypatch):
+    calls = []
+
+    @asynccontextmanager
+    async def session_async(db, con=None):
+        yield None
+
+    async def fetch_options_by_day(con, ne, start_date, end_date):
+        calls.append((start_date, end_date))
+        return {
+            "2025-04-01": _part(pri_action=["AL"], pri_status=["OK"]),
+            "2025-04-02": _part(pri_action=["BA"]),
+            "2025-04-03": _part(pri_status=["ERROR"]),
+        }
+
+    monkeypatch.setattr(options_service, "session_async", session_async)
+    monkeypatch.setattr(options_service, "fetch_options_by_day", fetch_options_by_day)
+    return calls
+
+
+def test_load_options_caches_whole_days(fake_oracle):
+    filters = {"start_date": "2025-04-01 12:00:00", "end_date": "2025-04-03 08:00:00", "pri_ne_id": "NE-options-1"}
+    out = asyncio.run(_load_options(DB, filters))
+    assert out == {"pri_action": ["AL", "BA"], "pri_ne_group": [], "pri_status": ["ERROR", "OK"]}
+    assert fake_oracle == [("2025-04-01 12:00:00", "2025-04-03 08:00:00")]
+
+    # el 2 de abril es un día completo y asentado: la segunda vez sólo se leen los bordes
+    fake_oracle.clear()
+    assert asyncio.run(_load_options(DB, filters)) == out
+    assert fake_oracle == [("2025-04-01 12:00:00", "2025-04-01 23:59:59"),
+                           ("2025-04-03 00:00:00", "2025-04-03 08:00:00")]
@@ -0,0 +1,90 @@
+import base64
+import json
+
+import pytest
+
+from provisioning_api.repositories.records_repository import _keyset_page
+from provisioning_api.utils.pagination import decode_cursor, encode_cursor
+
+COLS = ["pri_id", "pri_action_date", "pri_status"]
+
+
+def _raw(payload: dict) -> str:
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip("=")
+
+
+@pytest.mark.parametrize("direction", ["next", "prev"])
+def test_cursor_round_trip(direction):
+    cursor = encode_cursor("2025-04-30 10:15:00", 12345, direction)
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == {"date": "2025-04-30 10:15:00", "id": 12345, "direction": direction}
+
+
+def test_cursor_empty_is_first_page():
+    assert decode_cursor(None) == {}
+    assert decode_cursor("") == {}
+
+
+@pytest.mark.parametrize("cursor", [
+    "no-es-base64!",
+    _raw({"d": "2025-04-30 10:15:00", "i": "abc", "dir": "next"}),
+    _raw({"d": "2025-04-30 10:15:00", "i": 1, "dir": "sideways"}),
+    _raw({"d": "2025-04-30 10:15:00"}),
+    _raw(["2025-04-30 10:15:00", 1]),
+    encode_cursor("2025-04-30 10:15:00", 1, "next")[:-3],
+])
+def test_cursor_tampered(cursor):
+    with pytest.raises(ValueError, match="Cursor de paginación inválido"):
+        decode_cursor(cursor)
+
+
+def _rows(n: int) -> list[tuple]:
+    # orden DESC de la consulta: misma fecha, pri_id decreciente
+    return [(100 - i, "2025-04-30 10:00:00", "OK") for i in range(n)]
+
+
+def test_keyset_page_first_page_with_more():
+    rows, cursors = _keyset_page(_rows(4), COLS, {}, limit=3)
+    assert [r[0] for r in rows] == [100, 99, 98]
+    assert cursors["has_more"] is True
+    assert cursors["prev_cursor"] is None
+    assert decode_cursor(cursors["next_cursor"]) == {"date": "2025-04-30 10:00:00", "id": 98, "direction": "next"}
+
+
+def test_keyset_page_exact_limit_is_last_page():
+    rows, cursors = _keyset_page(_rows(3), COLS, {}, limit=3)
+    assert len(rows) == 3
+    assert cursors == {"next_cursor": None, "prev_cursor": None, "has_more": False}
+
+
+def test_keyset_page_empty():
+    rows, cursors = _keyset_page([], COLS, {"date": "2025-04-30 10:00:00", "id": 5, "direction": "next"}, limit=3)
+    assert rows == []
+    assert cursors == {"next_cursor": None, "prev_cursor": None, "has_more": False}
+
+
+def test_keyset_page_next_has_prev_cursor():
+    keyset = {"date": "2025-04-30 10:00:00", "id": 101, "direction": "next"}
+    rows, cursors = _keyset_page(_rows(2), COLS, keyset, limit=3)
+    assert cursors["has_more"] is False and cursors["next_cursor"] is None
+    assert decode_cursor(cursors["prev_cursor"])["id"] == 100
+
+
+def test_keyset_page_prev_reverses_rows():
+    # una página "prev" llega en orden ASC con una fila de más
+    asc = [(i, "2025-04-30 10:00:00", "OK") for i in (5, 6, 7, 8)]
+    keyset = {"date": "2025-04-30 10:00:00", "id": 4, "direction": "prev"}
+    rows, cursors = _keyset_page(asc, COLS, keyset, limit=3)
+    assert [r[0] for r in rows] == [7, 6, 5]
+    assert cursors["has_more"] is True
+    assert decode_cursor(cursors["next_cursor"])["id"] == 5
+    assert decode_cursor(cursors["prev_cursor"]) == {"date": "2025-04-30 10:00:00", "id": 7, "direction": "prev"}
+
+
+def test_keyset_page_prev_reaching_start():
+    asc = [(i, "2025-04-30 10:00:00", "OK") for i in (5, 6)]
+    keyset = {"date": "2025-04-30 10:00:00", "id": 4, "direction": "prev"}
+    rows, cursors = _keyset_page(asc, COLS, keyset, limit=3)
+    assert [r[0] for r in rows] == [6, 5]
+    assert cursors["prev_cursor"] is None
+    assert cursors["next_cursor"] is not None
@@ -0,0 +1,91 @@
+"""
+Merge por heap de /records con varios NE: cada NE entrega sus filas ya en
+orden de keyset y la página combinada tiene que coincidir con la de una sola
+consulta sobre todas las filas, también con fechas repetidas entre NE.
+"""
+import asyncio
+from contextlib import asynccontextmanager
+
+import pytest
+
+from provisioning_api.services import records_service
+from provisioning_api.services.records_service import _load_fanout
+from provisioning_api.utils.pagination import decode_cursor
+
+DB = {"host": "h", "port": 1521, "service": "s", "user": "u", "password": "p"}
+COLS = ["pri_id", "pri_action_date", "pri_ne_id"]
+# ids intercalados entre NE y varias filas con la misma fecha
+ROWS = [(i, f"2025-04-30 10:0{i % 4}:00", f"NE{i % 3}") for i in range(1, 25)]
+NE_IDS = ["NE0", "NE1", "NE2"]
+
+
+def _key(r):
+    return r[1], r[0]
+
+
+EXPECTED = [r[0] for r in sorted(ROWS, key=_key, reverse=True)]
+
+
+@pytest.fixture
+def fake_oracle(monkeypatch):
+    @asynccontextmanager
+    async def connect_async(db):
+        yield None
+
+    async def fetch_keyset_rows(con, filters, keyset, n):
+        rows = [r for r in ROWS if r[2] == filters["pri_ne_id"]]
+        if keyset.get("direction") == "prev":
+            rows = sorted((r for r in rows if _key(r) > (keyset["date"], keyset["id"])), key=_key)
+        else:
+            rows = sorted(rows, key=_key, reverse=True)
+            if keyset:
+                rows = [r for r in rows if _key(r) < (keyset["date"], keyset["id"])]
+        return COLS, rows[:n + 1]
+
+    async def count_records(con, filters):
+        return sum(r[2] == filters["pri_ne_id"] for r in ROWS)
+
+    monkeypatch.setattr(records_service, "connect_async", connect_async)
+    monkeypatch.setattr(records_service, "fetch_keyset_rows", fetch_keyset_rows)
+    monkeypatch.setattr(records_service, "count_records", count_records)
+
+
+def _filters(**extra) -> dict:
+    return {"start_date": "2025-04-30 00:00:00", "end_date": "2025-04-30 23:59:59",
+            "pri_ne_ids": NE_IDS, "limit": 5, **extra}
+
+
+def test_offset_pages(fake_oracle):
+    ids = []
+    for offset in range(0, len(ROWS), 5):
+        page = asyncio.run(_load_fanout(DB, _filters(offset=offset), NE_IDS, raw=True))
+        ids += [r[0] for r in page["items"]]
+        assert page["has_more"] == (offset + 5 < len(ROWS))
+    assert ids == EXPECTED
+    assert page["total"] == len(ROWS)
+    assert page["ne_totals"] == {"NE0": 8, "NE1": 8, "NE2": 8}
+
+
+def test_keyset_walk_forward_and_back(fake_oracle):
+    pages, cursor = [], None
+    while True:
+        page = asyncio.run(_load_fanout(DB, _filters(pagination="keyset", cursor=cursor), NE_IDS, raw=False))
+        pages.append([r["pri_id"] for r in page["items"]])
+        if not page["next_cursor"]:
+            break
+        cursor = page["next_cursor"]
+    assert [i for p in pages for i in p] == EXPECTED
+
+    back = [pages[-1]]
+    while page["prev_cursor"]:
+        assert decode_cursor(page["prev_cursor"])["direction"] == "prev"
+        page = asyncio.run(_load_fanout(DB, _filters(pagination="keyset", cursor=page["prev_cursor"]),
+                                        NE_IDS, raw=False))
+        back.append([r["pri_id"] for r in page["items"]])
+    assert back[::-1] == pages
+
+
+def test_count_none_skips_totals(fake_oracle):
+    page = asyncio.run(_load_fanout(DB, _filters(count="none"), NE_IDS, raw=True))
+    assert page["total"] is None and page["count_strategy"] == "none"
+    assert [r[0] for r in page["items"]] == EXPECTED[:5]
@@ -0,0 +1,23 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from provisioning_api.api.routes import records
+from provisioning_api.db.oracle import ResultTooLarge
+
+BODY = {
+    "db": {"host": "h", "port": 1521, "service": "s", "user": "u", "password": "p"},
+    "filters": {"start_date": "2025-04-30 00:00:00", "end_date": "2025-04-30 23:59:59", "pri_ne_id": "NE1",
+                "offset": 100_000},
+}
+
+
+def test_post_records_result_too_large_is_413(monkeypatch):
+    async def get_records(*args, **kwargs):
+        raise ResultTooLarge("La consulta supera 100000 filas")
+
+    monkeypatch.setattr(records, "get_records", get_records)
+    app = FastAPI()
+    app.include_router(records.router, prefix="/api")
+    res = TestClient(app).post("/api/records", json=BODY)
+    assert res.status_code == 413
+    assert "100000 filas" in res.json()["detail"]
@@ -0,0 +1,38 @@
+from datetime import datetime
+
+from provisioning_api.services import response_cache
+from provisioning_api.services.response_cache import cache_key, normalize_filters, ttl_for
+
+DB = {"host": "h", "port": 1521, "service": "s", "user": "u", "password": "p"}
+
+
+def test_normalize_filters_drops_unset_and_sorts():
+    filters = {"pri_status": " OK ", "pri_action": "TODOS", "pri_id": None, "pri_ne_group": "",
+               "pri_ne_ids": ["NE2", "NE1"], "limit": 200, "pri_ne_id": "NE1"}
+    assert normalize_filters(filters) == (
+        ("limit", 200), ("pri_ne_id", "NE1"), ("pri_ne_ids", ("NE2", "NE1")), ("pri_status", "OK"),
+    )
+
+
+def test_equivalent_filters_share_key():
+    a = {"pri_ne_id": "NE1", "pri_status": "OK", "pri_action": None}
+    b = {"pri_status": "OK ", "pri_action": "todos", "pri_ne_id": "NE1"}
+    assert cache_key("records:rows", DB, a) == cache_key("records:rows", DB, b)
+    assert cache_key("records:rows", DB, a) != cache_key("records:items", DB, a)
+
+
+def test_ttl_for_past_and_live(monkeypatch):
+    s = response_cache._settings
+    monkeypatch.setattr(s, "response_cache_settle_seconds", 300)
+    now = datetime(2025, 4, 30, 12, 0, 0)
+    # ventana cerrada hace más que el margen: datos asentados
+    assert ttl_for({"end_date": "2025-04-30 11:54:59"}, now) == s.response_cache_ttl_past
+    # dentro del margen de asentamiento o en el futuro: TTL corto
+    assert ttl_for({"end_date": "2025-04-30 11:55:01"}, now) == s.response_cache_ttl_live
+    assert ttl_for({"end_date": "2025-04-30 23:59:59"}, now) == s.response_cache_ttl_live
+
+
+def test_ttl_for_unparseable_end_is_live():
+    live = response_cache._settings.response_cache_ttl_live
+    assert ttl_for({}) == live
+    assert ttl_for({"end_date": "ayer"}) == live
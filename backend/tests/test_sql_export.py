@@ -0,0 +1,105 @@
+import datetime as dt
+
+import pytest
+
+from provisioning_api.utils.sql_export import (
+    BATCH_PRELUDE, COLUMNS, RAW_OVERRIDES, InsertAllScript, build_formatters, fmt_date, fmt_number,
+    fmt_string, format_row, iter_insert_statements,
+)
+
+
+def _rows(n: int) -> list[dict]:
+    return [{"pri_id": 900 + i, "pri_cellular_number": "5491100000000", "pri_sis_id": i,
+             "pri_message_error": "it's"} for i in range(n)]
+
+
+def test_blocks_commits_and_offsets():
+    script = InsertAllScript(block_rows=2, commit_every=3)
+    out = script.feed(_rows(3)) + script.feed(_rows(2)) + script.finish()
+
+    assert out.startswith(BATCH_PRELUDE)
+    assert out.count(BATCH_PRELUDE) == 1
+    assert out.count("INSERT ALL") == 3                      # 2 + 2 + 1 filas
+    assert out.count("  INTO swp_provisioning_interfaces") == 5
+    # COMMIT tras el lote que pasa commit_every y al final por el resto
+    assert out.count("COMMIT;") == 2
+    assert out.endswith("SELECT 1 FROM dual;\nCOMMIT;\n")
+    for i in range(1, 6):
+        assert f"VALUES (:base_id + {i}, " in out
+    assert "900" not in out                                   # el pri_id original no se usa
+
+
+def test_feed_holds_partial_block():
+    script = InsertAllScript(block_rows=4, commit_every=10)
+    assert script.feed(_rows(3)) == BATCH_PRELUDE
+    tail = script.finish()
+    assert tail.count("INSERT ALL") == 1 and tail.endswith("COMMIT;\n")
+
+
+def test_values_are_typed_by_column():
+    script = InsertAllScript(block_rows=1)
+    out = script.feed(_rows(1)) + script.finish()
+    values = format_row(_rows(1)[0], build_formatters())
+    assert "VALUES (" + ", ".join([":base_id + 1"] + values[1:]) + ")" in out
+    row = dict(zip(COLUMNS, values))
+    assert row["pri_cellular_number"] == "'5491100000000'"   # VARCHAR numérico va entre comillas
+    assert row["pri_sis_id"] == "0"
+    assert row["pri_status"] == "'PENDING'"
+    assert row["pri_message_error"] == "'it''s'"
+    assert row["pri_imei"] == "NULL"
+
+
+def test_empty_script_has_no_commit():
+    assert InsertAllScript().finish() == BATCH_PRELUDE
+
+
+def test_commit_every_not_below_block():
+    script = InsertAllScript(block_rows=5, commit_every=2)
+    assert script.commit_every == 5
+
+
+@pytest.mark.parametrize("value, expected", [
+    (None, "NULL"),
+    ("5491100000000", "'5491100000000'"),
+    ("  O'Brien ", "'O''Brien'"),
+    (42, "'42'"),
+])
+def test_fmt_string(value, expected):
+    assert fmt_string(value) == expected
+
+
+@pytest.mark.parametrize("value, expected", [
+    (None, "NULL"),
+    (0, "0"),
+    (12.5, "12.5"),
+    ("ABC", "'ABC'"),
+])
+def test_fmt_number(value, expected):
+    assert fmt_number(value) == expected
+
+
+@pytest.mark.parametrize("value, expected", [
+    (None, "NULL"),
+    ("2025-04-30 10:15:00", "TO_DATE('2025-04-30 10:15:00','YYYY-MM-DD HH24:MI:SS')"),
+    (dt.datetime(2025, 4, 30, 10, 15), "TO_DATE('2025-04-30 10:15:00','YYYY-MM-DD HH24:MI:SS')"),
+    (dt.date(2025, 4, 30), "TO_DATE('2025-04-30 00:00:00','YYYY-MM-DD HH24:MI:SS')"),
+])
+def test_fmt_date(value, expected):
+    assert fmt_date(value) == expected
+
+
+def test_build_formatters_by_column_type():
+    table = dict(build_formatters())
+    assert list(table) == COLUMNS
+    assert all(table[col] is None for col in RAW_OVERRIDES)
+    assert table["pri_processed_date"] is fmt_date
+    assert table["pri_sis_id"] is fmt_number
+    assert table["pri_cellular_number"] is fmt_string
+
+
+def test_iter_insert_statements():
+    lines = list(iter_insert_statements(_rows(2)))
+    assert len(lines) == 2
+    assert all(line.startswith("INSERT INTO swp_provisioning_interfaces (pri_id, ") for line in lines)
+    assert all(line.endswith(");\n") for line in lines)
+    assert RAW_OVERRIDES["pri_id"] in lines[0]
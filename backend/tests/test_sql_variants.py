@@ -0,0 +1,35 @@
+from collections import OrderedDict
+
+from provisioning_api.db.sql import variants
+from provisioning_api.db.sql.queries import COLUMN_NAMES, build_sql, resolve_fields, sql_variant
+
+FILTERS = {"start_date": "2025-04-30 00:00:00", "end_date": "2025-04-30 23:59:59", "pri_ne_id": "NE1"}
+
+
+def _select(fields) -> str:
+    return build_sql(FILTERS, include_pagination=True, fields=resolve_fields(fields))[0]
+
+
+def test_projection_names_are_unique_per_column_set():
+    a = _select(["pri_status", "pri_action"])
+    b = _select(["pri_status", "pri_imei"])
+    assert variants.name_of(a) != variants.name_of(b)
+    assert variants.name_of(a).rsplit("|", 1)[1].startswith("cols=2:")
+    assert variants.name_of(_select(None)).endswith("|cols=default")
+
+
+def test_projections_are_bounded(monkeypatch):
+    monkeypatch.setattr(variants, "MAX_PROJECTIONS", 3)
+    monkeypatch.setattr(variants, "_BY_SQL", {})
+    monkeypatch.setattr(variants, "_PROJECTIONS", OrderedDict())
+    sql_variant.cache_clear()
+
+    default = _select(None)
+    sqls = [_select([col]) for col in COLUMN_NAMES[2:10]]
+    assert len(variants._PROJECTIONS) == 3
+    assert variants.name_of(default) is not None          # las canónicas no salen
+    assert [variants.name_of(s) is not None for s in sqls] == [False] * 5 + [True] * 3
+
+    # usada de nuevo vuelve a entrar aunque sql_variant la tenga memoizada
+    assert variants.name_of(_select([COLUMN_NAMES[2]])) is not None
+    assert len(variants._PROJECTIONS) == 3
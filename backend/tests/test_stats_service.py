@@ -0,0 +1,82 @@
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import datetime
+
+import pytest
+
+from provisioning_api.services import stats_service
+from provisioning_api.services.stats_service import _load_stats, _missing_runs, _truncate
+
+DB = {"host": "h", "port": 1521, "service": "s", "user": "u", "password": "p"}
+
+
+@pytest.mark.parametrize("bucket, expected", [
+    ("minute", datetime(2025, 4, 30, 10, 17)),
+    ("hour", datetime(2025, 4, 30, 10)),
+    ("day", datetime(2025, 4, 30)),
+])
+def test_truncate(bucket, expected):
+    assert _truncate(datetime(2025, 4, 30, 10, 17, 42), bucket) == expected
+
+
+def test_missing_runs():
+    assert _missing_runs([]) == []
+    assert _missing_runs([0, 1, 2, 5, 6, 9]) == [[0, 1, 2], [5, 6], [9]]
+    # más de _MAX_RUNS tramos: un solo rango
+    assert _missing_runs([0, 2, 4, 6]) == [[0, 2, 4, 6]]
+
+
+@pytest.fixture
+def fake_oracle(monkeypatch):
+    calls = []
+
+    @asynccontextmanager
+    async def session_async(db, con=None):
+        yield None
+
+    async def fetch_buckets(con, filters, bucket, dimension):
+        calls.append((filters["start_date"], filters["end_date"]))
+        return {
+            "2025-04-01 10:00:00": {"OK": 2},
+            "2025-04-01 11:00:00": {"OK": 1, "ERROR": 3},
+            "2025-04-01 13:00:00": {None: 1},
+        }
+
+    monkeypatch.setattr(stats_service, "session_async", session_async)
+    monkeypatch.setattr(stats_service, "fetch_buckets", fetch_buckets)
+    return calls
+
+
+def test_load_stats_buckets_and_cache(fake_oracle):
+    filters = {"start_date": "2025-04-01 10:30:00", "end_date": "2025-04-01 13:10:00", "pri_ne_id": "NE-stats-1"}
+    out = asyncio.run(_load_stats(DB, filters, "hour", "pri_status"))
+
+    assert [b["start"] for b in out["buckets"]] == [
+        "2025-04-01 10:00:00", "2025-04-01 11:00:00", "2025-04-01 12:00:00", "2025-04-01 13:00:00",
+    ]
+    assert out["values"] == ["ERROR", "OK", None]
+    assert [b["counts"] for b in out["buckets"]] == [[0, 2, 0], [3, 1, 0], [0, 0, 0], [0, 0, 1]]
+    assert [b["total"] for b in out["buckets"]] == [2, 4, 0, 1]
+    assert out["total"] == 7 and out["queried_buckets"] == 4
+    # la ventana se lee recortada a start_date/end_date
+    assert fake_oracle == [("2025-04-01 10:30:00", "2025-04-01 13:10:00")]
+
+    # 11:00 y 12:00 son buckets completos y asentados: la segunda vez salen del cache
+    fake_oracle.clear()
+    again = asyncio.run(_load_stats(DB, filters, "hour", "pri_status"))
+    assert again["queried_buckets"] == 2
+    assert fake_oracle == [("2025-04-01 10:30:00", "2025-04-01 10:59:59"),
+                           ("2025-04-01 13:00:00", "2025-04-01 13:10:00")]
+    assert again["buckets"] == out["buckets"]
+
+
+@pytest.mark.parametrize("filters, bucket, message", [
+    ({"start_date": "2025-04-01 10:00:00", "end_date": "2025-04-01 11:00:00"}, "week", "Bucket desconocido"),
+    ({"start_date": "2025-04-01", "end_date": "2025-04-01 11:00:00"}, "hour", "formato"),
+    ({"start_date": "2025-04-02 00:00:00", "end_date": "2025-04-01 00:00:00"}, "hour", "anterior"),
+    ({"start_date": "2020-01-01 00:00:00", "end_date": "2025-01-01 00:00:00"}, "minute", "buckets de minute"),
+])
+def test_load_stats_rejects(fake_oracle, filters, bucket, message):
+    with pytest.raises(ValueError, match=message):
+        asyncio.run(_load_stats(DB, {**filters, "pri_ne_id": "NE-stats-2"}, bucket, "pri_status"))
+    assert fake_oracle == []
@@ -0,0 +1,40 @@
+import asyncio
+from contextlib import asynccontextmanager
+
+from provisioning_api.services import tail_service
+from provisioning_api.services.admission import Overloaded
+from provisioning_api.services.tail_service import Poller, Subscriber
+
+DB = {"host": "h", "port": 1521, "service": "s", "user": "u", "password": "p"}
+
+
+def test_poll_backs_off_when_overloaded(monkeypatch):
+    opened = []
+
+    @asynccontextmanager
+    async def admit(db):
+        raise Overloaded("Base saturada", retry_after=7)
+        yield
+
+    @asynccontextmanager
+    async def connect_async(db):
+        opened.append(db)
+        yield None
+
+    monkeypatch.setattr(tail_service, "admit", admit)
+    monkeypatch.setattr(tail_service, "connect_async", connect_async)
+
+    async def scenario():
+        poller = Poller(("k",), DB, {"pri_ne_id": "NE1"})
+        sub = Subscriber()
+        poller.subscribers.add(sub)
+        task = asyncio.create_task(poller.run())
+        await asyncio.sleep(0.05)
+        task.cancel()
+        return poller, sub
+
+    poller, sub = asyncio.run(scenario())
+    assert opened == []                 # sin cupo no se abre sesión
+    assert poller.throttled == 1 and poller.polls == 0
+    assert poller.interval == 7
+    assert sub.queue.empty()            # no es un error para el cliente
@@ -1,10 +1,10 @@
-import { useMemo, useState } from 'react';
+import { useEffect, useMemo, useRef, useState } from 'react';
 
 import NLSearch from './components/NLSearch';
 import DbForm from './components/DbForm';
 import FiltersForm, { sanitizeFilters } from './components/Filters';
 import ResultsTable from './components/ResultsTable';
-import { askAi, downloadInserts, postRecords } from './lib/api';
+import { askAi, downloadInserts, fetchPayload, postRecords, tailRecords } from './lib/api';
 import { AskAiResponse, DbCredentials, Filters, RecordItem } from './types';
 
 const DEFAULT_LIMIT = 200;
@@ -40,6 +40,10 @@ export default function App() {
   const [error, setError] = useState<string | null>(null);
   const [aiLoading, setAiLoading] = useState(false);
   const [aiResult, setAiResult] = useState<AskAiResponse | null>(null);
+  const [live, setLive] = useState(false);
+  const tailRef = useRef<AbortController | null>(null);
+
+  useEffect(() => () => tailRef.current?.abort(), []);
 
   const normalizedCredentials = useMemo(
     () => ({
@@ -131,6 +135,7 @@ export default function App() {
 
   const handlePageChange = (nextPage: number) => {
     if (nextPage < 0 || nextPage === page) return;
+    if (live) stopLive();
     const limit = filters.limit ?? DEFAULT_LIMIT;
     const maxPage = Math.max(Math.ceil(total / limit) - 1, 0);
     if (nextPage > maxPage) return;
@@ -158,6 +163,53 @@ export default function App() {
     }
   };
 
+  const stopLive = () => {
+    tailRef.current?.abort();
+    tailRef.current = null;
+    setLive(false);
+  };
+
+  const startLive = async () => {
+    const validationError = validateInputs();
+    if (validationError) {
+      setError(validationError);
+      return;
+    }
+
+    // las filas nuevas se agregan arriba de la primera página
+    await handleSearch(0);
+    const payload = buildPayload(0, filters);
+    const limit = payload.filters.limit;
+    const controller = new AbortController();
+    tailRef.current = controller;
+    setLive(true);
+    tailRecords(
+      payload,
+      ({ event, data }) => {
+        if (event === 'rows') {
+          setItems((previous) => [...data.items, ...previous].slice(0, limit));
+          setTotal((previous) => previous + data.items.length);
+        } else if (event === 'reset') {
+          handleSearch(0);
+        } else if (event === 'error') {
+          setError(data.detail);
+        }
+      },
+      controller.signal,
+    )
+      .catch((requestError) => {
+        if (controller.signal.aborted) return;
+        const message = requestError instanceof Error ? requestError.message : 'Se cortó el seguimiento en vivo.';
+        setError(message);
+      })
+      .finally(() => {
+        if (tailRef.current === controller) {
+          tailRef.current = null;
+          setLive(false);
+        }
+      });
+  };
+
   const handleAskAi = async (text: string) => {
     setAiLoading(true);
     setError(null);
@@ -216,10 +268,23 @@ export default function App() {
           filters={filters}
           credentials={normalizedCredentials}
           onChange={setFilters}
-          onSearch={(cleanedFilters) => handleSearch(0, cleanedFilters)}
+          onSearch={(cleanedFilters) => {
+            stopLive();
+            handleSearch(0, cleanedFilters);
+          }}
           onGenerate={(cleanedFilters) => handleGenerateInserts(cleanedFilters)}
           loading={loading}
         />
+        <div className="flex justify-end">
+          <button
+            type="button"
+            onClick={live ? stopLive : startLive}
+            disabled={loading && !live}
+            className="inline-flex items-center justify-center rounded border border-indigo-600 px-4 py-2 text-sm font-semibold text-indigo-600 transition hover:bg-indigo-50 disabled:cursor-not-allowed disabled:border-indigo-300 disabled:text-indigo-300"
+          >
+            {live ? 'Detener en vivo' : 'Seguir en vivo'}
+          </button>
+        </div>
         <ResultsTable
           items={items}
           total={total}
@@ -227,6 +292,7 @@ export default function App() {
           page={page}
           loading={loading}
           onPageChange={handlePageChange}
+          onLoadPayload={(priId) => fetchPayload(normalizedCredentials, priId)}
         />
       </main>
     </div>
@@ -1,3 +1,5 @@
+import { useState } from 'react';
+
 import { RecordItem } from '../types';
 
 interface ResultsTableProps {
@@ -7,8 +9,12 @@ interface ResultsTableProps {
   page: number;
   loading: boolean;
   onPageChange: (page: number) => void;
+  onLoadPayload?: (priId: number) => Promise<RecordItem>;
 }
 
+// el backend no las incluye en /records: se piden por fila con /records/{pri_id}/payload
+const PAYLOAD_KEYS = new Set(['pri_request', 'pri_response']);
+
 const columns: { key: keyof RecordItem; label: string }[] = [
   { key: 'pri_id', label: 'pri_id' },
   { key: 'pri_cellular_number', label: 'pri_cellular_number' },
@@ -54,13 +60,29 @@ const columns: { key: keyof RecordItem; label: string }[] = [
   { key: 'pri_correlator_id', label: 'pri_correlator_id' },
 ];
 
-export default function ResultsTable({ items, total, limit, page, loading, onPageChange }: ResultsTableProps) {
+export default function ResultsTable({ items, total, limit, page, loading, onPageChange, onLoadPayload }: ResultsTableProps) {
+  const [payloads, setPayloads] = useState<Record<string, RecordItem | 'loading'>>({});
   const shown = items.length;
   const totalShown = Math.min(total, limit ?? total);
   const summary = shown > 0 ? `Mostrando 1-${shown} de ${totalShown} (límite ${limit})` : 'Sin resultados';
   const hasPrevious = page > 0;
   const hasNext = (page + 1) * limit < total;
 
+  const loadPayload = async (priId: number) => {
+    if (!onLoadPayload) return;
+    setPayloads((previous) => ({ ...previous, [priId]: 'loading' }));
+    try {
+      const payload = await onLoadPayload(priId);
+      setPayloads((previous) => ({ ...previous, [priId]: payload }));
+    } catch {
+      setPayloads((previous) => {
+        const next = { ...previous };
+        delete next[priId];
+        return next;
+      });
+    }
+  };
+
   return (
     <section className="rounded-lg bg-white p-4 shadow">
       <div className="mb-4 flex flex-col gap-2 sm:flex-row sm:items-center sm:justify-between">
@@ -89,7 +111,22 @@ export default function ResultsTable({ items, total, limit, page, loading, onPag
               items.map((item, rowIndex) => (
                 <tr key={`${item.pri_id ?? rowIndex}-${rowIndex}`} className="odd:bg-white even:bg-slate-50">
                   {columns.map((column) => {
-                    const rawValue = item[column.key];
+                    const payload = payloads[String(item.pri_id)];
+                    if (PAYLOAD_KEYS.has(column.key as string) && !(column.key in item) && typeof payload !== 'object') {
+                      return (
+                        <td key={column.key as string} className="px-3 py-2 align-top">
+                          <button
+                            type="button"
+                            onClick={() => loadPayload(Number(item.pri_id))}
+                            disabled={!onLoadPayload || payload === 'loading'}
+                            className="text-indigo-600 hover:underline disabled:opacity-60"
+                          >
+                            {payload === 'loading' ? 'Cargando…' : 'Ver'}
+                          </button>
+                        </td>
+                      );
+                    }
+                    const rawValue = column.key in item ? item[column.key] : (payload as RecordItem | undefined)?.[column.key];
                     const displayValue = rawValue ?? '';
                     const textValue = rawValue === null || rawValue === undefined ? '' : String(rawValue);
                     return (
@@ -43,6 +43,49 @@ export function postRecords(payload: any) {
   return postJSON<{ items: any[]; total: number }>('/records', scrub(payload));
 }
 
+export function fetchPayload(db: any, priId: number) {
+  return postJSON<{ pri_id: number; pri_request: string | null; pri_response: string | null }>(
+    `/records/${priId}/payload`,
+    { db },
+  );
+}
+
+export type TailEvent = { event: string; data: any };
+
+// Live tail: Server-Sent Events sobre un POST (las credenciales van en el body, EventSource sólo hace GET)
+export async function tailRecords(payload: any, onEvent: (event: TailEvent) => void, signal: AbortSignal) {
+  const r = await fetch(`${BASE}/records/tail`, {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json' },
+    body: JSON.stringify(scrub(payload)),
+    signal,
+  });
+  if (!r.ok || !r.body) {
+    const text = await r.text().catch(() => '');
+    throw new Error(text || `HTTP ${r.status}`);
+  }
+  const reader = r.body.pipeThrough(new TextDecoderStream()).getReader();
+  let buffer = '';
+  for (;;) {
+    const { value, done } = await reader.read();
+    if (done) return;
+    buffer += value;
+    let end = buffer.indexOf('\n\n');
+    while (end >= 0) {
+      const frame = buffer.slice(0, end);
+      buffer = buffer.slice(end + 2);
+      let event = 'message';
+      const data: string[] = [];
+      frame.split('\n').forEach((line) => {
+        if (line.startsWith('event: ')) event = line.slice(7);
+        else if (line.startsWith('data: ')) data.push(line.slice(6));
+      });
+      if (data.length) onEvent({ event, data: JSON.parse(data.join('\n')) });
+      end = buffer.indexOf('\n\n');
+    }
+  }
+}
+
 export async function downloadInserts(payload: any) {
   const cleanPayload = scrub(payload);
   const r = await fetch(`${BASE}/generate-inserts`, {